@@ -0,0 +1,218 @@
+import argparse
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from sys import exit
+from typing import Any
+
+from dotenv import load_dotenv
+from loguru import logger
+
+from config_loader import load_config, renamarr_options, series_scanner_options
+from log_setup import configure_file_logging, configure_logging
+
+EXIT_SUCCESS = 0
+EXIT_JOB_FAILED = 1
+EXIT_NO_MATCHING_JOBS = 2
+
+RENAMARR = "renamarr"
+SERIES_SCANNER = "series_scanner"
+
+# (service, job, instance config), in the order an instance's jobs run
+InstanceJob = tuple[str, str, Any]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="renamarr",
+        description="Without a command, run every enabled job and keep running "
+        "scheduled jobs. The commands run the selected jobs once, then exit.",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="command")
+
+    run = commands.add_parser("run", help="run the enabled jobs once")
+    run.add_argument(
+        "--job",
+        action="append",
+        dest="jobs",
+        choices=(RENAMARR, SERIES_SCANNER),
+        help="only run this job; may be repeated",
+    )
+    run.set_defaults(dry_run=False)
+    scan = commands.add_parser("scan", help="run the enabled series scanners once")
+    scan.set_defaults(jobs=[SERIES_SCANNER], dry_run=False)
+    plan = commands.add_parser(
+        "plan", help="run the enabled renamarr jobs once as a dry run"
+    )
+    plan.set_defaults(jobs=[RENAMARR], dry_run=True)
+    for command in (run, scan, plan):
+        command.add_argument(
+            "--instance",
+            action="append",
+            dest="instances",
+            metavar="NAME",
+            help="only run jobs for this Sonarr or Radarr instance; may be repeated",
+        )
+    return parser
+
+
+def select_jobs(
+    config: Any, jobs: Sequence[str], instances: Sequence[str] | None
+) -> list[list[InstanceJob]]:
+    """Return the enabled jobs matching the selection, grouped by instance.
+
+    The series scanner runs before renamarr on the same instance, so episodes
+    retitled by the scanner are renamed in the same invocation.
+    """
+    groups: list[list[InstanceJob]] = []
+    for service, instance_configs in (
+        ("sonarr", config.sonarr),
+        ("radarr", config.radarr),
+    ):
+        for instance_config in instance_configs:
+            if instances and instance_config.name not in instances:
+                continue
+
+            group: list[InstanceJob] = []
+            if (
+                service == "sonarr"
+                and SERIES_SCANNER in jobs
+                and instance_config.series_scanner.enabled
+            ):
+                group.append((service, SERIES_SCANNER, instance_config))
+            if RENAMARR in jobs and instance_config.renamarr.enabled:
+                group.append((service, RENAMARR, instance_config))
+            if group:
+                groups.append(group)
+    return groups
+
+
+def run_jobs(groups: list[list[InstanceJob]], dry_run: bool = False) -> bool:
+    """Run each instance's jobs in order, with instances in parallel.
+
+    Returns True when every job finished without raising.
+    """
+    from renamarr.common.client_registry import ClientRegistry
+
+    client_registry = ClientRegistry()
+    try:
+        with ThreadPoolExecutor(
+            len(groups), thread_name_prefix="renamarr-job"
+        ) as executor:
+            results = list(
+                executor.map(
+                    partial(_run_instance_jobs, client_registry, dry_run), groups
+                )
+            )
+    finally:
+        client_registry.close()
+    return all(results)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        from main import Main
+
+        Main().start()
+        return EXIT_SUCCESS
+
+    load_dotenv(".env.local")
+    logger_format = configure_logging()
+    config = load_config()
+
+    groups = select_jobs(
+        config, args.jobs or (SERIES_SCANNER, RENAMARR), args.instances
+    )
+    if not groups:
+        logger.error("No enabled jobs match the selected instances and jobs")
+        return EXIT_NO_MATCHING_JOBS
+
+    for group in groups:
+        for service, job, instance_config in group:
+            if job == RENAMARR and instance_config.renamarr.log_to_file:
+                configure_file_logging(service, instance_config.name, logger_format)
+
+    if not run_jobs(groups, args.dry_run):
+        return EXIT_JOB_FAILED
+    return EXIT_SUCCESS
+
+
+def _run_instance_jobs(
+    client_registry: Any, dry_run: bool, group: list[InstanceJob]
+) -> bool:
+    failed_jobs: list[str] = []
+    for service, job, instance_config in group:
+        with (
+            logger.contextualize(service=service, instance=instance_config.name),
+            logger.catch(
+                message=f"{service} {job} failed",
+                onerror=lambda _, job=job: failed_jobs.append(job),
+            ),
+        ):
+            _JOBS[service, job](instance_config, client_registry, dry_run)
+    return not failed_jobs
+
+
+def _client(client_registry: Any, cli_class: type, instance_config: Any) -> Any:
+    return client_registry.get_client(
+        cli_class,
+        instance_config.url,
+        instance_config.api_key,
+        pool_size=instance_config.http.pool_size,
+        connect_timeout_seconds=instance_config.http.connect_timeout_seconds,
+        read_timeout_seconds=instance_config.http.read_timeout_seconds,
+    )
+
+
+# Service modules are imported on first use, so a run only loads what it needs
+
+
+def _run_sonarr_series_scanner(
+    sonarr_config: Any, client_registry: Any, dry_run: bool
+) -> None:
+    from pycliarr.api import SonarrCli
+
+    from renamarr.sonarr.services.series_scanner import SonarrSeriesScanner
+
+    SonarrSeriesScanner(
+        **series_scanner_options(sonarr_config),
+        sonarr_cli=_client(client_registry, SonarrCli, sonarr_config),
+    ).scan()
+
+
+def _run_sonarr_renamarr(
+    sonarr_config: Any, client_registry: Any, dry_run: bool
+) -> None:
+    from pycliarr.api import SonarrCli
+
+    from renamarr.sonarr.services.renamarr import SonarrRenamarr
+
+    SonarrRenamarr(
+        **renamarr_options(sonarr_config, dry_run),
+        sonarr_cli=_client(client_registry, SonarrCli, sonarr_config),
+    ).scan()
+
+
+def _run_radarr_renamarr(
+    radarr_config: Any, client_registry: Any, dry_run: bool
+) -> None:
+    from pycliarr.api import RadarrCli
+
+    from renamarr.radarr.services.renamarr import RadarrRenamarr
+
+    RadarrRenamarr(
+        **renamarr_options(radarr_config, dry_run),
+        radarr_cli=_client(client_registry, RadarrCli, radarr_config),
+    ).scan()
+
+
+_JOBS: dict[tuple[str, str], Callable[[Any, Any, bool], None]] = {
+    ("sonarr", SERIES_SCANNER): _run_sonarr_series_scanner,
+    ("sonarr", RENAMARR): _run_sonarr_renamarr,
+    ("radarr", RENAMARR): _run_radarr_renamarr,
+}
+
+
+if __name__ == "__main__":  # pragma nocover
+    exit(main())  # pragma: no cover
@@ -0,0 +1,81 @@
+import os
+from contextlib import contextmanager
+from sys import exit
+from typing import Any
+
+from loguru import logger
+from pyconfigparser import ConfigError, ConfigFileNotFoundError, configparser
+
+from config_schema import CONFIG_SCHEMA
+
+
+def load_config() -> Any:
+    """Load ``config.yml`` from ``CONFIG_DIR``, exiting with status 1 when it is unusable."""
+    config_dir = os.getenv("CONFIG_DIR", "/")
+    try:
+        with set_directory(config_dir):
+            return configparser.get_config(CONFIG_SCHEMA)
+    except OSError as exc:
+        logger.error(
+            f"Unable to access config directory {config_dir!r}; please check volume mount paths or set $CONFIG_DIR."
+        )
+        logger.error(exc)
+        exit(1)
+    except ConfigFileNotFoundError as exc:
+        logger.error(
+            "Unable to locate config file, please check volume mount paths or set $CONFIG_DIR. The default config directory is /config/."
+        )
+        logger.error(exc)
+        exit(1)
+    except ConfigError as exc:
+        logger.error(
+            "Unable to parse config file, Please see example config for comparison -- https://github.com/hollanbm/renamarr/blob/main/example/config.yml.example"
+        )
+        logger.error(exc)
+        exit(1)
+
+
+def renamarr_options(instance_config: Any, dry_run: bool = False) -> dict[str, Any]:
+    """Return the SonarrRenamarr/RadarrRenamarr keyword arguments for an instance."""
+    renamarr_config = instance_config.renamarr
+    return {
+        "name": instance_config.name,
+        "url": instance_config.url,
+        "api_key": instance_config.api_key,
+        "analyze_files": renamarr_config.analyze_files,
+        "rename_folders": renamarr_config.rename_folders,
+        "max_concurrency": renamarr_config.max_concurrency,
+        "max_requests_per_second": renamarr_config.max_requests_per_second,
+        "cache_folder_names": renamarr_config.cache_folder_names,
+        "incremental": renamarr_config.incremental.enabled,
+        "full_sweep_runs": renamarr_config.incremental.full_sweep_runs,
+        "command_timeout_minutes": renamarr_config.command_timeout_minutes,
+        "analyze_timeout_minutes": renamarr_config.analyze_timeout_minutes,
+        "defer_rescans": renamarr_config.defer_rescans,
+        "rename_batch_size": renamarr_config.rename_batch_size,
+        "bulk_rename_preview": renamarr_config.bulk_rename_preview,
+        "dry_run": dry_run or renamarr_config.dry_run,
+    }
+
+
+def series_scanner_options(sonarr_config: Any) -> dict[str, Any]:
+    """Return the SonarrSeriesScanner keyword arguments for a Sonarr instance."""
+    series_scanner_config = sonarr_config.series_scanner
+    return {
+        "name": sonarr_config.name,
+        "url": sonarr_config.url,
+        "api_key": sonarr_config.api_key,
+        "hours_before_air": series_scanner_config.hours_before_air,
+        "use_calendar": series_scanner_config.use_calendar,
+        "calendar_lookback_days": series_scanner_config.calendar_lookback_days,
+    }
+
+
+@contextmanager
+def set_directory(path):
+    oldpwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(oldpwd)
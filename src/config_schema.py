@@ -7,6 +7,21 @@ NON_NEGATIVE_INTEGER = And(
     lambda value: value >= 0,
 )
 
+POSITIVE_INTEGER = And(
+    lambda value: type(value) is int,
+    lambda value: value > 0,
+)
+
+POSITIVE_NUMBER = And(
+    lambda value: type(value) in (int, float),
+    lambda value: 0 < value < float("inf"),
+)
+
+NON_NEGATIVE_NUMBER = And(
+    lambda value: type(value) in (int, float),
+    lambda value: 0 <= value < float("inf"),
+)
+
 INTERVAL_SCHEMA = {
     Optional("days", default=0): NON_NEGATIVE_INTEGER,
     Optional("hours", default=0): NON_NEGATIVE_INTEGER,
@@ -17,9 +32,31 @@ DEFAULT_INTERVAL = Interval(days=0, hours=1, minutes=0)
 DEFAULT_SCHEDULE: dict[str, object] = {
     "enabled": True,
     "interval": DEFAULT_INTERVAL,
+    "start_offset_minutes": 0,
+    "jitter_minutes": 0,
 }
 MAX_INTERVAL_DAYS: int = 30
 
+DEFAULT_HTTP: dict[str, object] = {
+    "pool_size": 10,
+    "connect_timeout_seconds": 10,
+    "read_timeout_seconds": 300,
+}
+HTTP_SCHEMA = {
+    Optional("pool_size", default=10): POSITIVE_INTEGER,
+    Optional("connect_timeout_seconds", default=10): POSITIVE_NUMBER,
+    Optional("read_timeout_seconds", default=300): POSITIVE_NUMBER,
+}
+
+DEFAULT_INCREMENTAL: dict[str, object] = {
+    "enabled": False,
+    "full_sweep_runs": 24,
+}
+INCREMENTAL_SCHEMA = {
+    Optional("enabled", default=False): bool,
+    Optional("full_sweep_runs", default=24): POSITIVE_INTEGER,
+}
+
 
 def _migrate_hourly_job(renamarr_config: object) -> object:
     """Map the deprecated hourly job option to the replacement schedule option.
@@ -57,6 +94,8 @@ SCHEDULE_SCHEMA = And(
                 )
             ),
         ),
+        Optional("start_offset_minutes", default=0): NON_NEGATIVE_INTEGER,
+        Optional("jitter_minutes", default=0): NON_NEGATIVE_INTEGER,
     },
     And(
         lambda value: not value["enabled"] or value["interval"].total_minutes > 0,
@@ -66,6 +105,17 @@ SCHEDULE_SCHEMA = And(
         lambda value: value["interval"].total_minutes <= MAX_INTERVAL_DAYS * 1440,
         error=f"renamarr.schedule.interval must not exceed {MAX_INTERVAL_DAYS} days",
     ),
+    And(
+        lambda value: value["start_offset_minutes"] <= MAX_INTERVAL_DAYS * 1440,
+        error=f"renamarr.schedule.start_offset_minutes must not exceed {MAX_INTERVAL_DAYS} days",
+    ),
+    And(
+        lambda value: (
+            not value["enabled"]
+            or value["jitter_minutes"] < value["interval"].total_minutes
+        ),
+        error="renamarr.schedule.jitter_minutes must be less than the interval",
+    ),
 )
 
 CONFIG_SCHEMA = {
@@ -95,18 +145,25 @@ CONFIG_SCHEMA = {
                     lambda s: len(s) > 0,
                     error="sonarr[].api_key is a required field",
                 ),
+                Optional(
+                    "http", default=DEFAULT_HTTP, ignore_extra_keys=True
+                ): HTTP_SCHEMA,
                 Optional(
                     "series_scanner",
                     default={
                         "enabled": False,
                         "hourly_job": False,
                         "hours_before_air": 4,
+                        "use_calendar": False,
+                        "calendar_lookback_days": 7,
                     },
                     ignore_extra_keys=True,
                 ): {
                     Optional("enabled", default=False): bool,
                     Optional("hourly_job", default=False): bool,
                     Optional("hours_before_air", default=4): int,
+                    Optional("use_calendar", default=False): bool,
+                    Optional("calendar_lookback_days", default=7): POSITIVE_INTEGER,
                 },
                 Optional(
                     "renamarr",
@@ -115,6 +172,16 @@ CONFIG_SCHEMA = {
                         "analyze_files": False,
                         "rename_folders": False,
                         "log_to_file": False,
+                        "max_concurrency": 1,
+                        "max_requests_per_second": 0,
+                        "cache_folder_names": False,
+                        "incremental": DEFAULT_INCREMENTAL,
+                        "command_timeout_minutes": 5,
+                        "analyze_timeout_minutes": 120,
+                        "defer_rescans": False,
+                        "rename_batch_size": 0,
+                        "bulk_rename_preview": False,
+                        "dry_run": False,
                         "schedule": DEFAULT_SCHEDULE,
                     },
                     ignore_extra_keys=True,
@@ -127,6 +194,26 @@ CONFIG_SCHEMA = {
                             Optional("analyze_files", default=False): bool,
                             Optional("rename_folders", default=False): bool,
                             Optional("log_to_file", default=False): bool,
+                            Optional("max_concurrency", default=1): POSITIVE_INTEGER,
+                            Optional(
+                                "max_requests_per_second", default=0
+                            ): NON_NEGATIVE_NUMBER,
+                            Optional("cache_folder_names", default=False): bool,
+                            Optional(
+                                "incremental", default=DEFAULT_INCREMENTAL
+                            ): INCREMENTAL_SCHEMA,
+                            Optional(
+                                "command_timeout_minutes", default=5
+                            ): POSITIVE_INTEGER,
+                            Optional(
+                                "analyze_timeout_minutes", default=120
+                            ): POSITIVE_INTEGER,
+                            Optional("defer_rescans", default=False): bool,
+                            Optional(
+                                "rename_batch_size", default=0
+                            ): NON_NEGATIVE_INTEGER,
+                            Optional("bulk_rename_preview", default=False): bool,
+                            Optional("dry_run", default=False): bool,
                             Optional(
                                 "schedule", default=DEFAULT_SCHEDULE
                             ): SCHEDULE_SCHEMA,
@@ -164,6 +251,9 @@ CONFIG_SCHEMA = {
                     lambda s: len(s) > 0,
                     error="radarr[].api_key is a required field",
                 ),
+                Optional(
+                    "http", default=DEFAULT_HTTP, ignore_extra_keys=True
+                ): HTTP_SCHEMA,
                 Optional(
                     "renamarr",
                     default={
@@ -171,6 +261,16 @@ CONFIG_SCHEMA = {
                         "analyze_files": False,
                         "rename_folders": False,
                         "log_to_file": False,
+                        "max_concurrency": 1,
+                        "max_requests_per_second": 0,
+                        "cache_folder_names": False,
+                        "incremental": DEFAULT_INCREMENTAL,
+                        "command_timeout_minutes": 5,
+                        "analyze_timeout_minutes": 120,
+                        "defer_rescans": False,
+                        "rename_batch_size": 0,
+                        "bulk_rename_preview": False,
+                        "dry_run": False,
                         "schedule": DEFAULT_SCHEDULE,
                     },
                     ignore_extra_keys=True,
@@ -183,6 +283,26 @@ CONFIG_SCHEMA = {
                             Optional("analyze_files", default=False): bool,
                             Optional("rename_folders", default=False): bool,
                             Optional("log_to_file", default=False): bool,
+                            Optional("max_concurrency", default=1): POSITIVE_INTEGER,
+                            Optional(
+                                "max_requests_per_second", default=0
+                            ): NON_NEGATIVE_NUMBER,
+                            Optional("cache_folder_names", default=False): bool,
+                            Optional(
+                                "incremental", default=DEFAULT_INCREMENTAL
+                            ): INCREMENTAL_SCHEMA,
+                            Optional(
+                                "command_timeout_minutes", default=5
+                            ): POSITIVE_INTEGER,
+                            Optional(
+                                "analyze_timeout_minutes", default=120
+                            ): POSITIVE_INTEGER,
+                            Optional("defer_rescans", default=False): bool,
+                            Optional(
+                                "rename_batch_size", default=0
+                            ): NON_NEGATIVE_INTEGER,
+                            Optional("bulk_rename_preview", default=False): bool,
+                            Optional("dry_run", default=False): bool,
                             Optional(
                                 "schedule", default=DEFAULT_SCHEDULE
                             ): SCHEDULE_SCHEMA,
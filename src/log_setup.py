@@ -0,0 +1,64 @@
+import os
+from sys import stdout
+
+from loguru import logger
+
+LOG_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
+    "<level>{level}</level> | "
+    "{extra[instance]} | "
+    "{extra[item]} | "
+    "<level>{message}</level>"
+)
+DEBUG_LOG_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
+    "<level>{level}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | "
+    "{extra[instance]} | "
+    "{extra[item]} | "
+    "<level>{message}</level>"
+)
+
+
+def configure_logging() -> str:
+    """Send logs to stdout at ``LOG_LEVEL`` and return the log format in use."""
+    log_level = os.getenv("LOG_LEVEL", "INFO")
+    logger_format = DEBUG_LOG_FORMAT if log_level.upper() == "DEBUG" else LOG_FORMAT
+    logger.configure(extra={"instance": "", "item": ""})  # Default values
+    logger.remove()
+    logger.add(stdout, format=logger_format, level=log_level)
+    return logger_format
+
+
+def configure_file_logging(
+    service: str, instance_name: str, logger_format: str
+) -> bool:
+    """Also write one instance's logs to ``LOG_DIR/<service>/<name>.log``.
+
+    Returns False, after logging a warning, when the log file cannot be opened.
+    """
+    log_dir = os.getenv("LOG_DIR", "/logs")
+    log_rotation = os.getenv("LOG_ROTATION", "00:00")
+    log_retention = os.getenv("LOG_RETENTION", "7 days")
+    log_path = os.path.join(log_dir, service, f"{instance_name}.log")
+    try:
+        logger.add(
+            log_path,
+            format=logger_format,
+            level=os.getenv("LOG_LEVEL", "INFO"),
+            rotation=log_rotation,
+            retention=log_retention,
+            # filter ensures that instance logs go to the correct file
+            filter=lambda record, configured_service=service, configured_name=instance_name: (
+                record["extra"].get("service") == configured_service
+                and record["extra"].get("instance") == configured_name
+            ),
+        )
+    except OSError as exc:
+        with logger.contextualize(service=service, instance=instance_name):
+            logger.warning(
+                f"Unable to write logs to {log_path!r}; continuing with stdout logging only."
+            )
+            logger.warning(exc)
+        return False
+    return True
@@ -1,19 +1,26 @@
 import os
-from contextlib import contextmanager
-from sys import exit, stdout
-from time import sleep
+import signal
+from queue import Empty, SimpleQueue
+from threading import Event
 
 import schedule
 from dotenv import load_dotenv
 from loguru import logger
-from pycliarr.api import CliArrError
-from pyconfigparser import ConfigError, ConfigFileNotFoundError, configparser
+from pycliarr.api import CliArrError, RadarrCli, SonarrCli
 
-from config_schema import CONFIG_SCHEMA
+from config_loader import load_config, renamarr_options, series_scanner_options
+from log_setup import configure_file_logging, configure_logging
+from renamarr.common.client_registry import ClientRegistry
+from renamarr.common.job_runner import JobRunner
+from renamarr.common.plan_writer import PlanWriteError
 from renamarr.healthcheck.health_reporter import HealthReporter
+from renamarr.metrics.metrics_registry import MetricsRegistry
+from renamarr.metrics.metrics_server import MetricsServer
 from renamarr.radarr.services.renamarr import RadarrRenamarr
 from renamarr.sonarr.services.renamarr import SonarrRenamarr
 from renamarr.sonarr.services.series_scanner import SonarrSeriesScanner
+from renamarr.webhook.webhook_debouncer import WebhookDebouncer
+from renamarr.webhook.webhook_server import WebhookServer
 
 _DEPRECATED_HOURLY_JOB_WARNING: str = (
     "renamarr.hourly_job is deprecated; use renamarr.schedule.enabled instead. "
@@ -27,73 +34,146 @@ class Main:
     """
 
     RUN_SCHEDULER = True
-    _LOG_FORMAT = (
-        "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
-        "<level>{level}</level> | "
-        "{extra[instance]} | "
-        "{extra[item]} | "
-        "<level>{message}</level>"
-    )
-    _DEBUG_LOG_FORMAT = (
-        "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
-        "<level>{level}</level> | "
-        "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | "
-        "{extra[instance]} | "
-        "{extra[item]} | "
-        "<level>{message}</level>"
-    )
 
     def __init__(self) -> None:
         load_dotenv(".env.local")
-        log_level = os.getenv("LOG_LEVEL", "INFO")
 
         self._health_reporter = HealthReporter()
-        self._logger_format = (
-            self._DEBUG_LOG_FORMAT if log_level.upper() == "DEBUG" else self._LOG_FORMAT
+        self._job_runner = JobRunner(int(os.getenv("MAX_CONCURRENT_JOBS", "1")))
+        self._client_registry = ClientRegistry()
+        self._metrics = MetricsRegistry()
+        self._logger_format = configure_logging()
+        self._stop_requested = Event()
+        self._wake_up = Event()
+        self._webhook_runs: SimpleQueue[tuple[str, str, set[int]]] = SimpleQueue()
+
+    def stop(self) -> None:
+        """Stop the scheduler loop, and let running jobs stop after their current item."""
+        self.RUN_SCHEDULER = False
+        self._stop_requested.set()
+        self._wake_up.set()
+
+    def __handle_shutdown_signal(self, signum, frame) -> None:
+        logger.info(
+            f"Received {signal.Signals(signum).name}, stopping after the current item"
         )
-        logger.configure(extra={"instance": "", "item": ""})  # Default values
-        logger.remove()
-        logger.add(stdout, format=self._logger_format, level=log_level)
+        self.stop()
+
+    def __wait_for_next_deadline(self) -> None:
+        # Sleep until the next job is due or the heartbeat needs refreshing,
+        # rather than polling; stop() and queued webhook runs end the wait early
+        timeout = self._health_reporter.seconds_until_heartbeat()
+        idle_seconds = schedule.idle_seconds()
+        if idle_seconds is not None:
+            timeout = min(timeout, max(0.0, idle_seconds))
+        self._wake_up.wait(timeout)
+        self._wake_up.clear()
 
     def __configure_file_logging(self, service: str, instance_name: str) -> bool:
-        log_dir = os.getenv("LOG_DIR", "/logs")
-        log_rotation = os.getenv("LOG_ROTATION", "00:00")
-        log_retention = os.getenv("LOG_RETENTION", "7 days")
-        log_path = os.path.join(log_dir, service, f"{instance_name}.log")
-        try:
-            logger.add(
-                log_path,
-                format=self._logger_format,
-                level=os.getenv("LOG_LEVEL", "INFO"),
-                rotation=log_rotation,
-                retention=log_retention,
-                # filter ensures that instance logs go to the correct file
-                filter=lambda record, configured_service=service, configured_name=instance_name: (
-                    record["extra"].get("service") == configured_service
-                    and record["extra"].get("instance") == configured_name
-                ),
+        return configure_file_logging(service, instance_name, self._logger_format)
+
+    def __client(self, cli_class, service, instance_config):
+        cli = self._client_registry.get_client(
+            cli_class,
+            instance_config.url,
+            instance_config.api_key,
+            pool_size=instance_config.http.pool_size,
+            connect_timeout_seconds=instance_config.http.connect_timeout_seconds,
+            read_timeout_seconds=instance_config.http.read_timeout_seconds,
+        )
+        self._metrics.instrument(cli, service, instance_config.name)
+        return cli
+
+    def __start_metrics_server(self):
+        metrics_port = os.getenv("METRICS_PORT")
+        if not metrics_port:
+            return None
+
+        metrics_server = MetricsServer(self._metrics, int(metrics_port))
+        metrics_server.start()
+        logger.info(f"Serving metrics on port {metrics_server.port}")
+        return metrics_server
+
+    def __start_webhook_server(self, config):
+        webhook_port = os.getenv("WEBHOOK_PORT")
+        if not webhook_port:
+            return None
+
+        self._webhook_instances = {
+            (service, instance_config.name): instance_config
+            for service, instance_configs in (
+                ("sonarr", config.sonarr),
+                ("radarr", config.radarr),
             )
-        except OSError as exc:
-            with logger.contextualize(service=service, instance=instance_name):
-                logger.warning(
-                    f"Unable to write logs to {log_path!r}; continuing with stdout logging only."
-                )
-                logger.warning(exc)
-            return False
-        return True
+            for instance_config in instance_configs
+            if instance_config.renamarr.enabled
+        }
+        self._webhook_debouncer = WebhookDebouncer(
+            self.__queue_webhook_run,
+            delay_seconds=float(os.getenv("WEBHOOK_DEBOUNCE_SECONDS", "30")),
+            max_delay_seconds=float(os.getenv("WEBHOOK_MAX_DELAY_SECONDS", "300")),
+        )
+        webhook_server = WebhookServer(
+            {key: cfg.api_key for key, cfg in self._webhook_instances.items()},
+            lambda service, name, item_id: self._webhook_debouncer.add(
+                service, name, {item_id}
+            ),
+            int(webhook_port),
+        )
+        webhook_server.start()
+        logger.info(f"Listening for webhooks on port {webhook_server.port}")
+        return webhook_server
+
+    def __queue_webhook_run(self, service, instance_name, item_ids) -> None:
+        # Debouncer timers only hand runs to the scheduler loop, so webhook runs
+        # share the job runner's concurrency cap and shutdown with scheduled jobs
+        self._webhook_runs.put((service, instance_name, item_ids))
+        self._wake_up.set()
+
+    def __run_webhook_jobs(self) -> None:
+        # Runs still queued at shutdown are dropped, like pending debouncer flushes
+        while not self._stop_requested.is_set():
+            try:
+                service, instance_name, item_ids = self._webhook_runs.get_nowait()
+            except Empty:
+                return
+            if not self.__webhook_renamarr_job(service, instance_name, item_ids):
+                # The instance is busy, retry the items once it has had time to finish
+                with logger.contextualize(instance=instance_name):
+                    logger.debug(f"Requeued {len(item_ids)} webhook items")
+                self._webhook_debouncer.add(service, instance_name, item_ids)
+
+    def __webhook_renamarr_job(self, service, instance_name, item_ids) -> bool:
+        run = (
+            self.__run_sonarr_renamarr
+            if service == "sonarr"
+            else self.__run_radarr_renamarr
+        )
+        return self._job_runner.submit(
+            f"{service}:renamarr:{instance_name}",
+            run,
+            self._webhook_instances[service, instance_name],
+            item_ids,
+        )
 
     def __sonarr_series_scanner_job(self, sonarr_config):
+        self._job_runner.submit(
+            f"sonarr:series_scanner:{sonarr_config.name}",
+            self.__run_sonarr_series_scanner,
+            sonarr_config,
+        )
+
+    def __run_sonarr_series_scanner(self, sonarr_config):
         with (
             self._health_reporter.running_job(),
             logger.contextualize(service="sonarr", instance=sonarr_config.name),
         ):
             try:
-                SonarrSeriesScanner(
-                    name=sonarr_config.name,
-                    url=sonarr_config.url,
-                    api_key=sonarr_config.api_key,
-                    hours_before_air=sonarr_config.series_scanner.hours_before_air,
-                ).scan()
+                with self._metrics.job("sonarr", sonarr_config.name, "series_scanner"):
+                    SonarrSeriesScanner(
+                        **series_scanner_options(sonarr_config),
+                        sonarr_cli=self.__client(SonarrCli, "sonarr", sonarr_config),
+                    ).scan()
             except CliArrError as exc:
                 logger.error(exc)
 
@@ -106,6 +186,13 @@ class Main:
             )
 
     def __sonarr_renamarr_job(self, sonarr_config):
+        self._job_runner.submit(
+            f"sonarr:renamarr:{sonarr_config.name}",
+            self.__run_sonarr_renamarr,
+            sonarr_config,
+        )
+
+    def __run_sonarr_renamarr(self, sonarr_config, series_ids=None):
         with (
             self._health_reporter.running_job(),
             logger.contextualize(service="sonarr", instance=sonarr_config.name),
@@ -115,28 +202,45 @@ class Main:
                 logger.warning(_DEPRECATED_HOURLY_JOB_WARNING)
             try:
                 try:
-                    SonarrRenamarr(
-                        name=sonarr_config.name,
-                        url=sonarr_config.url,
-                        api_key=sonarr_config.api_key,
-                        analyze_files=sonarr_config.renamarr.analyze_files,
-                        rename_folders=sonarr_config.renamarr.rename_folders,
-                    ).scan()
+                    with self._metrics.job("sonarr", sonarr_config.name, "renamarr"):
+                        renamarr = SonarrRenamarr(
+                            **renamarr_options(sonarr_config),
+                            stop_requested=self._stop_requested,
+                            sonarr_cli=self.__client(
+                                SonarrCli, "sonarr", sonarr_config
+                            ),
+                        )
+                        run_summary = (
+                            renamarr.scan()
+                            if series_ids is None
+                            else renamarr.scan_items(series_ids)
+                        )
+                    self._metrics.record_counts(
+                        "sonarr", sonarr_config.name, run_summary.as_dict()["counts"]
+                    )
                 except CliArrError as exc:
                     logger.error(exc)
+                except PlanWriteError as exc:
+                    logger.error(exc)
             finally:
                 if uses_deprecated_hourly_job:
                     logger.warning(_DEPRECATED_HOURLY_JOB_WARNING)
 
     def __schedule_radarr_renamarr(self, radarr_config):
-        self.__radarr_renamarr_job(radarr_config)
-
-        if radarr_config.renamarr.schedule.enabled:
-            schedule.every(
-                radarr_config.renamarr.schedule.interval.total_minutes
-            ).minutes.do(self.__radarr_renamarr_job, radarr_config=radarr_config)
+        self.__schedule_renamarr(
+            self.__radarr_renamarr_job,
+            radarr_config.renamarr.schedule,
+            radarr_config=radarr_config,
+        )
 
     def __radarr_renamarr_job(self, radarr_config):
+        self._job_runner.submit(
+            f"radarr:renamarr:{radarr_config.name}",
+            self.__run_radarr_renamarr,
+            radarr_config,
+        )
+
+    def __run_radarr_renamarr(self, radarr_config, movie_ids=None):
         with (
             self._health_reporter.running_job(),
             logger.contextualize(service="radarr", instance=radarr_config.name),
@@ -146,50 +250,74 @@ class Main:
                 logger.warning(_DEPRECATED_HOURLY_JOB_WARNING)
             try:
                 try:
-                    RadarrRenamarr(
-                        name=radarr_config.name,
-                        url=radarr_config.url,
-                        api_key=radarr_config.api_key,
-                        analyze_files=radarr_config.renamarr.analyze_files,
-                        rename_folders=radarr_config.renamarr.rename_folders,
-                    ).scan()
+                    with self._metrics.job("radarr", radarr_config.name, "renamarr"):
+                        renamarr = RadarrRenamarr(
+                            **renamarr_options(radarr_config),
+                            stop_requested=self._stop_requested,
+                            radarr_cli=self.__client(
+                                RadarrCli, "radarr", radarr_config
+                            ),
+                        )
+                        run_summary = (
+                            renamarr.scan()
+                            if movie_ids is None
+                            else renamarr.scan_items(movie_ids)
+                        )
+                    self._metrics.record_counts(
+                        "radarr", radarr_config.name, run_summary.as_dict()["counts"]
+                    )
                 except CliArrError as exc:
                     logger.error(exc)
+                except PlanWriteError as exc:
+                    logger.error(exc)
             finally:
                 if uses_deprecated_hourly_job:
                     logger.warning(_DEPRECATED_HOURLY_JOB_WARNING)
 
     def __schedule_sonarr_renamarr(self, sonarr_config):
-        self.__sonarr_renamarr_job(sonarr_config)
+        self.__schedule_renamarr(
+            self.__sonarr_renamarr_job,
+            sonarr_config.renamarr.schedule,
+            sonarr_config=sonarr_config,
+        )
+
+    def __schedule_renamarr(self, job, schedule_config, **job_kwargs):
+        # A start offset delays the first run, and the recurring runs with it,
+        # so instances don't all hit shared storage at the same moment. Jitter
+        # adds a random delay on top, which spreads instances restarted together
+        delay = schedule_config.start_offset_minutes * 60
+        jitter = schedule_config.jitter_minutes * 60
+        if delay or jitter:
+            first_run = schedule.every(delay)
+            if jitter:
+                first_run = first_run.to(delay + jitter)
+            first_run.seconds.do(
+                self.__start_renamarr_schedule, job, schedule_config, **job_kwargs
+            )
+        else:
+            self.__start_renamarr_schedule(job, schedule_config, **job_kwargs)
 
-        if sonarr_config.renamarr.schedule.enabled:
-            schedule.every(
-                sonarr_config.renamarr.schedule.interval.total_minutes
-            ).minutes.do(self.__sonarr_renamarr_job, sonarr_config=sonarr_config)
+    def __start_renamarr_schedule(self, job, schedule_config, **job_kwargs):
+        job(**job_kwargs)
+
+        if schedule_config.enabled:
+            interval = schedule_config.interval.total_minutes
+            jitter = schedule_config.jitter_minutes
+            recurring = schedule.every(interval - jitter)
+            if jitter:
+                recurring = recurring.to(interval + jitter)
+            recurring.minutes.do(job, **job_kwargs)
+        return schedule.CancelJob
 
     def start(self) -> None:
-        config_dir = os.getenv("CONFIG_DIR", "/")
-        try:
-            with set_directory(config_dir):
-                config = configparser.get_config(CONFIG_SCHEMA)
-        except OSError as exc:
-            logger.error(
-                f"Unable to access config directory {config_dir!r}; please check volume mount paths or set $CONFIG_DIR."
-            )
-            logger.error(exc)
-            exit(1)
-        except ConfigFileNotFoundError as exc:
-            logger.error(
-                "Unable to locate config file, please check volume mount paths or set $CONFIG_DIR. The default config directory is /config/."
-            )
-            logger.error(exc)
-            exit(1)
-        except ConfigError as exc:
-            logger.error(
-                "Unable to parse config file, Please see example config for comparison -- https://github.com/hollanbm/renamarr/blob/main/example/config.yml.example"
-            )
-            logger.error(exc)
-            exit(1)
+        config = load_config()
+        # Let running jobs finish their current item instead of being killed mid-run
+        previous_handlers = {
+            signum: signal.signal(signum, self.__handle_shutdown_signal)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+
+        metrics_server = self.__start_metrics_server()
 
         for sonarr_config in config.sonarr:
             if not (
@@ -224,22 +352,28 @@ class Main:
                         "Please see example config for comparison -- https://github.com/hollanbm/renamarr/blob/main/example/config.yml.example"
                     )
 
-        if schedule.get_jobs():
+        webhook_server = self.__start_webhook_server(config)
+
+        if schedule.get_jobs() or webhook_server:
             self._health_reporter.idle()
-            while self.RUN_SCHEDULER:
+            # A delayed one-off run leaves no jobs behind once it has run
+            while self.RUN_SCHEDULER and (schedule.get_jobs() or webhook_server):
                 self._health_reporter.heartbeat()
                 schedule.run_pending()
-                sleep(1)
-
+                if webhook_server:
+                    self.__run_webhook_jobs()
+                self.__wait_for_next_deadline()
 
-@contextmanager
-def set_directory(path):
-    oldpwd = os.getcwd()
-    os.chdir(path)
-    try:
-        yield
-    finally:
-        os.chdir(oldpwd)
+        if webhook_server:
+            webhook_server.stop()
+            self._webhook_debouncer.cancel()
+        # On SIGTERM, jobs queued behind MAX_CONCURRENT_JOBS must not start
+        self._job_runner.shutdown(cancel_pending=self._stop_requested.is_set())
+        self._client_registry.close()
+        if metrics_server:
+            metrics_server.stop()
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
 
 
 if __name__ == "__main__":  # pragma nocover
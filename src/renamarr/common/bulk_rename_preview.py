@@ -0,0 +1,106 @@
+from threading import Lock
+from weakref import WeakSet
+
+from loguru import logger
+from pycliarr.api import CliArrError
+from pycliarr.api.base_api import BaseCliApi, json_data
+
+from renamarr.common.rate_limiter import RateLimiter
+from renamarr.common.server_version import server_version
+
+BULK_PREVIEW_CHUNK_SIZE = 100
+
+_bulk_rejected: WeakSet[BaseCliApi] = WeakSet()
+_bulk_rejected_lock = Lock()
+
+
+class BulkRenamePreview:
+    """Fetch rename previews for many items per request, when the server supports it.
+
+    Support follows from the server version. A server that rejects a bulk
+    request, answers one with previews for items it was not asked about, or is
+    shown to read only the first id, is remembered as unsupported for as long as
+    its client lives.
+    """
+
+    def __init__(
+        self,
+        cli: BaseCliApi,
+        path: str,
+        item_ids_param: str,
+        item_id_field: str,
+        minimum_version: tuple[int, ...],
+        rate_limiter: RateLimiter,
+        *,
+        binds_single_id: bool = False,
+    ) -> None:
+        self.cli = cli
+        self.path = path
+        self.item_ids_param = item_ids_param
+        self.item_id_field = item_id_field
+        self.minimum_version = minimum_version
+        self.rate_limiter = rate_limiter
+        # Whether the route also accepts a lone id, which an older server binds
+        # the repeated parameter to, ignoring every id after the first
+        self.binds_single_id = binds_single_id
+
+    def fetch(self, item_ids: list[int]) -> dict[int, list[json_data]] | None:
+        """Return previews grouped by item id, or ``None`` if the server lacks bulk previews."""
+        if not self.__supported():
+            return None
+
+        previews: dict[int, list[json_data]] = {item_id: [] for item_id in item_ids}
+        try:
+            for start in range(0, len(item_ids), BULK_PREVIEW_CHUNK_SIZE):
+                chunk = item_ids[start : start + BULK_PREVIEW_CHUNK_SIZE]
+                chunk_previews = self.__request(chunk)
+                answered_ids = {
+                    preview[self.item_id_field] for preview in chunk_previews
+                }
+                if not answered_ids <= set(chunk) or self.__ignored_later_ids(
+                    chunk, answered_ids
+                ):
+                    logger.warning(
+                        "Bulk rename preview did not answer for the requested items, "
+                        "falling back to per-item previews"
+                    )
+                    self.__remember_unsupported()
+                    return None
+                for preview in chunk_previews:
+                    previews[preview[self.item_id_field]].append(preview)
+        except CliArrError as exception:
+            logger.warning(
+                "Bulk rename preview failed, falling back to per-item previews"
+            )
+            logger.warning(exception)
+            self.__remember_unsupported()
+            return None
+
+        return previews
+
+    def __request(self, item_ids: list[int]) -> list[json_data]:
+        self.rate_limiter.acquire()
+        return self.cli.request_get(
+            path=self.path, url_params={self.item_ids_param: item_ids}
+        )
+
+    def __ignored_later_ids(self, chunk: list[int], answered_ids: set[int]) -> bool:
+        # A server binding a single id answers for the first item only, which is
+        # also a normal answer when only that item has renames. Asking again in
+        # reverse tells them apart: a server reading every id answers the same.
+        if not self.binds_single_id or len(chunk) < 2 or answered_ids != {chunk[0]}:
+            return False
+        reversed_previews = self.__request(chunk[::-1])
+        return {
+            preview[self.item_id_field] for preview in reversed_previews
+        } != answered_ids
+
+    def __remember_unsupported(self) -> None:
+        with _bulk_rejected_lock:
+            _bulk_rejected.add(self.cli)
+
+    def __supported(self) -> bool:
+        with _bulk_rejected_lock:
+            if self.cli in _bulk_rejected:
+                return False
+        return server_version(self.cli) >= self.minimum_version
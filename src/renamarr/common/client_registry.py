@@ -0,0 +1,69 @@
+from threading import Lock
+from typing import Any
+
+from pycliarr.api.base_api import BaseCliApi
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT_SECONDS = 10
+DEFAULT_READ_TIMEOUT_SECONDS = 300
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout to requests sent without one.
+
+    pycliarr never passes a timeout, so without this a stalled *arr instance can
+    hang a job indefinitely.
+    """
+
+    def __init__(self, timeout: tuple[float, float], *args: Any, **kwargs: Any) -> None:
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request: Any, **kwargs: Any) -> Any:
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class ClientRegistry:
+    """Hand out one pooled *arr client per instance for the life of the process.
+
+    Scheduled runs, and different jobs for the same instance, reuse the client's
+    keep-alive connections instead of reconnecting on every run.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._clients: dict[tuple[type, str, str], BaseCliApi] = {}
+
+    def get_client(
+        self,
+        cli_class: type[BaseCliApi],
+        url: str,
+        api_key: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        connect_timeout_seconds: float = DEFAULT_CONNECT_TIMEOUT_SECONDS,
+        read_timeout_seconds: float = DEFAULT_READ_TIMEOUT_SECONDS,
+    ) -> Any:
+        """Return the shared client for an instance, creating it on first use."""
+        key = (cli_class, url, api_key)
+        with self._lock:
+            if key not in self._clients:
+                cli = cli_class(url, api_key)
+                adapter = TimeoutHTTPAdapter(
+                    (connect_timeout_seconds, read_timeout_seconds),
+                    pool_connections=1,
+                    pool_maxsize=pool_size,
+                )
+                cli._session.mount("http://", adapter)
+                cli._session.mount("https://", adapter)
+                self._clients[key] = cli
+            return self._clients[key]
+
+    def close(self) -> None:
+        """Close every pooled client session."""
+        with self._lock:
+            for cli in self._clients.values():
+                cli.close()
+            self._clients.clear()
@@ -0,0 +1,33 @@
+from loguru import logger
+from pycliarr.api.base_api import json_data
+
+from renamarr.common.command_waiter import CommandWaiter
+
+
+class CommandTracker:
+    """Defer waiting on submitted *arr commands until the end of a run.
+
+    Tracked commands keep running inside Sonarr/Radarr while renamarr moves on to
+    the next root folder, and are awaited together by ``wait_all``.
+    """
+
+    def __init__(self, command_waiter: CommandWaiter) -> None:
+        self.command_waiter = command_waiter
+        self._pending: list[tuple[json_data, str]] = []
+
+    def track(self, command: json_data, description: str) -> None:
+        """Record a submitted command to be awaited later."""
+        self._pending.append((command, description))
+
+    def wait_all(self) -> None:
+        """Wait for every tracked command and log its outcome."""
+        if not self._pending:
+            return
+
+        logger.info(f"Waiting for {len(self._pending)} deferred commands")
+        pending, self._pending = self._pending, []
+        for command, description in pending:
+            if self.command_waiter.wait(command, description).successful:
+                logger.info(f"{description} finished successfully")
+            else:
+                logger.info(f"{description} failed")
@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+from threading import Event
+from time import monotonic, sleep
+
+from loguru import logger
+from pycliarr.api.base_api import BaseCliApi, json_data
+
+DEFAULT_TIMEOUT_SECONDS = 5 * 60
+INITIAL_POLL_SECONDS = 1
+MAX_POLL_SECONDS = 10
+FINISHED_STATUSES = ("completed", "failed", "aborted", "cancelled", "orphaned")
+
+
+@dataclass()
+class CommandResult:
+    successful: bool
+    elapsed_seconds: float
+
+
+class CommandWaiter:
+    """Poll *arr commands until they finish or the deadline passes.
+
+    Polling starts at INITIAL_POLL_SECONDS and doubles up to MAX_POLL_SECONDS,
+    so quick commands return promptly without hammering the API on slow ones.
+    Setting ``stop_requested`` abandons the wait; the command itself keeps
+    running server-side.
+    """
+
+    def __init__(
+        self,
+        cli: BaseCliApi,
+        timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+        stop_requested: Event | None = None,
+    ) -> None:
+        self.cli = cli
+        self.timeout_seconds = timeout_seconds
+        self.stop_requested = stop_requested
+
+    def wait(self, command: json_data, description: str) -> CommandResult:
+        """Wait for a submitted command and return whether it succeeded."""
+        start = monotonic()
+        delay = INITIAL_POLL_SECONDS
+        resp: json_data = {}
+
+        while resp.get("status") not in FINISHED_STATUSES:
+            elapsed = monotonic() - start
+            if elapsed >= self.timeout_seconds:
+                logger.error(
+                    f"Timed out waiting for {description} command {command['id']} "
+                    f"after {self.timeout_seconds:g} seconds"
+                )
+                return CommandResult(successful=False, elapsed_seconds=elapsed)
+            if self.__sleep(min(delay, self.timeout_seconds - elapsed)):
+                logger.info(
+                    f"Shutdown requested, no longer waiting for {description} "
+                    f"command {command['id']}"
+                )
+                return CommandResult(
+                    successful=False, elapsed_seconds=monotonic() - start
+                )
+            delay = min(delay * 2, MAX_POLL_SECONDS)
+            resp = self.cli.get_command(cid=command["id"])
+
+        elapsed = monotonic() - start
+        logger.debug(
+            f"{description} command {command['id']} {resp['status']} after {elapsed:.1f} seconds"
+        )
+        return CommandResult(
+            successful=resp.get("result") == "successful", elapsed_seconds=elapsed
+        )
+
+    def __sleep(self, seconds: float) -> bool:
+        """Sleep between polls, returning True when a shutdown cut it short."""
+        if self.stop_requested is None:
+            sleep(seconds)
+            return False
+        return self.stop_requested.wait(seconds)
@@ -0,0 +1,67 @@
+import hashlib
+import json
+import sqlite3
+from collections.abc import Iterable
+
+from pycliarr.api.base_api import json_dict
+
+
+def fingerprint(value: object) -> str:
+    """Return a stable digest of JSON-serializable data."""
+    return hashlib.sha256(
+        json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()
+
+
+def item_fingerprint(item: object, fields: Iterable[str]) -> str:
+    """Return a digest of the item fields that feed the *arr folder format."""
+    return fingerprint([getattr(item, field, None) for field in fields])
+
+
+class FolderNameCache:
+    """Persist expected folder names keyed on item id and metadata fingerprint.
+
+    Cached names are discarded whenever the fingerprint of the instance's naming
+    config changes, since every expected folder name may have moved.
+    """
+
+    def __init__(
+        self, connection: sqlite3.Connection, naming_config: json_dict
+    ) -> None:
+        self._connection = connection
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS folder_names ("
+            "item_id INTEGER PRIMARY KEY, fingerprint TEXT NOT NULL, folder TEXT NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache_metadata ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+
+        naming_fingerprint = fingerprint(naming_config)
+        stored_naming_fingerprint = self._connection.execute(
+            "SELECT value FROM cache_metadata WHERE key = 'naming_fingerprint'"
+        ).fetchone()
+        if stored_naming_fingerprint != (naming_fingerprint,):
+            self._connection.execute("DELETE FROM folder_names")
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache_metadata VALUES ('naming_fingerprint', ?)",
+                (naming_fingerprint,),
+            )
+
+    def get_folder_names(self, fingerprints: dict[int, str]) -> dict[int, str]:
+        """Return cached folder names for items whose fingerprint has not moved."""
+        return {
+            item_id: folder
+            for item_id, cached_fingerprint, folder in self._connection.execute(
+                "SELECT item_id, fingerprint, folder FROM folder_names"
+            )
+            if fingerprints.get(item_id) == cached_fingerprint
+        }
+
+    def set_folder_name(self, item_id: int, item_fingerprint: str, folder: str) -> None:
+        """Store the expected folder name for an item fingerprint."""
+        self._connection.execute(
+            "INSERT OR REPLACE INTO folder_names VALUES (?, ?, ?)",
+            (item_id, item_fingerprint, folder),
+        )
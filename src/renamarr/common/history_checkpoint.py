@@ -0,0 +1,99 @@
+import sqlite3
+from collections.abc import Collection
+
+from loguru import logger
+from pycliarr.api.base_api import BaseCliApi
+
+EPOCH = "1970-01-01T00:00:00Z"
+
+
+class HistoryCheckpoint:
+    """Track the newest *arr history event handled by an instance.
+
+    ``changed_item_ids`` either returns the ids touched since the stored
+    checkpoint, or ``None`` when a full sweep is due. The advanced checkpoint is
+    only persisted by ``save``, so a failed run is retried from the old one.
+    """
+
+    def __init__(
+        self,
+        connection: sqlite3.Connection,
+        cli: BaseCliApi,
+        item_id_field: str,
+        event_types: Collection[str],
+        full_sweep_runs: int,
+    ) -> None:
+        self._connection = connection
+        self._cli = cli
+        self._item_id_field = item_id_field
+        self._event_types = event_types
+        self._full_sweep_runs = full_sweep_runs
+        self._pending: tuple[str, int, int] | None = None
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS history_checkpoint ("
+            "id INTEGER PRIMARY KEY CHECK (id = 0), date TEXT NOT NULL, "
+            "history_id INTEGER NOT NULL, runs_since_full_sweep INTEGER NOT NULL)"
+        )
+
+    def changed_item_ids(self) -> set[int] | None:
+        """Return ids with history events since the checkpoint, or ``None`` for a full sweep."""
+        checkpoint = self._connection.execute(
+            "SELECT date, history_id, runs_since_full_sweep FROM history_checkpoint"
+        ).fetchone()
+
+        if checkpoint is None:
+            logger.info("No history checkpoint found, running full sweep")
+            self.__start_full_sweep()
+            return None
+
+        date, history_id, runs_since_full_sweep = checkpoint
+        if runs_since_full_sweep + 1 >= self._full_sweep_runs:
+            logger.info("Periodic full sweep due")
+            self.__start_full_sweep()
+            return None
+
+        records = [
+            record
+            for record in self._cli.request_get(
+                path="/api/v3/history/since", url_params={"date": date}
+            )
+            if record["id"] > history_id
+        ]
+        newest = max(records, key=lambda record: record["id"], default=None)
+        self._pending = (
+            (newest["date"], newest["id"], runs_since_full_sweep + 1)
+            if newest
+            else (date, history_id, runs_since_full_sweep + 1)
+        )
+
+        changed_item_ids = {
+            record[self._item_id_field]
+            for record in records
+            if record.get("eventType") in self._event_types
+        }
+        logger.debug(f"{len(changed_item_ids)} items changed since last checkpoint")
+        return changed_item_ids
+
+    def save(self) -> None:
+        """Persist the checkpoint reached by the last ``changed_item_ids`` call."""
+        if self._pending is None:
+            return
+        self._connection.execute(
+            "INSERT OR REPLACE INTO history_checkpoint VALUES (0, ?, ?, ?)",
+            self._pending,
+        )
+        self._pending = None
+
+    def __start_full_sweep(self) -> None:
+        newest = self._cli.request_get(
+            path="/api/v3/history",
+            url_params={
+                "page": 1,
+                "pageSize": 1,
+                "sortKey": "date",
+                "sortDirection": "descending",
+            },
+        ).get("records", [])
+        self._pending = (
+            (newest[0]["date"], newest[0]["id"], 0) if newest else (EPOCH, 0, 0)
+        )
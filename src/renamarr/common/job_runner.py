@@ -0,0 +1,63 @@
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any
+
+from loguru import logger
+
+
+class JobRunner:
+    """Run instance jobs inline, or on a bounded pool of worker threads.
+
+    A job whose previous run is still in progress is skipped rather than queued,
+    so the same instance job never overlaps with itself.
+    """
+
+    def __init__(self, max_workers: int = 1) -> None:
+        self._executor = (
+            ThreadPoolExecutor(max_workers, thread_name_prefix="renamarr-job")
+            if max_workers > 1
+            else None
+        )
+        self._lock = Lock()
+        self._running: set[str] = set()
+
+    def submit(self, key: str, job: Callable[..., Any], *args: Any) -> bool:
+        """Run ``job`` unless the job identified by ``key`` is already running.
+
+        Returns False when the job was skipped.
+        """
+        with self._lock:
+            if key in self._running:
+                logger.warning(f"Skipping {key}, previous run is still in progress")
+                return False
+            self._running.add(key)
+
+        if self._executor is None:
+            try:
+                job(*args)
+            finally:
+                self.__finish(key)
+        else:
+            self._executor.submit(self.__run, key, job, *args)
+        return True
+
+    def shutdown(self, cancel_pending: bool = False) -> None:
+        """Wait for jobs already running on worker threads.
+
+        With ``cancel_pending``, jobs still queued behind the worker cap are
+        dropped instead of started.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=cancel_pending)
+
+    def __run(self, key: str, job: Callable[..., Any], *args: Any) -> None:
+        try:
+            with logger.catch(message=f"Unhandled error in {key}"):
+                job(*args)
+        finally:
+            self.__finish(key)
+
+    def __finish(self, key: str) -> None:
+        with self._lock:
+            self._running.discard(key)
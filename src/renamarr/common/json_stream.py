@@ -0,0 +1,155 @@
+import codecs
+import json
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from pycliarr.api.base_api import BaseCliApi, json_dict
+from pycliarr.api.exceptions import CliArrError, CliDecodeError, CliServerError
+from requests import RequestException
+
+from renamarr.common.run_summary import RunSummary
+
+CHUNK_SIZE = 64 * 1024
+
+_JSON_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class _ChunkReader:
+    """Text buffer over UTF-8 chunks, holding only what has not been parsed yet."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._position = 0
+        self._finished = False
+
+    def next_character(self) -> str | None:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while (
+                self._position < len(self._buffer)
+                and self._buffer[self._position] in _WHITESPACE
+            ):
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if self._finished:
+                return None
+            self.__read()
+
+    def consume(self) -> str | None:
+        """Return and consume the next non-whitespace character."""
+        character = self.next_character()
+        self._position += 1
+        return character
+
+    def decode_value(self) -> Any:
+        """Decode and consume the next JSON value."""
+        if self.next_character() is None:
+            raise CliDecodeError("JSON array ended early")
+        while True:
+            try:
+                value, end = _JSON_DECODER.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                end = None
+            # A number cut off by the chunk boundary, e.g. "1." of "1.5", still
+            # decodes, so only take a value once the separator after it arrived
+            if end is not None and (self.__separator_follows(end) or self._finished):
+                self._position = end
+                return value
+            if self._finished:
+                raise CliDecodeError(
+                    f"Invalid JSON array element {self._buffer[self._position :][:80]!r}"
+                )
+            self.__read()
+
+    def __separator_follows(self, position: int) -> bool:
+        while position < len(self._buffer) and self._buffer[position] in _WHITESPACE:
+            position += 1
+        return position < len(self._buffer) and self._buffer[position] in ",]"
+
+    def __read(self) -> None:
+        chunk = next(self._chunks, None)
+        self._finished = chunk is None
+        self._buffer = self._buffer[self._position :] + self._utf8.decode(
+            chunk or b"", final=self._finished
+        )
+        self._position = 0
+
+
+def _count_bytes(
+    chunks: Iterable[bytes], run_summary: RunSummary | None
+) -> Iterator[bytes]:
+    for chunk in chunks:
+        if run_summary is not None:
+            run_summary.count_bytes_received(len(chunk))
+        yield chunk
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Yield the elements of a UTF-8 JSON array as its bytes arrive.
+
+    Only the element being parsed and the rest of the current chunk are held in
+    memory, however long the array is.
+
+    Raises:
+        CliDecodeError: If the bytes are not a single JSON array.
+    """
+    reader = _ChunkReader(chunks)
+    if reader.consume() != "[":
+        raise CliDecodeError("Expected a JSON array")
+
+    if reader.next_character() == "]":
+        reader.consume()
+    else:
+        while True:
+            yield reader.decode_value()
+            separator = reader.consume()
+            if separator == "]":
+                break
+            if separator != ",":
+                raise CliDecodeError(
+                    f"Expected ',' or ']' in JSON array, got {separator!r}"
+                )
+
+    if reader.next_character() is not None:
+        raise CliDecodeError("Unexpected data after JSON array")
+
+
+def stream_json_array(
+    cli: BaseCliApi,
+    path: str,
+    run_summary: RunSummary | None = None,
+    params: dict[str, str] | None = None,
+) -> Iterator[json_dict]:
+    """GET a JSON array from an *arr API, yielding its elements as they download.
+
+    pycliarr reads and decodes the whole response before returning it, which
+    for the series or movie list of a large library is tens of megabytes.
+
+    Raises:
+        CliServerError: If the server responds with an error status.
+        CliArrError: If the request fails or the response is not a JSON array.
+    """
+    url = f"{cli.host_url}{path}"
+    try:
+        response = cli._session.get(url, params=params, stream=True)
+    except RequestException as error:
+        raise CliArrError(f"Error sending request {url}: {error}") from error
+
+    with response:
+        if response.status_code >= 400:
+            raise CliServerError(
+                f"Error from server {url}, status: {response.status_code}, "
+                f"msg: {response.text!r}",
+                status_code=response.status_code,
+                response=response.text,
+            )
+        try:
+            yield from iter_json_array(
+                _count_bytes(response.iter_content(CHUNK_SIZE), run_summary)
+            )
+        except RequestException as error:
+            raise CliArrError(f"Error reading response {url}: {error}") from error
@@ -0,0 +1,40 @@
+from collections.abc import Iterator
+
+from pycliarr.api.base_api import BaseCliApi, json_dict
+
+from renamarr.common.json_stream import stream_json_array
+from renamarr.common.run_summary import RunSummary
+from renamarr.common.server_version import server_version
+
+# Query flags that make a list endpoint return less, and the first server
+# version that understands them. Older servers ignore unknown query flags, so a
+# flag sent to the wrong version costs nothing but the probe.
+LIGHT_LIST_PARAMS: dict[str, tuple[tuple[int, ...], dict[str, str]]] = {
+    # Skips resolving local cover art for every movie in the library
+    "/api/v3/movie": ((5, 0, 0), {"excludeLocalCovers": "true"}),
+}
+
+
+class ListFetcher:
+    """Stream *arr list endpoints in the lightest representation the server offers.
+
+    Lists without a lighter representation are streamed as they are, which still
+    keeps fields the caller drops out of memory.
+    """
+
+    def __init__(self, cli: BaseCliApi) -> None:
+        self.cli = cli
+
+    def fetch(
+        self, path: str, run_summary: RunSummary | None = None
+    ) -> Iterator[json_dict]:
+        """Yield the elements of the list at ``path`` as they download."""
+        return stream_json_array(
+            self.cli, path, run_summary, params=self.__light_params(path)
+        )
+
+    def __light_params(self, path: str) -> dict[str, str] | None:
+        if path not in LIGHT_LIST_PARAMS:
+            return None
+        minimum_version, params = LIGHT_LIST_PARAMS[path]
+        return params if server_version(self.cli) >= minimum_version else None
@@ -0,0 +1,37 @@
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any
+
+
+def fetch_in_order(
+    fetch: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_concurrency: int = 1,
+) -> Iterator[tuple[Any, Any]]:
+    """Yield ``(item, fetch(item))`` pairs in input order.
+
+    With ``max_concurrency`` above one, fetches fan out to a bounded thread pool
+    while results are still consumed on the calling thread, so logging and any
+    follow-up requests keep the input order. Fetches run in a copy of the
+    caller's context, so a RunSummary tracking the caller counts their requests.
+    """
+    if max_concurrency <= 1:
+        for item in items:
+            yield item, fetch(item)
+        return
+
+    items = list(items)
+    context = copy_context()
+    executor = ThreadPoolExecutor(
+        max_workers=max_concurrency, thread_name_prefix="renamarr-fetch"
+    )
+    try:
+        yield from zip(
+            items,
+            executor.map(lambda item: context.copy().run(fetch, item), items),
+            strict=True,
+        )
+    finally:
+        # Abandon queued fetches when the caller stops early or a fetch fails
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,57 @@
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from loguru import logger
+
+
+class PlanWriteError(Exception):
+    """Raised when the dry-run plan file cannot be written."""
+
+
+class PlanWriter:
+    """Collect dry-run plan records and save them as NDJSON under ``PLAN_DIR``.
+
+    Each run replaces ``<service>/<instance>.ndjson``; the file is written to a
+    temporary path first, so a reader never sees a partial plan.
+    """
+
+    def __init__(self, service: str, instance_name: str) -> None:
+        plan_dir = os.getenv("PLAN_DIR", "/plans")
+        self.path = Path(plan_dir, service, f"{instance_name}.ndjson")
+        self._lock = Lock()
+        self._records: list[dict[str, Any]] = []
+
+    def write(self, record_type: str, **fields: Any) -> None:
+        """Add a planned change, or other record, to the plan."""
+        with self._lock:
+            self._records.append({"type": record_type, **fields})
+
+    def save(self) -> None:
+        """Write every record to the plan file, one JSON object per line.
+
+        Raises:
+            PlanWriteError: If the plan file cannot be written.
+        """
+        with self._lock:
+            records = list(self._records)
+
+        temporary_path = self.path.with_name(f".{self.path.name}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path.write_text(
+                "".join(
+                    json.dumps(record, separators=(",", ":")) + "\n"
+                    for record in records
+                ),
+                encoding="utf-8",
+            )
+            temporary_path.replace(self.path)
+        except OSError as exc:
+            raise PlanWriteError(
+                f"Unable to write plan file {str(self.path)!r}: {exc}"
+            ) from exc
+
+        logger.info(f"Wrote dry run plan to {str(self.path)!r}")
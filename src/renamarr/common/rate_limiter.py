@@ -0,0 +1,38 @@
+from collections.abc import Callable
+from threading import Lock
+from time import monotonic, sleep
+
+
+class RateLimiter:
+    """Space requests evenly so an instance stays under a per-second ceiling.
+
+    A ceiling of zero disables limiting. The limiter is thread safe, so one
+    instance can be shared by every worker fetching from the same *arr.
+    """
+
+    def __init__(
+        self,
+        max_requests_per_second: float = 0,
+        clock: Callable[[], float] = monotonic,
+        sleep: Callable[[float], None] = sleep,
+    ) -> None:
+        self._interval = (
+            1 / max_requests_per_second if max_requests_per_second > 0 else 0.0
+        )
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = Lock()
+        self._next_request = float("-inf")
+
+    def acquire(self) -> None:
+        """Block until the next request slot is available."""
+        if not self._interval:
+            return
+
+        with self._lock:
+            now = self._clock()
+            request_at = max(now, self._next_request)
+            self._next_request = request_at + self._interval
+
+        if request_at > now:
+            self._sleep(request_at - now)
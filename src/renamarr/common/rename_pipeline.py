@@ -0,0 +1,39 @@
+from collections.abc import Callable
+from time import monotonic
+
+from loguru import logger
+from pycliarr.api.base_api import json_data
+
+from renamarr.common.command_waiter import CommandWaiter
+
+
+class RenamePipeline:
+    """Keep one rename batch running on the *arr while the next batch is planned.
+
+    ``submit`` waits for the previous batch before sending the next one, so
+    rename commands never pile up in the *arr queue, while the rename previews
+    for the following batch are fetched as the current command runs.
+    """
+
+    def __init__(self, command_waiter: CommandWaiter) -> None:
+        self.command_waiter = command_waiter
+        self._in_flight: tuple[json_data, str, float] | None = None
+
+    def submit(self, send: Callable[[], json_data], description: str) -> None:
+        """Wait for the batch in flight, then send the next one."""
+        self.wait()
+        self._in_flight = (send(), description, monotonic())
+
+    def wait(self) -> None:
+        """Wait for the batch in flight and log how long it took."""
+        if self._in_flight is None:
+            return
+
+        command, description, submitted = self._in_flight
+        self._in_flight = None
+        result = self.command_waiter.wait(command, description)
+        elapsed = monotonic() - submitted
+        if result.successful:
+            logger.info(f"{description} finished in {elapsed:.1f} seconds")
+        else:
+            logger.error(f"{description} failed after {elapsed:.1f} seconds")
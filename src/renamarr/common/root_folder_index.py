@@ -0,0 +1,42 @@
+from collections.abc import Iterable
+
+from pycliarr.api.base_api import json_dict
+
+
+def path_parts(path: str) -> list[str]:
+    """Split a POSIX path into its components, like ``PurePosixPath.parts`` without the root."""
+    return [part for part in path.split("/") if part and part != "."]
+
+
+class RootFolderIndex:
+    """Find the deepest *arr root folder containing a path.
+
+    Root folders are stored in a trie keyed on path components, so a lookup
+    walks the path once instead of comparing it against every root folder.
+    Matching whole components keeps sibling roots with overlapping names like
+    /tv and /tv-anime apart, and nested roots like /data/media and
+    /data/media/tv resolve to the deepest match, the item's actual root folder.
+    """
+
+    def __init__(self, root_folders: Iterable[json_dict]) -> None:
+        self._trie: dict[str | None, dict] = {}
+        # Sorted so that roots spelled differently, like /tv and /tv/, resolve
+        # to the same one on every run
+        for root_folder in sorted(
+            root_folders, key=lambda root_folder: root_folder["path"]
+        ):
+            node = self._trie
+            for part in path_parts(root_folder["path"]):
+                node = node.setdefault(part, {})
+            node.setdefault(None, root_folder)
+
+    def find(self, path: str) -> json_dict | None:
+        """Return the deepest root folder equal to or containing ``path``."""
+        node = self._trie
+        root_folder = node.get(None)
+        for part in path_parts(path):
+            node = node.get(part)
+            if node is None:
+                break
+            root_folder = node.get(None, root_folder)
+        return root_folder
@@ -0,0 +1,93 @@
+import sqlite3
+from collections.abc import Callable, Iterable
+from threading import Event
+from time import time
+from typing import Any
+
+from loguru import logger
+
+RESUME_MAX_AGE_SECONDS = 24 * 60 * 60
+COMMIT_INTERVAL_SECONDS = 5
+
+
+class RunProgress:
+    """Stop a run early on shutdown, and resume where an interrupted run stopped.
+
+    With a state database, the ids each phase has finished with are journaled,
+    and committed at most every ``COMMIT_INTERVAL_SECONDS``, so the next run can
+    skip them. ``finish`` clears the journal once a run completes; a journal
+    older than ``max_age_seconds`` is discarded, as its items may have changed.
+    """
+
+    def __init__(
+        self,
+        stop_requested: Event | None = None,
+        connection: sqlite3.Connection | None = None,
+        max_age_seconds: float = RESUME_MAX_AGE_SECONDS,
+        clock: Callable[[], float] = time,
+    ) -> None:
+        self._stop_requested = stop_requested or Event()
+        self._connection = connection
+        self._clock = clock
+        self._committed_at = clock()
+        self._completed: dict[str, set[int]] = {}
+        if connection is None:
+            return
+
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS run_journal ("
+            "phase TEXT NOT NULL, item_id INTEGER NOT NULL, "
+            "recorded_at REAL NOT NULL, PRIMARY KEY (phase, item_id))"
+        )
+        journal = connection.execute(
+            "SELECT phase, item_id, recorded_at FROM run_journal"
+        ).fetchall()
+        if not journal:
+            return
+        if min(recorded_at for _, _, recorded_at in journal) < (
+            clock() - max_age_seconds
+        ):
+            logger.info("Discarding journal of an interrupted run, it is too old")
+            self.finish()
+            return
+
+        for phase, item_id, _ in journal:
+            self._completed.setdefault(phase, set()).add(item_id)
+        logger.info(f"Resuming interrupted run, skipping {len(journal)} finished items")
+
+    @property
+    def resuming(self) -> bool:
+        """Return True when this run continues an interrupted run."""
+        return bool(self._completed)
+
+    @property
+    def stop_requested(self) -> bool:
+        """Return True once shutdown has been requested."""
+        return self._stop_requested.is_set()
+
+    def pending(self, phase: str, items: list[Any]) -> list[Any]:
+        """Return the items, by ``id``, an interrupted run had not finished in ``phase``."""
+        completed = self._completed.get(phase)
+        if not completed:
+            return items
+        return [item for item in items if item.id not in completed]
+
+    def record(self, phase: str, item_ids: Iterable[int]) -> None:
+        """Journal the item ids ``phase`` has finished with."""
+        if self._connection is None:
+            return
+        recorded_at = self._clock()
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO run_journal VALUES (?, ?, ?)",
+            [(phase, item_id, recorded_at) for item_id in item_ids],
+        )
+        # Committing every item would sync the database thousands of times a run
+        if recorded_at - self._committed_at >= COMMIT_INTERVAL_SECONDS:
+            self._connection.commit()
+            self._committed_at = recorded_at
+
+    def finish(self) -> None:
+        """Clear the journal once the run has completed."""
+        if self._connection is None:
+            return
+        self._connection.execute("DELETE FROM run_journal")
@@ -0,0 +1,121 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from time import monotonic
+from typing import Any
+from weakref import WeakSet
+
+from loguru import logger
+from pycliarr.api.base_api import BaseCliApi
+
+# The RunSummary tracking requests in the current context. Each job runs on its
+# own thread, and fetch_in_order hands the caller's context to its workers
+_tracking: ContextVar[Any] = ContextVar("run_summary_tracking", default=None)
+_hooked_clients: WeakSet[BaseCliApi] = WeakSet()
+_hooked_clients_lock = Lock()
+
+
+class RunSummary:
+    """Collect phase timings, request counts and item counts for one job run.
+
+    Phase times are summed across every entry into the phase, so a phase run on
+    several fetch threads can report more time than the run's wall clock. The
+    collected numbers are logged as one record by ``log``, with the raw values
+    bound to the record as ``run_summary`` for structured sinks.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._started = monotonic()
+        self._phases: dict[str, float] = {}
+        self._counts: dict[str, int] = {}
+        self._requests = 0
+        self._bytes_received = 0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the time spent inside the block to the named phase."""
+        started = monotonic()
+        try:
+            yield
+        finally:
+            elapsed = monotonic() - started
+            with self._lock:
+                self._phases[name] = self._phases.get(name, 0) + elapsed
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Add ``amount`` to the named item counter."""
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + amount
+
+    @contextmanager
+    def track_requests(self, cli: BaseCliApi) -> Iterator[None]:
+        """Count responses, and the bytes they carry, received by ``cli`` inside the block.
+
+        Each client gets one permanent response hook, which reports to the
+        RunSummary tracking the thread that sent the request. Jobs sharing a
+        pooled client therefore only count their own requests.
+        """
+        with _hooked_clients_lock:
+            if cli not in _hooked_clients:
+                _hooked_clients.add(cli)
+                cli._session.hooks["response"].append(RunSummary.__dispatch_response)
+
+        token = _tracking.set(self)
+        try:
+            yield
+        finally:
+            _tracking.reset(token)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the collected numbers, with times rounded to milliseconds."""
+        with self._lock:
+            return {
+                "elapsed_seconds": round(monotonic() - self._started, 3),
+                "phases": {
+                    name: round(seconds, 3) for name, seconds in self._phases.items()
+                },
+                "requests": self._requests,
+                "bytes_received": self._bytes_received,
+                "counts": dict(self._counts),
+            }
+
+    def log(self) -> None:
+        """Log the summary as a single record."""
+        summary = self.as_dict()
+        message = f"Run summary: {summary['elapsed_seconds']:.1f}s total"
+        if summary["phases"]:
+            message += " | " + ", ".join(
+                f"{name} {seconds:.1f}s" for name, seconds in summary["phases"].items()
+            )
+        message += (
+            f" | {summary['requests']} requests, "
+            f"{summary['bytes_received'] / 1024:.1f} KiB received"
+        )
+        if summary["counts"]:
+            message += " | " + ", ".join(
+                f"{name} {amount}" for name, amount in summary["counts"].items()
+            )
+        logger.bind(run_summary=summary).info(message)
+
+    def count_bytes_received(self, amount: int) -> None:
+        """Add ``amount`` bytes of a streamed response body as it is read."""
+        with self._lock:
+            self._bytes_received += amount
+
+    @staticmethod
+    def __dispatch_response(
+        response: Any, *args: Any, stream: bool = False, **kwargs: Any
+    ) -> None:
+        run_summary = _tracking.get()
+        if run_summary is not None:
+            run_summary.__record_response(response, stream)
+
+    def __record_response(self, response: Any, stream: bool) -> None:
+        with self._lock:
+            self._requests += 1
+            # Reading a streamed body here would load it whole, its reader
+            # counts the bytes instead
+            if not stream:
+                self._bytes_received += len(response.content)
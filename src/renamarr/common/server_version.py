@@ -0,0 +1,34 @@
+from itertools import takewhile
+from threading import Lock
+from weakref import WeakKeyDictionary
+
+from loguru import logger
+from pycliarr.api import CliArrError
+from pycliarr.api.base_api import BaseCliApi
+
+_server_versions: WeakKeyDictionary[BaseCliApi, tuple[int, ...]] = WeakKeyDictionary()
+_server_versions_lock = Lock()
+
+
+def server_version(cli: BaseCliApi) -> tuple[int, ...]:
+    """Return the numeric parts of an *arr server's version, e.g. ``(4, 0, 5, 1710)``.
+
+    The version is probed once per client and remembered for as long as the
+    client lives, so pooled clients only probe on their first run. A server that
+    cannot be reached, or reports no version, gives ``()``, which sorts before
+    every real version.
+    """
+    with _server_versions_lock:
+        if cli not in _server_versions:
+            _server_versions[cli] = _probe(cli)
+        return _server_versions[cli]
+
+
+def _probe(cli: BaseCliApi) -> tuple[int, ...]:
+    try:
+        version = cli.get_system_status().get("version", "")
+    except CliArrError:
+        version = ""
+
+    logger.debug(f"Server version {version or 'unknown'}")
+    return tuple(int(part) for part in takewhile(str.isdigit, version.split(".")))
@@ -0,0 +1,36 @@
+import os
+import sqlite3
+from collections.abc import Generator
+from contextlib import contextmanager
+from pathlib import Path
+
+from loguru import logger
+
+
+@contextmanager
+def open_state_database(
+    service: str, instance_name: str
+) -> Generator[sqlite3.Connection | None]:
+    """Open the per-instance SQLite state database under ``CACHE_DIR``.
+
+    Yields ``None`` when the database cannot be opened, so callers can carry on
+    without persisted state. Changes are committed when the block exits cleanly.
+    """
+    cache_dir = os.getenv("CACHE_DIR", "/cache")
+    database_path = Path(cache_dir, service, f"{instance_name}.sqlite3")
+    try:
+        database_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(database_path)
+    except (OSError, sqlite3.Error) as exc:
+        logger.warning(
+            f"Unable to open state database {str(database_path)!r}; continuing without cached state."
+        )
+        logger.warning(exc)
+        yield None
+        return
+
+    try:
+        with connection:
+            yield connection
+    finally:
+        connection.close()
@@ -26,14 +26,23 @@ class HealthReporter:
         self._clock = clock
         self._heartbeat_interval = heartbeat_interval
         self._lock = Lock()
+        self._jobs_lock = Lock()
+        self._running_jobs = 0
+        self._heartbeat_stopped = Event()
+        self._heartbeat_thread: Thread | None = None
         self._state = HealthState.INITIALIZING
         self._last_heartbeat = float("-inf")
         self._write()
 
     def idle(self) -> None:
-        """Record that the application is waiting for scheduled work."""
-        self._state = HealthState.IDLE
-        self._write()
+        """Record that the application is waiting for scheduled work.
+
+        Ignored while jobs are still running on worker threads.
+        """
+        with self._jobs_lock:
+            if self._running_jobs == 0:
+                self._state = HealthState.IDLE
+                self._write()
 
     def heartbeat(self) -> None:
         """Refresh idle health when the configured interval has elapsed."""
@@ -41,25 +50,40 @@ class HealthReporter:
         if heartbeat - self._last_heartbeat >= self._heartbeat_interval:
             self._write(heartbeat)
 
+    def seconds_until_heartbeat(self) -> float:
+        """Return how long ``heartbeat`` can wait before health goes stale."""
+        return max(0.0, self._last_heartbeat + self._heartbeat_interval - self._clock())
+
     @contextmanager
     def running_job(self) -> Generator[None]:
-        """Keep health fresh while a synchronous scheduled job is running."""
-        self._state = HealthState.RUNNING
-        self._write()
-        stopped = Event()
-        heartbeat_thread = Thread(
-            target=self._heartbeat_until_stopped,
-            args=(stopped,),
-            daemon=True,
-            name="renamarr-heartbeat",
-        )
-        heartbeat_thread.start()
+        """Keep health fresh while one or more scheduled jobs are running.
+
+        Jobs may overlap on worker threads; a single heartbeat thread runs until
+        the last of them finishes.
+        """
+        with self._jobs_lock:
+            self._running_jobs += 1
+            if self._running_jobs == 1:
+                self._state = HealthState.RUNNING
+                self._write()
+                self._heartbeat_stopped = Event()
+                self._heartbeat_thread = Thread(
+                    target=self._heartbeat_until_stopped,
+                    args=(self._heartbeat_stopped,),
+                    daemon=True,
+                    name="renamarr-heartbeat",
+                )
+                self._heartbeat_thread.start()
         try:
             yield
         finally:
-            stopped.set()
-            heartbeat_thread.join()
-            self.idle()
+            with self._jobs_lock:
+                self._running_jobs -= 1
+                if self._running_jobs == 0:
+                    self._heartbeat_stopped.set()
+                    self._heartbeat_thread.join()
+                    self._state = HealthState.IDLE
+                    self._write()
 
     def _heartbeat_until_stopped(self, stopped: Event) -> None:
         while not stopped.wait(self._heartbeat_interval):
@@ -0,0 +1,220 @@
+import re
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from threading import Lock
+from time import monotonic, time
+from typing import Any
+from urllib.parse import urlsplit
+from weakref import WeakSet
+
+from pycliarr.api.base_api import BaseCliApi
+
+API_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+JOB_DURATION_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+# Item ids in *arr API paths, e.g. /api/v3/series/12/folder
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def _format_labels(label_names: tuple[str, ...], label_values: tuple[str, ...]) -> str:
+    escaped = (
+        value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for value in label_values
+    )
+    return ",".join(
+        f'{name}="{value}"' for name, value in zip(label_names, escaped, strict=True)
+    )
+
+
+def _format_value(value: float) -> str:
+    # repr keeps every significant digit; ":g" would round Unix timestamps to
+    # six digits, thousands of seconds off
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        metric_type: str,
+        label_names: tuple[str, ...],
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.metric_type = metric_type
+        self.label_names = label_names
+        self._lock = Lock()
+        self._values: dict[tuple[str, ...], Any] = {}
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.extend(self._render_sample(label_values, value))
+        return lines
+
+    def _render_sample(self, label_values: tuple[str, ...], value: Any) -> list[str]:
+        labels = _format_labels(self.label_names, label_values)
+        return [f"{self.name}{{{labels}}} {_format_value(value)}"]
+
+
+class _Counter(_Metric):
+    def __init__(
+        self, name: str, description: str, label_names: tuple[str, ...]
+    ) -> None:
+        super().__init__(name, description, "counter", label_names)
+
+    def inc(self, label_values: tuple[str, ...], amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+
+class _Gauge(_Metric):
+    def __init__(
+        self, name: str, description: str, label_names: tuple[str, ...]
+    ) -> None:
+        super().__init__(name, description, "gauge", label_names)
+
+    def set(self, label_values: tuple[str, ...], value: float) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+
+class _Histogram(_Metric):
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: tuple[str, ...],
+        buckets: tuple[float, ...],
+    ) -> None:
+        super().__init__(name, description, "histogram", label_names)
+        self.buckets = buckets
+
+    def observe(self, label_values: tuple[str, ...], value: float) -> None:
+        with self._lock:
+            bucket_counts, count, total = self._values.get(
+                label_values, ([0] * len(self.buckets), 0, 0.0)
+            )
+            for index in range(bisect_left(self.buckets, value), len(self.buckets)):
+                bucket_counts[index] += 1
+            self._values[label_values] = (bucket_counts, count + 1, total + value)
+
+    def _render_sample(
+        self, label_values: tuple[str, ...], value: tuple[list[int], int, float]
+    ) -> list[str]:
+        bucket_counts, count, total = value
+        labels = _format_labels(self.label_names, label_values)
+        lines = [
+            f'{self.name}_bucket{{{labels},le="{bucket:g}"}} {bucket_count}'
+            for bucket, bucket_count in zip(self.buckets, bucket_counts, strict=True)
+        ]
+        lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {count}')
+        lines.append(f"{self.name}_sum{{{labels}}} {_format_value(total)}")
+        lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collect renamarr metrics and render them in the Prometheus text format.
+
+    Metrics are always collected; they are only exposed when the metrics
+    server is enabled. Only the standard library is used, so the exporter
+    adds no dependencies.
+    """
+
+    def __init__(self) -> None:
+        self._instrumented: WeakSet[BaseCliApi] = WeakSet()
+        self._instrumented_lock = Lock()
+        self.api_request_duration = _Histogram(
+            "renamarr_api_request_duration_seconds",
+            "Latency of *arr API requests.",
+            ("service", "instance", "method", "endpoint"),
+            API_LATENCY_BUCKETS,
+        )
+        self.job_duration = _Histogram(
+            "renamarr_job_duration_seconds",
+            "Duration of renamarr jobs.",
+            ("service", "instance", "job"),
+            JOB_DURATION_BUCKETS,
+        )
+        self.job_failures = _Counter(
+            "renamarr_job_failures_total",
+            "Jobs that ended with an error.",
+            ("service", "instance", "job"),
+        )
+        self.job_last_success = _Gauge(
+            "renamarr_job_last_success_timestamp_seconds",
+            "Unix time of the last successful job run.",
+            ("service", "instance", "job"),
+        )
+        self.renames = _Counter(
+            "renamarr_renames_total",
+            "Episode files (Sonarr) or movies (Radarr) submitted for renaming.",
+            ("service", "instance"),
+        )
+        self.folder_moves = _Counter(
+            "renamarr_folder_moves_total",
+            "Series or movie folders moved to their expected name.",
+            ("service", "instance"),
+        )
+
+    def instrument(self, cli: BaseCliApi, service: str, instance: str) -> None:
+        """Record the latency of every request sent by ``cli``; repeat calls are ignored."""
+        with self._instrumented_lock:
+            if cli in self._instrumented:
+                return
+            self._instrumented.add(cli)
+
+        def record_response(response: Any, *args: Any, **kwargs: Any) -> None:
+            endpoint = _ID_SEGMENT.sub("/{id}", urlsplit(response.request.url).path)
+            self.api_request_duration.observe(
+                (service, instance, response.request.method, endpoint),
+                response.elapsed.total_seconds(),
+            )
+
+        cli._session.hooks["response"].append(record_response)
+
+    @contextmanager
+    def job(self, service: str, instance: str, job: str) -> Iterator[None]:
+        """Time a job run, counting it as failed if the block raises."""
+        labels = (service, instance, job)
+        started = monotonic()
+        try:
+            yield
+        except BaseException:
+            self.job_failures.inc(labels)
+            raise
+        else:
+            self.job_last_success.set(labels, time())
+        finally:
+            self.job_duration.observe(labels, monotonic() - started)
+
+    def record_counts(
+        self, service: str, instance: str, counts: dict[str, int]
+    ) -> None:
+        """Add the rename and folder move counts from a run summary."""
+        labels = (service, instance)
+        self.renames.inc(
+            labels, counts.get("renamed_files", 0) + counts.get("renamed_movies", 0)
+        )
+        self.folder_moves.inc(labels, counts.get("folder_renames", 0))
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines: list[str] = []
+        for metric in (
+            self.api_request_duration,
+            self.job_duration,
+            self.job_failures,
+            self.job_last_success,
+            self.renames,
+            self.folder_moves,
+        ):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
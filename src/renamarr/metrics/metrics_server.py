@@ -0,0 +1,53 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+from renamarr.metrics.metrics_registry import MetricsRegistry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsServer:
+    """Serve ``GET /metrics`` for a MetricsRegistry on a background thread."""
+
+    def __init__(
+        self, metrics_registry: MetricsRegistry, port: int, host: str = ""
+    ) -> None:
+        registry = metrics_registry
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                # Scrapes every few seconds would drown out the job logs
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self._server.daemon_threads = True
+        self._thread = Thread(
+            target=self._server.serve_forever, daemon=True, name="renamarr-metrics"
+        )
+
+    @property
+    def port(self) -> int:
+        """Return the bound port, useful when started on port 0."""
+        return self._server.server_address[1]
+
+    def start(self) -> None:
+        """Start serving scrapes."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving scrapes and close the listening socket."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
@@ -1,6 +1,7 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any
 
-from pycliarr.api import RadarrMovieItem
+from renamarr.radarr.models.movie_record import MovieRecord
 
 
 @dataclass()
@@ -8,32 +9,84 @@ class RootFolderRename:
     """Movies to rename under a single Radarr root folder."""
 
     root_folder_path: str
-    movies: list[RadarrMovieItem]
+    movies: list[MovieRecord]
     move_files: bool = True
+    expected_paths: dict[int, str] = field(default_factory=dict)
+    movie_ids: list[int] = field(init=False)
+    _movie_titles: str | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        self.movie_ids = [movie.id for movie in self.movies]
+
+    def add(self, movie: MovieRecord, expected_path: str | None = None) -> None:
+        """Add a movie to the group, keeping its ids current."""
+        self.movies.append(movie)
+        self.movie_ids.append(movie.id)
+        self._movie_titles = None
+        if expected_path is not None:
+            self.expected_paths[movie.id] = expected_path
+
+    @property
+    def movie_titles(self) -> str:
+        """Return a comma-separated list of movie titles, built on first use."""
+        if self._movie_titles is None:
+            self._movie_titles = ", ".join(movie.title for movie in self.movies)
+        return self._movie_titles
 
 
 class RadarrFolderRenamePlan:
-    """Plan for grouped Radarr movie folder rename operations."""
+    """Plan for grouped Radarr movie folder rename operations.
+
+    Groups are indexed by root folder path, so adding a movie is O(1). Groups
+    iterate in the order their root folders were first added.
+    """
 
     def __init__(self) -> None:
-        self.root_folder_renames: list[RootFolderRename] = []
+        self._root_folder_renames: dict[str, RootFolderRename] = {}
+
+    @property
+    def root_folder_renames(self) -> list[RootFolderRename]:
+        """Return the root folder groups in the order they were first added."""
+        return list(self._root_folder_renames.values())
 
     def has_folder_renames(self) -> bool:
-        return len(self.root_folder_renames) > 0
+        return len(self._root_folder_renames) > 0
 
-    def add_movie(self, root_folder_path: str, movie: RadarrMovieItem) -> None:
+    def add_movie(
+        self,
+        root_folder_path: str,
+        movie: MovieRecord,
+        expected_path: str | None = None,
+    ) -> None:
         """Add a movie to the folder rename group for its root folder."""
-        for root_folder_rename in self.root_folder_renames:
-            if root_folder_path == root_folder_rename.root_folder_path:
-                root_folder_rename.movies.append(movie)
-                return
-
-        self.root_folder_renames.append(RootFolderRename(root_folder_path, [movie]))
+        root_folder_rename = self._root_folder_renames.get(root_folder_path)
+        if root_folder_rename is None:
+            root_folder_rename = RootFolderRename(root_folder_path, [])
+            self._root_folder_renames[root_folder_path] = root_folder_rename
+        root_folder_rename.add(movie, expected_path)
 
     def get_movie_ids(self, root_folder_rename: RootFolderRename) -> list[int]:
         """Return movie IDs for the Radarr movie editor API payload."""
-        return [movie.id for movie in root_folder_rename.movies]
+        return root_folder_rename.movie_ids
 
     def get_movie_titles(self, root_folder_rename: RootFolderRename) -> str:
         """Return a comma-separated list of movie titles for a pending move."""
-        return ", ".join(movie.title for movie in root_folder_rename.movies)
+        return root_folder_rename.movie_titles
+
+    def get_plan_record(self, root_folder_rename: RootFolderRename) -> dict[str, Any]:
+        """Return a JSON-serializable description of a pending move."""
+        return {
+            "root_folder_path": root_folder_rename.root_folder_path,
+            "move_files": root_folder_rename.move_files,
+            "movies": [
+                {
+                    "id": movie.id,
+                    "title": movie.title,
+                    "path": movie.path,
+                    "expected_path": root_folder_rename.expected_paths.get(movie.id),
+                }
+                for movie in root_folder_rename.movies
+            ],
+        }
@@ -0,0 +1,39 @@
+from dataclasses import dataclass, field
+from typing import Any, Self
+
+from pycliarr.api.base_api import json_dict
+
+
+@dataclass(slots=True)
+class MovieRecord:
+    """The Radarr movie fields Renamarr uses.
+
+    Movie responses also carry images, ratings, alternate titles and more,
+    which would otherwise be held for the whole run. Missing fields default
+    like they do on ``RadarrMovieItem``.
+    """
+
+    id: int
+    title: str = ""
+    path: str = ""
+    original_title: str = ""
+    year: int = 0
+    imdb_id: str = ""
+    tmdb_id: int = 0
+    certification: str = ""
+    collection: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, movie: json_dict) -> Self:
+        """Project a Radarr movie response onto a record."""
+        return cls(
+            movie["id"],
+            movie.get("title", ""),
+            movie.get("path", ""),
+            movie.get("originalTitle", ""),
+            movie.get("year", 0),
+            movie.get("imdbId", ""),
+            movie.get("tmdbId", 0),
+            movie.get("certification", ""),
+            movie.get("collection", {}),
+        )
@@ -1,20 +1,26 @@
-from pycliarr.api import RadarrMovieItem
+from typing import Any
+
+from renamarr.radarr.models.movie_record import MovieRecord
 
 
 class RadarrMovieRenamePlan:
     """Plan for grouped Radarr movie file rename operations."""
 
     def __init__(self) -> None:
-        self.movies: list[RadarrMovieItem] = []
+        self.movies: list[MovieRecord] = []
 
     def has_movie_renames(self) -> bool:
         """Return whether any movies need file renames."""
         return len(self.movies) > 0
 
-    def add_movie(self, movie: RadarrMovieItem) -> None:
+    def add_movie(self, movie: MovieRecord) -> None:
         """Add a movie to the pending movie file rename operation."""
         self.movies.append(movie)
 
+    def get_movie_count(self) -> int:
+        """Return the number of movies in the pending rename operation."""
+        return len(self.movies)
+
     def get_movie_ids(self) -> list[int]:
         """Return movie IDs for the Radarr RenameMovie command payload."""
         return [movie.id for movie in self.movies]
@@ -22,3 +28,9 @@ class RadarrMovieRenamePlan:
     def get_movie_titles(self) -> str:
         """Return a comma-separated list of movie titles for logging."""
         return ", ".join(movie.title for movie in self.movies)
+
+    def get_plan_record(self) -> dict[str, Any]:
+        """Return a JSON-serializable description of the pending renames."""
+        return {
+            "movies": [{"id": movie.id, "title": movie.title} for movie in self.movies]
+        }
@@ -1,15 +1,18 @@
-from time import sleep
-
 from loguru import logger
 from pycliarr.api import RadarrCli
 from pycliarr.api.base_api import json_data
 
+from renamarr.common.command_waiter import CommandWaiter
+
 
 class AnalyzeFiles:
     """Service for refreshing Radarr media info."""
 
-    def __init__(self, radarr_cli: RadarrCli) -> None:
+    def __init__(
+        self, radarr_cli: RadarrCli, command_waiter: CommandWaiter | None = None
+    ) -> None:
         self.radarr_cli = radarr_cli
+        self.command_waiter = command_waiter or CommandWaiter(radarr_cli)
 
     def process(self) -> None:
         """Rescan Radarr files when media-info analysis is enabled."""
@@ -32,13 +35,10 @@ class AnalyzeFiles:
                 "priority": "high",
             }
         )
-        resp: json_data = {}
-
-        while resp.get("status") != "completed":
-            sleep(10)
-            resp = self.radarr_cli.get_command(cid=rescan_command["id"])
 
-        return resp["result"] == "successful"
+        return self.command_waiter.wait(
+            rescan_command, "Radarr library rescan"
+        ).successful
 
     def __analyze_files_enabled(self) -> bool:
         """Return whether Radarr's media management "Analyse files" setting is enabled."""
@@ -1,14 +1,33 @@
-import time
+import sqlite3
 from pathlib import PurePosixPath
-from time import sleep
 
 from loguru import logger
-from pycliarr.api import RadarrCli, RadarrMovieItem
+from pycliarr.api import RadarrCli
 from pycliarr.api.base_api import json_data, json_dict
 
+from renamarr.common.command_tracker import CommandTracker
+from renamarr.common.command_waiter import CommandWaiter
+from renamarr.common.folder_name_cache import FolderNameCache, item_fingerprint
+from renamarr.common.list_fetcher import ListFetcher
+from renamarr.common.ordered_fetch import fetch_in_order
+from renamarr.common.plan_writer import PlanWriter
+from renamarr.common.rate_limiter import RateLimiter
+from renamarr.common.root_folder_index import RootFolderIndex
+from renamarr.common.run_progress import RunProgress
+from renamarr.common.run_summary import RunSummary
 from renamarr.radarr.models.folder_rename_plan import RadarrFolderRenamePlan
+from renamarr.radarr.models.movie_record import MovieRecord
 
-MAX_WAIT_SECONDS = 5 * 60
+# MovieRecord fields available to the movie folder format tokens
+FOLDER_FINGERPRINT_FIELDS = (
+    "title",
+    "original_title",
+    "year",
+    "imdb_id",
+    "tmdb_id",
+    "certification",
+    "collection",
+)
 
 
 class MovieRootFolderNotFoundError(Exception):
@@ -18,144 +37,223 @@ class MovieRootFolderNotFoundError(Exception):
 class MovieFolderRename:
     """Service for renaming Radarr movie folders."""
 
-    def __init__(self, radarr_cli: RadarrCli) -> None:
+    def __init__(
+        self,
+        radarr_cli: RadarrCli,
+        *,
+        max_concurrency: int = 1,
+        rate_limiter: RateLimiter | None = None,
+        state_database: sqlite3.Connection | None = None,
+        command_waiter: CommandWaiter | None = None,
+        command_tracker: CommandTracker | None = None,
+        run_summary: RunSummary | None = None,
+        plan_writer: PlanWriter | None = None,
+        run_progress: RunProgress | None = None,
+    ) -> None:
         self.radarr_cli = radarr_cli
+        self.list_fetcher = ListFetcher(radarr_cli)
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.state_database = state_database
+        self.command_waiter = command_waiter or CommandWaiter(radarr_cli)
+        self.command_tracker = command_tracker
+        self.run_summary = run_summary or RunSummary()
+        self.plan_writer = plan_writer
+        self.run_progress = run_progress or RunProgress()
+
+    def process(self, movies: list[MovieRecord]) -> None:
+        """Rename movie folders for movies whose path differs from Radarr's expected folder.
 
-    def process(self, movies: list[RadarrMovieItem]) -> None:
-        """Rename movie folders for movies whose path differs from Radarr's expected folder."""
-        folder_rename_plan = self.__build_folder_rename_plan(movies)
+        Movies are journaled in ``run_progress`` once checked or moved. When
+        shutdown is requested, planning stops and no further folders are moved.
+        """
+        movies = self.run_progress.pending("folder_rename", movies)
+        with self.run_summary.phase("folder_plan"):
+            folder_rename_plan = self.__build_folder_rename_plan(movies)
 
         if not folder_rename_plan.has_folder_renames():
             return
 
         logger.debug("Processing pending movie folder renames")
         for root_folder_rename in folder_rename_plan.root_folder_renames:
+            if self.run_progress.stop_requested:
+                logger.info("Shutdown requested, stopping before the remaining folders")
+                break
+
             movie_titles = folder_rename_plan.get_movie_titles(root_folder_rename)
             movie_ids = folder_rename_plan.get_movie_ids(root_folder_rename)
 
             multiple_movies = len(movie_ids) > 1
+            if self.plan_writer is not None:
+                logger.info(
+                    f"Would rename Movie {'folders' if multiple_movies else 'folder'} "
+                    f"for: {movie_titles}"
+                )
+                self.run_summary.count("planned_folder_renames", len(movie_ids))
+                self.plan_writer.write(
+                    "folder_rename",
+                    **folder_rename_plan.get_plan_record(root_folder_rename),
+                )
+                continue
+
             logger.info(
                 f"Renaming Movie {'folders' if multiple_movies else 'folder'} "
                 f"for {'movies' if multiple_movies else 'movie'}: {movie_titles}"
             )
-            folder_rename_response = self.radarr_cli._session.request(
-                "PUT",
-                f"{self.radarr_cli.host_url}/api/v3/movie/editor",
-                json={
-                    "rootFolderPath": root_folder_rename.root_folder_path,
-                    "movieIds": movie_ids,
-                    "moveFiles": root_folder_rename.move_files,
-                },
-            )
+            with self.run_summary.phase("folder_editor"):
+                folder_rename_response = self.radarr_cli._session.request(
+                    "PUT",
+                    f"{self.radarr_cli.host_url}/api/v3/movie/editor",
+                    json={
+                        "rootFolderPath": root_folder_rename.root_folder_path,
+                        "movieIds": movie_ids,
+                        "moveFiles": root_folder_rename.move_files,
+                    },
+                )
             if not 200 <= folder_rename_response.status_code <= 299:
                 logger.error(
                     f"Movie folder rename failed for movies: {movie_titles}: "
                     f"status code {folder_rename_response.status_code}"
                 )
                 continue
+            self.run_summary.count("folder_renames", len(movie_ids))
+            self.run_progress.record("folder_rename", movie_ids)
 
             logger.info(f"Movie folder rename successful for movies: {movie_titles}")
             logger.info("Initiated disk scan of updated movies")
 
-            if self.__rescan_movies(movie_ids):
+            rescan_command = self.__rescan_movies(movie_ids)
+            if self.command_tracker:
+                self.command_tracker.track(rescan_command, "Radarr movie rescan")
+                continue
+
+            with self.run_summary.phase("rescan_wait"):
+                rescan_result = self.command_waiter.wait(
+                    rescan_command, "Radarr movie rescan"
+                )
+            if rescan_result.successful:
                 logger.info("disk scan finished successfully")
             else:
                 logger.info("disk scan failed")
 
     def __build_folder_rename_plan(
-        self, movies: list[RadarrMovieItem]
+        self, movies: list[MovieRecord]
     ) -> RadarrFolderRenamePlan:
         folder_rename_plan = RadarrFolderRenamePlan()
-        radarr_root_folders: list[json_dict] = sorted(
-            self.radarr_cli.get_root_folder(),
-            key=lambda root_folder: root_folder["path"],
+        # Root folders carry every unmapped folder beneath them, only keep paths
+        root_folder_index = RootFolderIndex(
+            [
+                {"path": root_folder["path"]}
+                for root_folder in self.list_fetcher.fetch(
+                    "/api/v3/rootfolder", self.run_summary
+                )
+            ]
         )
 
+        matched_movies: list[tuple[MovieRecord, json_dict]] = []
         for movie in movies:
             with logger.contextualize(item=movie.title):
-                current_movie_path = PurePosixPath(movie.path)
-
                 try:
                     movie_root_folder = self.__find_movie_root_folder(
-                        current_movie_path, radarr_root_folders
+                        movie.path, root_folder_index
                     )
                 except MovieRootFolderNotFoundError as error:
                     logger.error(str(error))
                     continue
+                matched_movies.append((movie, movie_root_folder))
 
-                expected_folder_name: str = self.radarr_cli.request_get(
-                    path=f"/api/v3/movie/{movie.id}/folder"
-                )["folder"]
-                movie_root_folder_path = movie_root_folder["path"]
+        fingerprints: dict[int, str] = {}
+        cached_folder_names: dict[int, str] = {}
+        folder_name_cache = self.__load_folder_name_cache()
+        if folder_name_cache:
+            fingerprints = {
+                movie.id: item_fingerprint(movie, FOLDER_FINGERPRINT_FIELDS)
+                for movie, _ in matched_movies
+            }
+            cached_folder_names = folder_name_cache.get_folder_names(fingerprints)
+            logger.debug(f"Using {len(cached_folder_names)} cached movie folder names")
+
+        def resolve_folder_name(match: tuple[MovieRecord, json_dict]) -> str:
+            movie = match[0]
+            if movie.id in cached_folder_names:
+                return cached_folder_names[movie.id]
+            return self.__get_expected_folder_name(movie)
+
+        # Folder lookups are the expensive part of planning, fan them out
+        for (movie, movie_root_folder), expected_folder_name in fetch_in_order(
+            resolve_folder_name, matched_movies, self.max_concurrency
+        ):
+            if self.run_progress.stop_requested:
+                logger.info("Shutdown requested, stopping folder planning")
+                break
 
+            if folder_name_cache and movie.id not in cached_folder_names:
+                folder_name_cache.set_folder_name(
+                    movie.id, fingerprints[movie.id], expected_folder_name
+                )
+
+            with logger.contextualize(item=movie.title):
+                movie_root_folder_path = movie_root_folder["path"]
                 expected_movie_folder_path = (
                     PurePosixPath(movie_root_folder_path) / expected_folder_name
                 )
 
-                if expected_movie_folder_path != current_movie_path:
-                    folder_rename_plan.add_movie(movie_root_folder_path, movie)
+                if expected_movie_folder_path != PurePosixPath(movie.path):
+                    folder_rename_plan.add_movie(
+                        movie_root_folder_path,
+                        movie,
+                        str(expected_movie_folder_path),
+                    )
                     logger.debug("added movie to pending folder_rename_plan operation")
+                else:
+                    self.run_progress.record("folder_rename", [movie.id])
 
         return folder_rename_plan
 
+    def __load_folder_name_cache(self) -> FolderNameCache | None:
+        if self.state_database is None:
+            return None
+
+        naming_config: json_dict = self.radarr_cli.request_get(
+            path="/api/v3/config/naming"
+        )
+        return FolderNameCache(self.state_database, naming_config)
+
+    def __get_expected_folder_name(self, movie: MovieRecord) -> str:
+        """Return the folder name Radarr expects for the movie."""
+        self.rate_limiter.acquire()
+        movie_folder: json_dict = self.radarr_cli.request_get(
+            path=f"/api/v3/movie/{movie.id}/folder"
+        )
+        return movie_folder["folder"]
+
     def __find_movie_root_folder(
         self,
-        current_movie_path: PurePosixPath,
-        radarr_root_folders: list[json_dict],
+        current_movie_path: str,
+        root_folder_index: RootFolderIndex,
     ) -> json_dict:
         """Return the deepest Radarr root folder matching the movie path.
 
-        PurePosixPath parent matching compares path parts, so sibling root folders
-        with overlapping names like /movies and /movies-4k do not collide. When
-        Radarr has nested roots like /data/media and /data/media/movies, both can
-        match the same movie path; the deepest match preserves the movie's actual
-        root folder.
+        Nested root folders are a valid Radarr configuration, so a movie path can
+        match more than one; the deepest match is the movie's actual root folder.
 
         Raises:
             MovieRootFolderNotFoundError: If Radarr has no root folder matching the
                 movie path.
         """
-
-        # Nested root folders are a valid Radarr configuration
-        # This makes it possible for a movie to match multiple root folders
-        # collect all matches, so that we can select the best match, instead of the first match
-        matching_root_folders: list[tuple[PurePosixPath, json_dict]] = []
-        for root_folder in radarr_root_folders:
-            root_folder_path = PurePosixPath(root_folder["path"])
-
-            if (
-                root_folder_path == current_movie_path
-                or root_folder_path in current_movie_path.parents
-            ):
-                matching_root_folders.append((root_folder_path, root_folder))
-
-        if not matching_root_folders:
+        movie_root_folder = root_folder_index.find(current_movie_path)
+        if movie_root_folder is None:
             raise MovieRootFolderNotFoundError(
                 f"Unable to determine matching Radarr root folder for movie path {current_movie_path}"
             )
+        return movie_root_folder
 
-        return max(matching_root_folders, key=lambda match: len(match[0].parts))[1]
-
-    def __rescan_movies(self, movie_ids: list[int]) -> bool:
-        """Rescan the Radarr movies that were moved."""
-        start = time.time()
-        rescan_command = self.radarr_cli._sendCommand(
+    def __rescan_movies(self, movie_ids: list[int]) -> json_data:
+        """Submit a rescan of the Radarr movies that were moved."""
+        return self.radarr_cli._sendCommand(
             {
                 "priority": "high",
                 "name": "RefreshMovie",
                 "movieIds": movie_ids,
             }
         )
-        resp: json_data = {}
-
-        while resp.get("status") != "completed":
-            if time.time() - start >= MAX_WAIT_SECONDS:
-                logger.error(
-                    f"Timed out waiting for Radarr movie rescan command {rescan_command['id']} "
-                    f"after {MAX_WAIT_SECONDS} seconds"
-                )
-                return False
-            sleep(10)
-            resp = self.radarr_cli.get_command(cid=rescan_command["id"])
-
-        return resp["result"] == "successful"
@@ -1,49 +1,159 @@
+from collections.abc import Iterable, Iterator
+from functools import partial
+
 from loguru import logger
-from pycliarr.api import RadarrCli, RadarrMovieItem
+from pycliarr.api import RadarrCli
 from pycliarr.api.base_api import json_data
 
+from renamarr.common.bulk_rename_preview import BulkRenamePreview
+from renamarr.common.command_waiter import CommandWaiter
+from renamarr.common.ordered_fetch import fetch_in_order
+from renamarr.common.plan_writer import PlanWriter
+from renamarr.common.rate_limiter import RateLimiter
+from renamarr.common.rename_pipeline import RenamePipeline
+from renamarr.common.run_progress import RunProgress
+from renamarr.common.run_summary import RunSummary
+from renamarr.radarr.models.movie_record import MovieRecord
 from renamarr.radarr.models.movie_rename_plan import RadarrMovieRenamePlan
 
+BULK_RENAME_PREVIEW_MINIMUM_VERSION = (5, 4, 0)
+
 
 class MovieRename:
     """Service for renaming Radarr movie files."""
 
-    def __init__(self, radarr_cli: RadarrCli) -> None:
+    def __init__(
+        self,
+        radarr_cli: RadarrCli,
+        *,
+        max_concurrency: int = 1,
+        rate_limiter: RateLimiter | None = None,
+        command_waiter: CommandWaiter | None = None,
+        rename_batch_size: int = 0,
+        run_summary: RunSummary | None = None,
+        plan_writer: PlanWriter | None = None,
+        run_progress: RunProgress | None = None,
+        bulk_rename_preview: bool = False,
+    ) -> None:
         self.radarr_cli = radarr_cli
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.command_waiter = command_waiter or CommandWaiter(radarr_cli)
+        self.rename_batch_size = rename_batch_size
+        self.run_summary = run_summary or RunSummary()
+        self.plan_writer = plan_writer
+        self.run_progress = run_progress or RunProgress()
+        self.bulk_preview = (
+            BulkRenamePreview(
+                radarr_cli,
+                "/api/v3/rename",
+                "movieId",
+                "movieId",
+                BULK_RENAME_PREVIEW_MINIMUM_VERSION,
+                self.rate_limiter,
+                binds_single_id=True,
+            )
+            if bulk_rename_preview
+            else None
+        )
 
-    def process(self, movies: list[RadarrMovieItem]) -> None:
-        """Rename movie files for movies with pending rename previews."""
-        movie_rename_plan = self.__build_movie_rename_plan(movies)
+    def process(self, movies: list[MovieRecord]) -> None:
+        """Rename movie files for movies with pending rename previews.
 
-        if not movie_rename_plan.has_movie_renames():
-            return
+        With ``rename_batch_size`` set, each RenameMovie command carries at most
+        that many movies and runs while the next batch is being planned. With a
+        ``plan_writer``, the renames are written to the dry run plan instead of
+        being sent. Movies are journaled in ``run_progress`` once handled, and
+        planning stops when shutdown is requested, after renaming the movies
+        already planned.
+        """
+        rename_pipeline = RenamePipeline(self.command_waiter)
+        movies = self.run_progress.pending("rename", movies)
+        for batch_number, movie_rename_plan in enumerate(
+            self.__build_movie_rename_plans(movies), start=1
+        ):
+            movie_names = movie_rename_plan.get_movie_titles()
+            if self.plan_writer is not None:
+                logger.info(f"Would rename Movies: {movie_names}")
+                self.run_summary.count(
+                    "planned_movies", movie_rename_plan.get_movie_count()
+                )
+                self.plan_writer.write(
+                    "movie_rename", **movie_rename_plan.get_plan_record()
+                )
+                continue
 
-        movie_names = movie_rename_plan.get_movie_titles()
-        logger.info(f"Renaming Movies: {movie_names}")
-        self.radarr_cli._sendCommand(
-            {
-                "name": "RenameMovie",
-                "movieIds": movie_rename_plan.get_movie_ids(),
-            }
-        )
-        logger.info(f"Movie rename successful for movies: {movie_names}")
+            logger.info(f"Renaming Movies: {movie_names}")
+            self.run_summary.count(
+                "renamed_movies", movie_rename_plan.get_movie_count()
+            )
+            with self.run_summary.phase("rename"):
+                if self.rename_batch_size == 0:
+                    self.__send_rename_command(movie_rename_plan)
+                    logger.info(f"Movie rename successful for movies: {movie_names}")
+                else:
+                    rename_pipeline.submit(
+                        partial(self.__send_rename_command, movie_rename_plan),
+                        f"Radarr rename batch {batch_number} "
+                        f"({movie_rename_plan.get_movie_count()} movies)",
+                    )
+            self.run_progress.record("rename", movie_rename_plan.get_movie_ids())
+
+        with self.run_summary.phase("rename"):
+            rename_pipeline.wait()
 
-    def __build_movie_rename_plan(
-        self, movies: list[RadarrMovieItem]
-    ) -> RadarrMovieRenamePlan:
+    def __build_movie_rename_plans(
+        self, movies: list[MovieRecord]
+    ) -> Iterator[RadarrMovieRenamePlan]:
         movie_rename_plan = RadarrMovieRenamePlan()
 
-        for movie in movies:
-            with logger.contextualize(item=movie.title):
-                files_to_rename: json_data = self.radarr_cli.request_get(
-                    path="/api/v3/rename",
-                    url_params={"movieId": movie.id},
-                )
+        for movie, files_to_rename in self.__get_rename_previews(movies):
+            if self.run_progress.stop_requested:
+                logger.info("Shutdown requested, stopping before the remaining movies")
+                break
 
+            with logger.contextualize(item=movie.title):
                 if len(files_to_rename) == 0:
                     logger.debug("Nothing to rename")
-                else:
-                    logger.debug("Found movie files to be renamed")
-                    movie_rename_plan.add_movie(movie)
+                    self.run_progress.record("rename", [movie.id])
+                    continue
+                logger.debug("Found movie files to be renamed")
+                movie_rename_plan.add_movie(movie)
+
+            if movie_rename_plan.get_movie_count() == self.rename_batch_size:
+                yield movie_rename_plan
+                movie_rename_plan = RadarrMovieRenamePlan()
+
+        if movie_rename_plan.has_movie_renames():
+            yield movie_rename_plan
+
+    def __send_rename_command(
+        self, movie_rename_plan: RadarrMovieRenamePlan
+    ) -> json_data:
+        return self.radarr_cli._sendCommand(
+            {
+                "name": "RenameMovie",
+                "movieIds": movie_rename_plan.get_movie_ids(),
+            }
+        )
+
+    def __get_rename_previews(
+        self, movies: list[MovieRecord]
+    ) -> Iterable[tuple[MovieRecord, list[json_data]]]:
+        previews = None
+        if self.bulk_preview is not None:
+            with self.run_summary.phase("rename_preview"):
+                previews = self.bulk_preview.fetch([movie.id for movie in movies])
+        if previews is None:
+            return fetch_in_order(
+                self.__get_rename_preview, movies, self.max_concurrency
+            )
+        return ((movie, previews[movie.id]) for movie in movies)
 
-        return movie_rename_plan
+    def __get_rename_preview(self, movie: MovieRecord) -> json_data:
+        self.rate_limiter.acquire()
+        with self.run_summary.phase("rename_preview"):
+            return self.radarr_cli.request_get(
+                path="/api/v3/rename",
+                url_params={"movieId": movie.id},
+            )
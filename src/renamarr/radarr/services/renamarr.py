@@ -1,10 +1,29 @@
+import sqlite3
+from collections.abc import Collection
+from contextlib import nullcontext
+from threading import Event
+
 from loguru import logger
 from pycliarr.api import RadarrCli
+from pycliarr.api.base_api import json_dict
+from pycliarr.api.exceptions import CliServerError
 
+from renamarr.common.command_tracker import CommandTracker
+from renamarr.common.command_waiter import CommandWaiter
+from renamarr.common.history_checkpoint import HistoryCheckpoint
+from renamarr.common.list_fetcher import ListFetcher
+from renamarr.common.plan_writer import PlanWriter
+from renamarr.common.rate_limiter import RateLimiter
+from renamarr.common.run_progress import RunProgress
+from renamarr.common.run_summary import RunSummary
+from renamarr.common.state_database import open_state_database
+from renamarr.radarr.models.movie_record import MovieRecord
 from renamarr.radarr.services.analyze_files import AnalyzeFiles
 from renamarr.radarr.services.movie_folder_rename import MovieFolderRename
 from renamarr.radarr.services.movie_rename import MovieRename
 
+IMPORT_EVENT_TYPES = ("downloadFolderImported", "movieFolderImported")
+
 
 class RadarrRenamarr:
     def __init__(
@@ -14,31 +33,232 @@ class RadarrRenamarr:
         api_key: str,
         analyze_files: bool = False,
         rename_folders: bool = False,
+        max_concurrency: int = 1,
+        max_requests_per_second: float = 0,
+        cache_folder_names: bool = False,
+        incremental: bool = False,
+        full_sweep_runs: int = 24,
+        command_timeout_minutes: int = 5,
+        analyze_timeout_minutes: int = 120,
+        defer_rescans: bool = False,
+        rename_batch_size: int = 0,
+        bulk_rename_preview: bool = False,
+        dry_run: bool = False,
+        stop_requested: Event | None = None,
+        radarr_cli: RadarrCli | None = None,
     ) -> None:
         self.name = name
-        self.radarr_cli = RadarrCli(url, api_key)
+        self.radarr_cli = radarr_cli or RadarrCli(url, api_key)
+        self.list_fetcher = ListFetcher(self.radarr_cli)
         self.analyze_files = analyze_files
         self.rename_folders = rename_folders
+        self.max_concurrency = max_concurrency
+        self.max_requests_per_second = max_requests_per_second
+        self.cache_folder_names = cache_folder_names
+        self.incremental = incremental
+        self.full_sweep_runs = full_sweep_runs
+        self.command_waiter = CommandWaiter(
+            self.radarr_cli, command_timeout_minutes * 60, stop_requested
+        )
+        # Library-wide analysis outlasts the rescan timeout, and renaming before it
+        # finishes would use stale media info, so it gets a deadline of its own
+        self.analyze_command_waiter = CommandWaiter(
+            self.radarr_cli, analyze_timeout_minutes * 60, stop_requested
+        )
+        self.defer_rescans = defer_rescans
+        self.rename_batch_size = rename_batch_size
+        self.bulk_rename_preview = bulk_rename_preview
+        self.dry_run = dry_run
+        self.stop_requested = stop_requested
+
+    def scan(self) -> RunSummary:
+        """Run the Radarr Renamarr workflow and return its run summary."""
+        return self.__scan(None)
+
+    def scan_items(self, movie_ids: Collection[int]) -> RunSummary:
+        """Run the workflow for only the given movies, e.g. after a webhook.
+
+        Targeted runs skip ``analyze_files`` and leave the incremental history
+        checkpoint alone, so the next scheduled run still sees every change.
+        """
+        return self.__scan(movie_ids)
 
-    def scan(self) -> None:
-        """Run the Radarr Renamarr workflow."""
+    def __scan(self, movie_ids: Collection[int] | None) -> RunSummary:
         with logger.contextualize(instance=self.name):
             logger.info("Starting Renamarr")
+            run_summary = RunSummary()
+            plan_writer = PlanWriter("radarr", self.name) if self.dry_run else None
+            if plan_writer:
+                logger.info("Dry run, planned changes will not be applied")
+            with run_summary.track_requests(self.radarr_cli):
+                self.__run(run_summary, plan_writer, movie_ids)
+            run_summary.log()
+            if plan_writer:
+                plan_writer.write("summary", **run_summary.as_dict())
+                plan_writer.save()
+            logger.info("Finished Renamarr")
+            return run_summary
 
-            if self.analyze_files:
-                AnalyzeFiles(self.radarr_cli).process()
+    def __run(
+        self,
+        run_summary: RunSummary,
+        plan_writer: PlanWriter | None,
+        movie_ids: Collection[int] | None,
+    ) -> None:
+        full_run = movie_ids is None
+        # Only full runs that change anything journal their progress
+        journal_progress = full_run and plan_writer is None
+        with (
+            open_state_database("radarr", self.name)
+            if self.cache_folder_names
+            or journal_progress
+            or (self.incremental and full_run)
+            else nullcontext()
+        ) as state_database:
+            run_progress = RunProgress(
+                self.stop_requested, state_database if journal_progress else None
+            )
+            # Analyzing files queues commands that rewrite media info, skip it when
+            # planning, when resuming a run that already analyzed them, and once
+            # shutdown was requested
+            if (
+                self.analyze_files
+                and plan_writer is None
+                and full_run
+                and not run_progress.resuming
+                and not run_progress.stop_requested
+            ):
+                with run_summary.phase("analyze"):
+                    AnalyzeFiles(self.radarr_cli, self.analyze_command_waiter).process()
 
-            movies = sorted(self.radarr_cli.get_movie(), key=lambda movie: movie.title)
-            if len(movies) == 0:
-                logger.error("Radarr returned empty movie list")
-                logger.info("Finished Renamarr")
-                return
+            history_checkpoint = (
+                HistoryCheckpoint(
+                    state_database,
+                    self.radarr_cli,
+                    "movieId",
+                    IMPORT_EVENT_TYPES,
+                    self.full_sweep_runs,
+                )
+                if self.incremental and full_run and state_database is not None
+                else None
+            )
+            self.__process(
+                state_database if self.cache_folder_names else None,
+                history_checkpoint,
+                run_summary,
+                plan_writer,
+                run_progress,
+                movie_ids,
+            )
 
-            logger.debug("Retrieved movie list")
+    def __process(
+        self,
+        state_database: sqlite3.Connection | None,
+        history_checkpoint: HistoryCheckpoint | None,
+        run_summary: RunSummary,
+        plan_writer: PlanWriter | None,
+        run_progress: RunProgress,
+        movie_ids: Collection[int] | None,
+    ) -> None:
+        if run_progress.stop_requested:
+            logger.info("Shutdown requested, skipping run")
+            return
 
-            MovieRename(self.radarr_cli).process(movies)
+        changed_movie_ids = None
+        if history_checkpoint:
+            with run_summary.phase("history"):
+                changed_movie_ids = history_checkpoint.changed_item_ids()
+        if changed_movie_ids is not None and len(changed_movie_ids) == 0:
+            logger.info("No movies changed since last run")
+            if plan_writer is None:
+                history_checkpoint.save()
+            return
 
-            if self.rename_folders:
-                MovieFolderRename(self.radarr_cli).process(movies)
+        with run_summary.phase("movie_list"):
+            movies = self.__get_movies(movie_ids, run_summary)
+        if len(movies) == 0:
+            logger.error("Radarr returned empty movie list")
+            return
 
-            logger.info("Finished Renamarr")
+        logger.debug("Retrieved movie list")
+
+        if changed_movie_ids is not None:
+            movies = [movie for movie in movies if movie.id in changed_movie_ids]
+            logger.info(f"Incremental run, processing {len(movies)} changed movies")
+        elif movie_ids is not None:
+            logger.info(f"Targeted run, processing {len(movies)} movies")
+
+        run_summary.count("movies", len(movies))
+        rate_limiter = RateLimiter(self.max_requests_per_second)
+        MovieRename(
+            self.radarr_cli,
+            max_concurrency=self.max_concurrency,
+            rate_limiter=rate_limiter,
+            command_waiter=self.command_waiter,
+            rename_batch_size=self.rename_batch_size,
+            run_summary=run_summary,
+            plan_writer=plan_writer,
+            run_progress=run_progress,
+            bulk_rename_preview=self.bulk_rename_preview,
+        ).process(movies)
+
+        command_tracker = (
+            CommandTracker(self.command_waiter) if self.defer_rescans else None
+        )
+        if self.rename_folders:
+            MovieFolderRename(
+                self.radarr_cli,
+                max_concurrency=self.max_concurrency,
+                rate_limiter=rate_limiter,
+                state_database=state_database,
+                command_waiter=self.command_waiter,
+                command_tracker=command_tracker,
+                run_summary=run_summary,
+                plan_writer=plan_writer,
+                run_progress=run_progress,
+            ).process(movies)
+
+        if command_tracker:
+            with run_summary.phase("rescan_wait"):
+                command_tracker.wait_all()
+
+        # An interrupted run keeps its journal and checkpoint, so the next run
+        # resumes from here
+        if run_progress.stop_requested:
+            logger.info("Stopped before finishing the run")
+            return
+        run_progress.finish()
+
+        # A dry run leaves the checkpoint in place so the real run sees the same changes
+        if history_checkpoint and plan_writer is None:
+            history_checkpoint.save()
+
+    def __get_movies(
+        self, movie_ids: Collection[int] | None, run_summary: RunSummary
+    ) -> list[MovieRecord]:
+        # The full list is streamed and projected onto compact records as it
+        # downloads, so neither the response body nor the full movie objects
+        # are ever held whole
+        if movie_ids is None:
+            movies = [
+                MovieRecord.from_dict(movie)
+                for movie in self.list_fetcher.fetch("/api/v3/movie", run_summary)
+            ]
+        else:
+            movies = [
+                MovieRecord.from_dict(item)
+                for movie_id in sorted(movie_ids)
+                if (item := self.__get_movie_item(movie_id)) is not None
+            ]
+        return sorted(movies, key=lambda movie: movie.title)
+
+    def __get_movie_item(self, movie_id: int) -> json_dict | None:
+        # An item deleted after its webhook fired must not abort the rest of
+        # the targeted run
+        try:
+            return self.radarr_cli.get_item(movie_id)
+        except CliServerError as error:
+            if error.status_code != 404:
+                raise
+            logger.warning(f"Movie {movie_id} no longer exists, skipping")
+            return None
@@ -1,3 +1,5 @@
+from typing import Any
+
 from renamarr.sonarr.models.episode_rename import EpisodeRename
 
 
@@ -31,3 +33,16 @@ class SonarrEpisodeRenamePlan:
             for rename in self.files_to_rename
         ]
         return ", ".join(episode_list)
+
+    def get_plan_record(self) -> dict[str, Any]:
+        """Return a JSON-serializable description of the pending renames."""
+        return {
+            "episode_files": [
+                {
+                    "file_id": rename.file_id,
+                    "season_number": rename.season_number,
+                    "episode_numbers": rename.episode_numbers,
+                }
+                for rename in self.files_to_rename
+            ]
+        }
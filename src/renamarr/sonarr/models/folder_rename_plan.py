@@ -1,6 +1,7 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any
 
-from pycliarr.api import SonarrSerieItem
+from renamarr.sonarr.models.series_record import SeriesRecord
 
 
 @dataclass()
@@ -8,33 +9,85 @@ class RootFolderRename:
     """Series to rename under a single Sonarr root folder."""
 
     root_folder_path: str
-    series: list[SonarrSerieItem]
+    series: list[SeriesRecord]
     move_files: bool = True
+    expected_paths: dict[int, str] = field(default_factory=dict)
+    series_ids: list[int] = field(init=False)
+    _series_titles: str | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        self.series_ids = [series.id for series in self.series]
+
+    def add(self, series: SeriesRecord, expected_path: str | None = None) -> None:
+        """Add a series to the group, keeping its ids current."""
+        self.series.append(series)
+        self.series_ids.append(series.id)
+        self._series_titles = None
+        if expected_path is not None:
+            self.expected_paths[series.id] = expected_path
+
+    @property
+    def series_titles(self) -> str:
+        """Return a comma-separated list of series titles, built on first use."""
+        if self._series_titles is None:
+            self._series_titles = ", ".join(series.title for series in self.series)
+        return self._series_titles
 
 
 class SonarrFolderRenamePlan:
-    """Plan for grouped Sonarr series folder rename operations."""
+    """Plan for grouped Sonarr series folder rename operations.
+
+    Groups are indexed by root folder path, so adding a series is O(1). Groups
+    iterate in the order their root folders were first added.
+    """
 
     def __init__(self) -> None:
-        self.root_folder_renames: list[RootFolderRename] = []
+        self._root_folder_renames: dict[str, RootFolderRename] = {}
+
+    @property
+    def root_folder_renames(self) -> list[RootFolderRename]:
+        """Return the root folder groups in the order they were first added."""
+        return list(self._root_folder_renames.values())
 
     def has_folder_renames(self) -> bool:
         """Return whether any series folders need renames."""
-        return len(self.root_folder_renames) > 0
+        return len(self._root_folder_renames) > 0
 
-    def add_series(self, root_folder_path: str, series: SonarrSerieItem) -> None:
+    def add_series(
+        self,
+        root_folder_path: str,
+        series: SeriesRecord,
+        expected_path: str | None = None,
+    ) -> None:
         """Add a series to the folder rename group for its root folder."""
-        for root_folder_rename in self.root_folder_renames:
-            if root_folder_path == root_folder_rename.root_folder_path:
-                root_folder_rename.series.append(series)
-                return
-
-        self.root_folder_renames.append(RootFolderRename(root_folder_path, [series]))
+        root_folder_rename = self._root_folder_renames.get(root_folder_path)
+        if root_folder_rename is None:
+            root_folder_rename = RootFolderRename(root_folder_path, [])
+            self._root_folder_renames[root_folder_path] = root_folder_rename
+        root_folder_rename.add(series, expected_path)
 
     def get_series_ids(self, root_folder_rename: RootFolderRename) -> list[int]:
         """Return series IDs for the Sonarr series editor API payload."""
-        return [series.id for series in root_folder_rename.series]
+        return root_folder_rename.series_ids
 
     def get_series_titles(self, root_folder_rename: RootFolderRename) -> str:
         """Return a comma-separated list of series titles for a pending move."""
-        return ", ".join(series.title for series in root_folder_rename.series)
+        return root_folder_rename.series_titles
+
+    def get_plan_record(self, root_folder_rename: RootFolderRename) -> dict[str, Any]:
+        """Return a JSON-serializable description of a pending move."""
+        return {
+            "root_folder_path": root_folder_rename.root_folder_path,
+            "move_files": root_folder_rename.move_files,
+            "series": [
+                {
+                    "id": series.id,
+                    "title": series.title,
+                    "path": series.path,
+                    "expected_path": root_folder_rename.expected_paths.get(series.id),
+                }
+                for series in root_folder_rename.series
+            ],
+        }
@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from typing import Self
+
+from pycliarr.api.base_api import json_dict
+
+
+@dataclass(slots=True)
+class SeriesRecord:
+    """The Sonarr series fields Renamarr uses.
+
+    Series responses also carry images, seasons, statistics and more, which
+    would otherwise be held for the whole run. Missing fields default like they
+    do on ``SonarrSerieItem``.
+    """
+
+    id: int
+    title: str = ""
+    path: str = ""
+    year: int = 0
+    tvdb_id: int = 0
+    tv_maze_id: int = 0
+    imdb_id: str = ""
+    status: str = ""
+
+    @classmethod
+    def from_dict(cls, series: json_dict) -> Self:
+        """Project a Sonarr series response onto a record."""
+        return cls(
+            series["id"],
+            series.get("title", ""),
+            series.get("path", ""),
+            series.get("year", 0),
+            series.get("tvdbId", 0),
+            series.get("tvMazeId", 0),
+            series.get("imdbId", ""),
+            series.get("status", ""),
+        )
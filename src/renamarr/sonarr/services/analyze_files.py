@@ -1,15 +1,18 @@
-from time import sleep
-
 from loguru import logger
 from pycliarr.api import SonarrCli
 from pycliarr.api.base_api import json_data
 
+from renamarr.common.command_waiter import CommandWaiter
+
 
 class AnalyzeFiles:
     """Service for refreshing Sonarr media info."""
 
-    def __init__(self, sonarr_cli: SonarrCli) -> None:
+    def __init__(
+        self, sonarr_cli: SonarrCli, command_waiter: CommandWaiter | None = None
+    ) -> None:
         self.sonarr_cli = sonarr_cli
+        self.command_waiter = command_waiter or CommandWaiter(sonarr_cli)
 
     def process(self) -> None:
         """Rescan Sonarr files when media-info analysis is enabled."""
@@ -32,13 +35,10 @@ class AnalyzeFiles:
                 "priority": "high",
             }
         )
-        resp: json_data = {}
-
-        while resp.get("status") != "completed":
-            sleep(10)
-            resp = self.sonarr_cli.get_command(cid=rescan_command["id"])
 
-        return resp["result"] == "successful"
+        return self.command_waiter.wait(
+            rescan_command, "Sonarr library rescan"
+        ).successful
 
     def __analyze_files_enabled(self) -> bool:
         """Return whether Sonarr's media management "Analyse files" setting is enabled."""
@@ -1,14 +1,25 @@
-import time
+import sqlite3
 from pathlib import PurePosixPath
-from time import sleep
 
 from loguru import logger
-from pycliarr.api import SonarrCli, SonarrSerieItem
+from pycliarr.api import SonarrCli
 from pycliarr.api.base_api import json_data, json_dict
 
+from renamarr.common.command_tracker import CommandTracker
+from renamarr.common.command_waiter import CommandWaiter
+from renamarr.common.folder_name_cache import FolderNameCache, item_fingerprint
+from renamarr.common.list_fetcher import ListFetcher
+from renamarr.common.ordered_fetch import fetch_in_order
+from renamarr.common.plan_writer import PlanWriter
+from renamarr.common.rate_limiter import RateLimiter
+from renamarr.common.root_folder_index import RootFolderIndex
+from renamarr.common.run_progress import RunProgress
+from renamarr.common.run_summary import RunSummary
 from renamarr.sonarr.models.folder_rename_plan import SonarrFolderRenamePlan
+from renamarr.sonarr.models.series_record import SeriesRecord
 
-MAX_WAIT_SECONDS = 5 * 60
+# SeriesRecord fields available to the series folder format tokens
+FOLDER_FINGERPRINT_FIELDS = ("title", "year", "tvdb_id", "tv_maze_id", "imdb_id")
 
 
 class SeriesRootFolderNotFoundError(Exception):
@@ -18,131 +29,211 @@ class SeriesRootFolderNotFoundError(Exception):
 class SeriesFolderRename:
     """Service for renaming Sonarr series folders."""
 
-    def __init__(self, sonarr_cli: SonarrCli) -> None:
+    def __init__(
+        self,
+        sonarr_cli: SonarrCli,
+        *,
+        max_concurrency: int = 1,
+        rate_limiter: RateLimiter | None = None,
+        state_database: sqlite3.Connection | None = None,
+        command_waiter: CommandWaiter | None = None,
+        command_tracker: CommandTracker | None = None,
+        run_summary: RunSummary | None = None,
+        plan_writer: PlanWriter | None = None,
+        run_progress: RunProgress | None = None,
+    ) -> None:
         self.sonarr_cli = sonarr_cli
-
-    def process(self, series: list[SonarrSerieItem]) -> None:
-        """Rename series folders whose path differs from Sonarr's expected folder."""
-        folder_rename_plan = self.__build_folder_rename_plan(series)
+        self.list_fetcher = ListFetcher(sonarr_cli)
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.state_database = state_database
+        self.command_waiter = command_waiter or CommandWaiter(sonarr_cli)
+        self.command_tracker = command_tracker
+        self.run_summary = run_summary or RunSummary()
+        self.plan_writer = plan_writer
+        self.run_progress = run_progress or RunProgress()
+
+    def process(self, series: list[SeriesRecord]) -> None:
+        """Rename series folders whose path differs from Sonarr's expected folder.
+
+        Series are journaled in ``run_progress`` once checked or moved. When
+        shutdown is requested, planning stops and no further folders are moved.
+        """
+        series = self.run_progress.pending("folder_rename", series)
+        with self.run_summary.phase("folder_plan"):
+            folder_rename_plan = self.__build_folder_rename_plan(series)
 
         if not folder_rename_plan.has_folder_renames():
             return
 
         logger.debug("Processing pending series folder renames")
         for root_folder_rename in folder_rename_plan.root_folder_renames:
+            if self.run_progress.stop_requested:
+                logger.info("Shutdown requested, stopping before the remaining folders")
+                break
+
             series_titles = folder_rename_plan.get_series_titles(root_folder_rename)
             series_ids = folder_rename_plan.get_series_ids(root_folder_rename)
 
             multiple_series = len(series_ids) > 1
+            if self.plan_writer is not None:
+                logger.info(
+                    f"Would rename Series {'folders' if multiple_series else 'folder'} "
+                    f"for: {series_titles}"
+                )
+                self.run_summary.count("planned_folder_renames", len(series_ids))
+                self.plan_writer.write(
+                    "folder_rename",
+                    **folder_rename_plan.get_plan_record(root_folder_rename),
+                )
+                continue
+
             logger.info(
                 f"Renaming Series {'folders' if multiple_series else 'folder'} "
                 f"for: {series_titles}"
             )
-            self.sonarr_cli.request_put(
-                path="/api/v3/series/editor",
-                json_data={
-                    "rootFolderPath": root_folder_rename.root_folder_path,
-                    "seriesIds": series_ids,
-                    "moveFiles": root_folder_rename.move_files,
-                },
-            )
+            with self.run_summary.phase("folder_editor"):
+                self.sonarr_cli.request_put(
+                    path="/api/v3/series/editor",
+                    json_data={
+                        "rootFolderPath": root_folder_rename.root_folder_path,
+                        "seriesIds": series_ids,
+                        "moveFiles": root_folder_rename.move_files,
+                    },
+                )
+            self.run_summary.count("folder_renames", len(series_ids))
+            self.run_progress.record("folder_rename", series_ids)
 
             logger.info(f"Series folder rename successful for series: {series_titles}")
             logger.info("Initiated disk scan of updated series")
-            if self.__rescan_series(series_ids):
+            rescan_command = self.__rescan_series(series_ids)
+            if self.command_tracker:
+                self.command_tracker.track(rescan_command, "Sonarr series rescan")
+                continue
+
+            with self.run_summary.phase("rescan_wait"):
+                rescan_result = self.command_waiter.wait(
+                    rescan_command, "Sonarr series rescan"
+                )
+            if rescan_result.successful:
                 logger.info("disk scan finished successfully")
             else:
                 logger.info("disk scan failed")
 
     def __build_folder_rename_plan(
-        self, series: list[SonarrSerieItem]
+        self, series: list[SeriesRecord]
     ) -> SonarrFolderRenamePlan:
         folder_rename_plan = SonarrFolderRenamePlan()
-        sonarr_root_folders: list[json_dict] = sorted(
-            self.sonarr_cli.get_root_folder(),
-            key=lambda root_folder: root_folder["path"],
+        # Root folders carry every unmapped folder beneath them, only keep paths
+        root_folder_index = RootFolderIndex(
+            [
+                {"path": root_folder["path"]}
+                for root_folder in self.list_fetcher.fetch(
+                    "/api/v3/rootfolder", self.run_summary
+                )
+            ]
         )
 
+        matched_series: list[tuple[SeriesRecord, json_dict]] = []
         for show in series:
             with logger.contextualize(item=show.title):
-                current_series_path = PurePosixPath(show.path)
-
                 try:
                     series_root_folder = self.__find_series_root_folder(
-                        current_series_path, sonarr_root_folders
+                        show.path, root_folder_index
                     )
                 except SeriesRootFolderNotFoundError as error:
                     logger.error(str(error))
                     continue
+                matched_series.append((show, series_root_folder))
+
+        fingerprints: dict[int, str] = {}
+        cached_folder_names: dict[int, str] = {}
+        folder_name_cache = self.__load_folder_name_cache()
+        if folder_name_cache:
+            fingerprints = {
+                show.id: item_fingerprint(show, FOLDER_FINGERPRINT_FIELDS)
+                for show, _ in matched_series
+            }
+            cached_folder_names = folder_name_cache.get_folder_names(fingerprints)
+            logger.debug(f"Using {len(cached_folder_names)} cached series folder names")
+
+        def resolve_folder_name(match: tuple[SeriesRecord, json_dict]) -> str:
+            show = match[0]
+            if show.id in cached_folder_names:
+                return cached_folder_names[show.id]
+            return self.__get_expected_folder_name(show)
+
+        # Folder lookups are the expensive part of planning, fan them out
+        for (show, series_root_folder), expected_folder_name in fetch_in_order(
+            resolve_folder_name, matched_series, self.max_concurrency
+        ):
+            if self.run_progress.stop_requested:
+                logger.info("Shutdown requested, stopping folder planning")
+                break
+
+            if folder_name_cache and show.id not in cached_folder_names:
+                folder_name_cache.set_folder_name(
+                    show.id, fingerprints[show.id], expected_folder_name
+                )
 
-                expected_folder_name: str = self.sonarr_cli.request_get(
-                    path=f"/api/v3/series/{show.id}/folder"
-                )["folder"]
+            with logger.contextualize(item=show.title):
                 series_root_folder_path = series_root_folder["path"]
                 expected_series_folder_path = (
                     PurePosixPath(series_root_folder_path) / expected_folder_name
                 )
 
-                if expected_series_folder_path != current_series_path:
-                    folder_rename_plan.add_series(series_root_folder_path, show)
+                if expected_series_folder_path != PurePosixPath(show.path):
+                    folder_rename_plan.add_series(
+                        series_root_folder_path,
+                        show,
+                        str(expected_series_folder_path),
+                    )
                     logger.debug("added series to pending folder_rename_plan operation")
+                else:
+                    self.run_progress.record("folder_rename", [show.id])
 
         return folder_rename_plan
 
+    def __load_folder_name_cache(self) -> FolderNameCache | None:
+        if self.state_database is None:
+            return None
+
+        naming_config: json_dict = self.sonarr_cli.request_get(
+            path="/api/v3/config/naming"
+        )
+        return FolderNameCache(self.state_database, naming_config)
+
+    def __get_expected_folder_name(self, show: SeriesRecord) -> str:
+        """Return the folder name Sonarr expects for the series."""
+        self.rate_limiter.acquire()
+        series_folder: json_dict = self.sonarr_cli.request_get(
+            path=f"/api/v3/series/{show.id}/folder"
+        )
+        return series_folder["folder"]
+
     def __find_series_root_folder(
         self,
-        current_series_path: PurePosixPath,
-        sonarr_root_folders: list[json_dict],
+        current_series_path: str,
+        root_folder_index: RootFolderIndex,
     ) -> json_dict:
         """Return the deepest Sonarr root folder matching the series path.
 
-        PurePosixPath parent matching compares path parts, so sibling root folders
-        with overlapping names like /tv and /tv-anime do not collide. When Sonarr
-        has nested roots like /data/media and /data/media/tv, both can match the
-        same series path; the deepest match preserves the series' actual root
-        folder.
+        Nested root folders are a valid Sonarr configuration, so a series path can
+        match more than one; the deepest match is the series' actual root folder.
 
         Raises:
             SeriesRootFolderNotFoundError: If Sonarr has no root folder matching the
                 series path.
         """
-
-        # Nested root folders are a valid Sonarr configuration
-        # This makes it possible for a single series to match multiple root folders
-        # collect all matches, so that we can select the best match, instead of the first match
-        matching_root_folders: list[tuple[PurePosixPath, json_dict]] = []
-        for root_folder in sonarr_root_folders:
-            root_folder_path = PurePosixPath(root_folder["path"])
-
-            if (
-                root_folder_path == current_series_path
-                or root_folder_path in current_series_path.parents
-            ):
-                matching_root_folders.append((root_folder_path, root_folder))
-
-        if not matching_root_folders:
+        series_root_folder = root_folder_index.find(current_series_path)
+        if series_root_folder is None:
             raise SeriesRootFolderNotFoundError(
                 f"Unable to determine matching Sonarr root folder for series path {current_series_path}"
             )
+        return series_root_folder
 
-        return max(matching_root_folders, key=lambda match: len(match[0].parts))[1]
-
-    def __rescan_series(self, series_ids: list[int]) -> bool:
-        """Rescan the Sonarr series library after folder moves."""
-        start = time.time()
-        rescan_command = self.sonarr_cli._sendCommand(
+    def __rescan_series(self, series_ids: list[int]) -> json_data:
+        """Submit a rescan of the Sonarr series library after folder moves."""
+        return self.sonarr_cli._sendCommand(
             {"name": "RescanSeries", "priority": "high", "seriesIds": series_ids}
         )
-        resp: json_data = {}
-
-        while resp.get("status") != "completed":
-            if time.time() - start >= MAX_WAIT_SECONDS:
-                logger.error(
-                    f"Timed out waiting for Sonarr series rescan command {rescan_command['id']} "
-                    f"after {MAX_WAIT_SECONDS} seconds"
-                )
-                return False
-            sleep(10)
-            resp = self.sonarr_cli.get_command(cid=rescan_command["id"])
-
-        return resp["result"] == "successful"
@@ -1,27 +1,85 @@
+from collections.abc import Iterable
+from functools import partial
+
 from loguru import logger
-from pycliarr.api import SonarrCli, SonarrSerieItem
+from pycliarr.api import SonarrCli
 from pycliarr.api.base_api import json_data
 
+from renamarr.common.bulk_rename_preview import BulkRenamePreview
+from renamarr.common.command_waiter import CommandWaiter
+from renamarr.common.ordered_fetch import fetch_in_order
+from renamarr.common.plan_writer import PlanWriter
+from renamarr.common.rate_limiter import RateLimiter
+from renamarr.common.rename_pipeline import RenamePipeline
+from renamarr.common.run_progress import RunProgress
+from renamarr.common.run_summary import RunSummary
 from renamarr.sonarr.models.episode_rename_plan import SonarrEpisodeRenamePlan
+from renamarr.sonarr.models.series_record import SeriesRecord
+
+BULK_RENAME_PREVIEW_MINIMUM_VERSION = (4, 0, 5)
 
 
 class SeriesRename:
     """Service for renaming Sonarr episode files."""
 
-    def __init__(self, sonarr_cli: SonarrCli) -> None:
+    def __init__(
+        self,
+        sonarr_cli: SonarrCli,
+        *,
+        max_concurrency: int = 1,
+        rate_limiter: RateLimiter | None = None,
+        command_waiter: CommandWaiter | None = None,
+        rename_batch_size: int = 0,
+        run_summary: RunSummary | None = None,
+        plan_writer: PlanWriter | None = None,
+        run_progress: RunProgress | None = None,
+        bulk_rename_preview: bool = False,
+    ) -> None:
         self.sonarr_cli = sonarr_cli
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.command_waiter = command_waiter or CommandWaiter(sonarr_cli)
+        self.rename_batch_size = rename_batch_size
+        self.run_summary = run_summary or RunSummary()
+        self.plan_writer = plan_writer
+        self.run_progress = run_progress or RunProgress()
+        self.bulk_preview = (
+            BulkRenamePreview(
+                sonarr_cli,
+                "/api/v3/rename/bulk",
+                "seriesIds",
+                "seriesId",
+                BULK_RENAME_PREVIEW_MINIMUM_VERSION,
+                self.rate_limiter,
+            )
+            if bulk_rename_preview
+            else None
+        )
 
-    def process(self, series: list[SonarrSerieItem]) -> None:
-        """Rename episode files for series with pending rename previews."""
-        for show in series:
-            with logger.contextualize(item=show.title):
-                episodes_to_rename: list[json_data] = self.sonarr_cli.request_get(
-                    path="/api/v3/rename",
-                    url_params={"seriesId": show.id},
-                )
+    def process(self, series: list[SeriesRecord]) -> None:
+        """Rename episode files for series with pending rename previews.
 
+        With ``bulk_rename_preview`` set, rename previews are fetched in bulk when
+        the server supports it, and otherwise with up to ``max_concurrency``
+        concurrent requests; renames and log lines still follow the series order.
+        With ``rename_batch_size`` set, each RenameFiles command carries at most
+        that many files and runs while the next batch is being planned. With a
+        ``plan_writer``, the renames are written to the dry run plan instead of
+        being sent. Series are journaled in ``run_progress`` once handled, and the
+        loop stops when shutdown is requested.
+        """
+        rename_pipeline = RenamePipeline(self.command_waiter)
+        batch_number = 0
+        series = self.run_progress.pending("rename", series)
+        for show, episodes_to_rename in self.__get_rename_previews(series):
+            if self.run_progress.stop_requested:
+                logger.info("Shutdown requested, stopping before the remaining series")
+                break
+
+            with logger.contextualize(item=show.title):
                 if len(episodes_to_rename) == 0:
                     logger.debug("No episodes to rename")
+                    self.run_progress.record("rename", [show.id])
                     continue
 
                 episode_rename_plan = SonarrEpisodeRenamePlan()
@@ -33,7 +91,53 @@ class SeriesRename:
                         episode_numbers=episode["episodeNumbers"],
                     )
 
+                file_ids = episode_rename_plan.get_file_ids()
+                if self.plan_writer is not None:
+                    logger.info(f"Would rename {episode_rename_plan.get_log_message()}")
+                    self.run_summary.count("planned_files", len(file_ids))
+                    self.plan_writer.write(
+                        "episode_rename",
+                        series_id=show.id,
+                        series_title=show.title,
+                        **episode_rename_plan.get_plan_record(),
+                    )
+                    continue
+
                 logger.info(f"Renaming {episode_rename_plan.get_log_message()}")
-                self.sonarr_cli.rename_files(
-                    episode_rename_plan.get_file_ids(), show.id
-                )
+                self.run_summary.count("renamed_files", len(file_ids))
+                with self.run_summary.phase("rename"):
+                    if self.rename_batch_size == 0:
+                        self.sonarr_cli.rename_files(file_ids, show.id)
+                    else:
+                        for start in range(0, len(file_ids), self.rename_batch_size):
+                            batch = file_ids[start : start + self.rename_batch_size]
+                            batch_number += 1
+                            rename_pipeline.submit(
+                                partial(self.sonarr_cli.rename_files, batch, show.id),
+                                f"Sonarr rename batch {batch_number} ({len(batch)} files)",
+                            )
+                self.run_progress.record("rename", [show.id])
+
+        with self.run_summary.phase("rename"):
+            rename_pipeline.wait()
+
+    def __get_rename_previews(
+        self, series: list[SeriesRecord]
+    ) -> Iterable[tuple[SeriesRecord, list[json_data]]]:
+        previews = None
+        if self.bulk_preview is not None:
+            with self.run_summary.phase("rename_preview"):
+                previews = self.bulk_preview.fetch([show.id for show in series])
+        if previews is None:
+            return fetch_in_order(
+                self.__get_rename_preview, series, self.max_concurrency
+            )
+        return ((show, previews[show.id]) for show in series)
+
+    def __get_rename_preview(self, show: SeriesRecord) -> list[json_data]:
+        self.rate_limiter.acquire()
+        with self.run_summary.phase("rename_preview"):
+            return self.sonarr_cli.request_get(
+                path="/api/v3/rename",
+                url_params={"seriesId": show.id},
+            )
@@ -1,16 +1,32 @@
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 
 from dateutil import parser
 from loguru import logger
-from pycliarr.api import SonarrCli
+from pycliarr.api import CliArrError, SonarrCli
 from pycliarr.api.base_api import json_data
 
+from renamarr.common.list_fetcher import ListFetcher
+from renamarr.common.run_summary import RunSummary
+from renamarr.sonarr.models.series_record import SeriesRecord
+
 
 class SonarrSeriesScanner:
-    def __init__(self, name: str, url: str, api_key: str, hours_before_air: int):
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        api_key: str,
+        hours_before_air: int,
+        sonarr_cli: SonarrCli | None = None,
+        use_calendar: bool = False,
+        calendar_lookback_days: int = 7,
+    ):
         self.name = name
-        self.sonarr_cli = SonarrCli(url, api_key)
+        self.sonarr_cli = sonarr_cli or SonarrCli(url, api_key)
+        self.list_fetcher = ListFetcher(self.sonarr_cli)
         self.hours_before_air = min(hours_before_air, 12)
+        self.use_calendar = use_calendar
+        self.calendar_lookback_days = calendar_lookback_days
 
     def scan(self) -> None:
         with logger.contextualize(instance=self.name):
@@ -25,46 +41,120 @@ class SonarrSeriesScanner:
 
             logger.info("Starting Series Scan")
 
-            series = self.sonarr_cli.get_serie()
+            run_summary = RunSummary()
+            with run_summary.track_requests(self.sonarr_cli):
+                if not (self.use_calendar and self.__scan_calendar(run_summary)):
+                    self.__scan_series(run_summary)
 
-            if len(series) == 0:
-                logger.error("Sonarr returned empty series list")
-            else:
-                logger.debug("Retrieved series list")
+            run_summary.log()
+            logger.info("Finished Series Scan")
 
-            for show in sorted(series, key=lambda s: s.title):
-                with logger.contextualize(item=show.title):
-                    if show.status.lower() == "continuing":
+    def __scan_series(self, run_summary: RunSummary) -> None:
+        """Check the episode list of every continuing series for TBA titles."""
+        with run_summary.phase("series_list"):
+            series = [
+                SeriesRecord.from_dict(show)
+                for show in self.list_fetcher.fetch("/api/v3/series", run_summary)
+            ]
+
+        if len(series) == 0:
+            logger.error("Sonarr returned empty series list")
+        else:
+            logger.debug("Retrieved series list")
+
+        for show in sorted(series, key=lambda s: s.title):
+            with logger.contextualize(item=show.title):
+                if show.status.lower() == "continuing":
+                    run_summary.count("series")
+                    with run_summary.phase("episode_list"):
                         episode_list = self.sonarr_cli.get_episode(show.id)
 
-                        if len(episode_list) == 0:
-                            logger.error("Error fetching episode list")
-                            continue
-                        else:
-                            logger.debug("Retrieved episode list")
-
-                        for episode in self.__filter_episode_list(episode_list):
-                            episode_air_date_utc = parser.parse(
-                                episode["airDateUtc"]
-                            ).astimezone(UTC)
-
-                            if self.__is_episode_airing_soon(episode_air_date_utc):
-                                logger.info(
-                                    f"Found TBA episode, airing within the next {self.hours_before_air} hours"
-                                )
-                                self.sonarr_cli.refresh_serie(show.id)
-                                logger.info("Series rescan triggered")
-                                break
-                            elif self.__has_episode_already_aired(episode_air_date_utc):
-                                logger.info(
-                                    "Found previously aired episode with TBA title"
-                                )
-                                self.sonarr_cli.refresh_serie(show.id)
-                                logger.info("Series rescan triggered")
-                                break
-                        logger.debug("Finished Processing")
+                    if len(episode_list) == 0:
+                        logger.error("Error fetching episode list")
+                        continue
+                    else:
+                        logger.debug("Retrieved episode list")
 
-            logger.info("Finished Series Scan")
+                    if self.__refresh_if_tba_episode_due(
+                        show.id, self.__filter_episode_list(episode_list)
+                    ):
+                        run_summary.count("refreshed_series")
+                    logger.debug("Finished Processing")
+
+    def __scan_calendar(self, run_summary: RunSummary) -> bool:
+        """Find TBA episodes with a single calendar request.
+
+        Covers episodes that aired within calendar_lookback_days, or air within
+        hours_before_air. Returns False when the calendar cannot be queried, so
+        the caller can fall back to the per-series scan.
+        """
+        now = datetime.now(UTC)
+        try:
+            with run_summary.phase("calendar"):
+                calendar: list[json_data] = self.sonarr_cli.request_get(
+                    path="/api/v3/calendar",
+                    url_params={
+                        "start": (
+                            now - timedelta(days=self.calendar_lookback_days)
+                        ).isoformat(),
+                        "end": (
+                            now + timedelta(hours=self.hours_before_air)
+                        ).isoformat(),
+                        "unmonitored": "true",
+                        "includeSeries": "true",
+                    },
+                )
+        except CliArrError as exc:
+            logger.warning(
+                "Unable to query Sonarr calendar, falling back to per-series scan"
+            )
+            logger.warning(exc)
+            return False
+
+        logger.debug("Retrieved calendar")
+
+        tba_episodes: dict[int, tuple[str, list[json_data]]] = {}
+        for episode in self.__filter_episode_list(calendar):
+            series = episode.get("series") or {}
+            if series.get("status", "").lower() == "continuing":
+                tba_episodes.setdefault(
+                    episode["seriesId"], (series.get("title", ""), [])
+                )[1].append(episode)
+
+        for series_id, (title, episode_list) in sorted(
+            tba_episodes.items(), key=lambda item: item[1][0]
+        ):
+            run_summary.count("series")
+            with logger.contextualize(item=title):
+                if self.__refresh_if_tba_episode_due(series_id, episode_list):
+                    run_summary.count("refreshed_series")
+
+        return True
+
+    def __refresh_if_tba_episode_due(
+        self, series_id: int, episode_list: list[json_data]
+    ) -> bool:
+        """Refresh the series once if any TBA episode has aired or airs soon.
+
+        Returns True when the series was refreshed.
+        """
+        for episode in episode_list:
+            episode_air_date_utc = parser.parse(episode["airDateUtc"]).astimezone(UTC)
+
+            if self.__is_episode_airing_soon(episode_air_date_utc):
+                logger.info(
+                    f"Found TBA episode, airing within the next {self.hours_before_air} hours"
+                )
+                self.sonarr_cli.refresh_serie(series_id)
+                logger.info("Series rescan triggered")
+                return True
+            elif self.__has_episode_already_aired(episode_air_date_utc):
+                logger.info("Found previously aired episode with TBA title")
+                self.sonarr_cli.refresh_serie(series_id)
+                logger.info("Series rescan triggered")
+                return True
+
+        return False
 
     # Filter episode list, so it only contains episodes with TBA title
     def __filter_episode_list(self, episode_list):
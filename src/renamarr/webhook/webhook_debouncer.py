@@ -0,0 +1,64 @@
+from collections.abc import Callable
+from threading import Lock, Timer
+from time import monotonic
+
+
+class WebhookDebouncer:
+    """Batch webhook item ids per instance until events stop arriving.
+
+    An instance's ids are flushed ``delay_seconds`` after its latest event, and
+    never later than ``max_delay_seconds`` after its first pending event, so a
+    season pack import becomes one targeted run. ``flush`` runs on a timer
+    thread, so it should only hand the ids off.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[str, str, set[int]], None],
+        delay_seconds: float = 30,
+        max_delay_seconds: float = 300,
+    ) -> None:
+        self.flush = flush
+        self.delay_seconds = delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self._lock = Lock()
+        self._pending: dict[tuple[str, str], set[int]] = {}
+        self._first_event: dict[tuple[str, str], float] = {}
+        self._timers: dict[tuple[str, str], Timer] = {}
+
+    def add(self, service: str, instance: str, item_ids: set[int]) -> None:
+        """Queue item ids for an instance and restart its flush timer."""
+        key = (service, instance)
+        now = monotonic()
+        with self._lock:
+            self._pending.setdefault(key, set()).update(item_ids)
+            first_event = self._first_event.setdefault(key, now)
+            delay = min(
+                self.delay_seconds,
+                max(0, first_event + self.max_delay_seconds - now),
+            )
+
+            timer = self._timers.pop(key, None)
+            if timer:
+                timer.cancel()
+            timer = Timer(delay, self.__flush, (key,))
+            timer.daemon = True
+            self._timers[key] = timer
+            timer.start()
+
+    def cancel(self) -> None:
+        """Drop every pending flush."""
+        with self._lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+            self._pending.clear()
+            self._first_event.clear()
+
+    def __flush(self, key: tuple[str, str]) -> None:
+        with self._lock:
+            item_ids = self._pending.pop(key, set())
+            self._first_event.pop(key, None)
+            self._timers.pop(key, None)
+        if item_ids:
+            self.flush(*key, item_ids)
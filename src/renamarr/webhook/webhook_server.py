@@ -0,0 +1,143 @@
+import json
+from base64 import b64decode
+from binascii import Error as Base64Error
+from collections.abc import Callable
+from hmac import compare_digest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from loguru import logger
+
+MAX_BODY_BYTES = 1024 * 1024
+
+# Event types that can leave a file or folder misnamed, and the payload key
+# holding the affected item. On Import and On Upgrade both send "Download".
+WEBHOOK_EVENTS: dict[str, tuple[str, tuple[str, ...]]] = {
+    "sonarr": ("series", ("Download", "SeriesAdd")),
+    "radarr": ("movie", ("Download", "MovieAdded")),
+}
+
+
+def webhook_item_id(service: str, payload: Any) -> int | None:
+    """Return the series or movie id a webhook payload asks to rename, if any."""
+    item_key, event_types = WEBHOOK_EVENTS[service]
+    if not isinstance(payload, dict) or payload.get("eventType") not in event_types:
+        return None
+
+    item = payload.get(item_key)
+    item_id = item.get("id") if isinstance(item, dict) else None
+    return item_id if isinstance(item_id, int) else None
+
+
+class WebhookServer:
+    """Accept Sonarr and Radarr webhooks at ``POST /webhook/<service>/<instance>``.
+
+    A request is accepted when it carries the instance API key, either as the
+    ``apikey`` query parameter or as the basic auth password. Each event that
+    can need a rename is passed to ``on_event`` with the service, instance name
+    and item id; other events, like the connection test, are acknowledged and
+    ignored.
+    """
+
+    def __init__(
+        self,
+        api_keys: dict[tuple[str, str], str],
+        on_event: Callable[[str, str, int], None],
+        port: int,
+        host: str = "",
+    ) -> None:
+        class WebhookHandler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                url = urlsplit(self.path)
+                segments = [unquote(segment) for segment in url.path.split("/")[1:]]
+                if len(segments) != 3 or segments[0] != "webhook":
+                    self.send_error(404)
+                    return
+
+                _, service, instance = segments
+                api_key = api_keys.get((service, instance))
+                if api_key is None:
+                    self.send_error(404)
+                    return
+                if not self.__authorized(api_key, url.query):
+                    self.send_error(401)
+                    return
+
+                try:
+                    content_length = int(self.headers.get("Content-Length") or 0)
+                except ValueError:
+                    content_length = -1
+                if content_length < 0:
+                    self.send_error(400)
+                    return
+                if content_length > MAX_BODY_BYTES:
+                    self.send_error(413)
+                    return
+                try:
+                    payload = json.loads(self.rfile.read(content_length))
+                except ValueError:
+                    self.send_error(400)
+                    return
+
+                item_id = webhook_item_id(service, payload)
+                if item_id is None:
+                    with logger.contextualize(instance=instance):
+                        logger.debug(
+                            f"Ignoring webhook event {payload.get('eventType')!r}"
+                            if isinstance(payload, dict)
+                            else "Ignoring webhook payload"
+                        )
+                    self.__respond(200)
+                    return
+
+                on_event(service, instance, item_id)
+                self.__respond(202)
+
+            def __authorized(self, api_key: str, query: str) -> bool:
+                for supplied in parse_qs(query).get("apikey", []):
+                    if compare_digest(supplied.encode(), api_key.encode()):
+                        return True
+
+                scheme, _, credentials = (
+                    self.headers.get("Authorization") or ""
+                ).partition(" ")
+                if scheme.lower() != "basic":
+                    return False
+                try:
+                    decoded = b64decode(credentials, validate=True)
+                except Base64Error:
+                    return False
+                password = decoded.partition(b":")[2]
+                return compare_digest(password, api_key.encode())
+
+            def __respond(self, status: int) -> None:
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format: str, *args: object) -> None:
+                # Accepted events are logged by the jobs they trigger
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), WebhookHandler)
+        self._server.daemon_threads = True
+        self._thread = Thread(
+            target=self._server.serve_forever, daemon=True, name="renamarr-webhook"
+        )
+
+    @property
+    def port(self) -> int:
+        """Return the bound port, useful when started on port 0."""
+        return self._server.server_address[1]
+
+    def start(self) -> None:
+        """Start accepting webhooks."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop accepting webhooks and close the listening socket."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
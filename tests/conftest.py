@@ -3,33 +3,41 @@ from unittest.mock import MagicMock
 
 import pytest
 from loguru import logger
-from pycliarr.api import RadarrCli, RadarrMovieItem, SonarrCli, SonarrSerieItem
 from pycliarr.api.base_api import json_data
 from pytest_mock import MockerFixture
 
+from renamarr.common.list_fetcher import ListFetcher
+
+
+@pytest.fixture
+def continuing_series_list(mocker) -> None:
+    mocker.patch.object(ListFetcher, "fetch").return_value = [
+        {"id": 1, "title": "test title", "status": "continuing"}
+    ]
+
 
 @pytest.fixture
-def get_serie(mocker) -> None:
-    series: list[SonarrSerieItem] = [
-        SonarrSerieItem(id=1, title="test title", status="continuing")
+def series_list(mocker) -> None:
+    mocker.patch.object(ListFetcher, "fetch").return_value = [
+        {"id": 1, "title": "test title"}
     ]
-    mocker.patch.object(SonarrCli, "get_serie").return_value = series
 
 
 @pytest.fixture
-def get_serie_empty(mocker) -> None:
-    mocker.patch.object(SonarrCli, "get_serie").return_value = []
+def series_list_empty(mocker) -> None:
+    mocker.patch.object(ListFetcher, "fetch").return_value = []
 
 
 @pytest.fixture
-def get_movie(mocker) -> None:
-    movies: list[RadarrMovieItem] = [RadarrMovieItem(id=1, title="test title")]
-    mocker.patch.object(RadarrCli, "get_movie").return_value = movies
+def movie_list(mocker) -> None:
+    mocker.patch.object(ListFetcher, "fetch").return_value = [
+        {"id": 1, "title": "test title"}
+    ]
 
 
 @pytest.fixture
-def get_movie_empty(mocker) -> None:
-    mocker.patch.object(RadarrCli, "get_movie").return_value = []
+def movie_list_empty(mocker) -> None:
+    mocker.patch.object(ListFetcher, "fetch").return_value = []
 
 
 @pytest.fixture
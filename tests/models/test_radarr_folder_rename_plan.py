@@ -1,6 +1,8 @@
-from pycliarr.api import RadarrMovieItem
-
-from renamarr.radarr.models.folder_rename_plan import RadarrFolderRenamePlan
+from renamarr.radarr.models.folder_rename_plan import (
+    RadarrFolderRenamePlan,
+    RootFolderRename,
+)
+from renamarr.radarr.models.movie_record import MovieRecord
 
 
 def test_has_folder_renames_returns_false_when_empty() -> None:
@@ -11,7 +13,7 @@ def test_has_folder_renames_returns_false_when_empty() -> None:
 
 def test_add_movie_creates_root_folder_rename_and_reports_pending() -> None:
     folder_rename_plan = RadarrFolderRenamePlan()
-    movie = RadarrMovieItem(id=10, title="Movie")
+    movie = MovieRecord(id=10, title="Movie")
 
     folder_rename_plan.add_movie("/root", movie)
 
@@ -25,8 +27,8 @@ def test_add_movie_creates_root_folder_rename_and_reports_pending() -> None:
 
 def test_add_movie_appends_movie_to_existing_root_folder_rename() -> None:
     folder_rename_plan = RadarrFolderRenamePlan()
-    movie_a = RadarrMovieItem(id=10, title="Movie A")
-    movie_b = RadarrMovieItem(id=20, title="Movie B")
+    movie_a = MovieRecord(id=10, title="Movie A")
+    movie_b = MovieRecord(id=20, title="Movie B")
     folder_rename_plan.add_movie("/root", movie_a)
 
     folder_rename_plan.add_movie("/root", movie_b)
@@ -37,8 +39,8 @@ def test_add_movie_appends_movie_to_existing_root_folder_rename() -> None:
 
 def test_add_movie_creates_new_root_folder_rename_when_root_differs() -> None:
     folder_rename_plan = RadarrFolderRenamePlan()
-    movie_a = RadarrMovieItem(id=1, title="Movie A")
-    movie_b = RadarrMovieItem(id=2, title="Movie B")
+    movie_a = MovieRecord(id=1, title="Movie A")
+    movie_b = MovieRecord(id=2, title="Movie B")
     folder_rename_plan.add_movie("/root", movie_a)
 
     folder_rename_plan.add_movie("/other", movie_b)
@@ -50,8 +52,8 @@ def test_add_movie_creates_new_root_folder_rename_when_root_differs() -> None:
 
 def test_get_movie_ids_returns_root_folder_rename_movie_ids() -> None:
     folder_rename_plan = RadarrFolderRenamePlan()
-    folder_rename_plan.add_movie("/root", RadarrMovieItem(id=10, title="Movie A"))
-    folder_rename_plan.add_movie("/root", RadarrMovieItem(id=20, title="Movie B"))
+    folder_rename_plan.add_movie("/root", MovieRecord(id=10, title="Movie A"))
+    folder_rename_plan.add_movie("/root", MovieRecord(id=20, title="Movie B"))
 
     assert folder_rename_plan.get_movie_ids(
         folder_rename_plan.root_folder_renames[0]
@@ -60,10 +62,45 @@ def test_get_movie_ids_returns_root_folder_rename_movie_ids() -> None:
 
 def test_get_movie_titles_returns_root_folder_rename_movie_titles() -> None:
     folder_rename_plan = RadarrFolderRenamePlan()
-    folder_rename_plan.add_movie("/root", RadarrMovieItem(id=10, title="Movie A"))
-    folder_rename_plan.add_movie("/root", RadarrMovieItem(id=20, title="Movie B"))
+    folder_rename_plan.add_movie("/root", MovieRecord(id=10, title="Movie A"))
+    folder_rename_plan.add_movie("/root", MovieRecord(id=20, title="Movie B"))
 
     assert (
         folder_rename_plan.get_movie_titles(folder_rename_plan.root_folder_renames[0])
         == "Movie A, Movie B"
     )
+
+
+def test_root_folder_renames_keep_first_added_order_when_interleaved() -> None:
+    folder_rename_plan = RadarrFolderRenamePlan()
+    folder_rename_plan.add_movie("/root", MovieRecord(id=10, title="Movie A"))
+    folder_rename_plan.add_movie("/other", MovieRecord(id=20, title="Movie B"))
+    folder_rename_plan.add_movie("/root", MovieRecord(id=30, title="Movie C"))
+
+    assert [
+        (root_folder_rename.root_folder_path, root_folder_rename.movie_ids)
+        for root_folder_rename in folder_rename_plan.root_folder_renames
+    ] == [("/root", [10, 30]), ("/other", [20])]
+
+
+def test_get_movie_titles_is_rebuilt_after_adding_movies() -> None:
+    folder_rename_plan = RadarrFolderRenamePlan()
+    folder_rename_plan.add_movie("/root", MovieRecord(id=10, title="Movie A"))
+    root_folder_rename = folder_rename_plan.root_folder_renames[0]
+    assert folder_rename_plan.get_movie_titles(root_folder_rename) == "Movie A"
+    assert root_folder_rename.movie_titles is root_folder_rename.movie_titles
+
+    folder_rename_plan.add_movie("/root", MovieRecord(id=20, title="Movie B"))
+
+    assert folder_rename_plan.get_movie_titles(root_folder_rename) == "Movie A, Movie B"
+
+
+def test_root_folder_rename_precomputes_ids_of_initial_movies() -> None:
+    root_folder_rename = RootFolderRename(
+        "/root", [MovieRecord(id=10, title="Movie A")]
+    )
+
+    root_folder_rename.add(MovieRecord(id=20, title="Movie B"), "/root/Movie B")
+
+    assert root_folder_rename.movie_ids == [10, 20]
+    assert root_folder_rename.expected_paths == {20: "/root/Movie B"}
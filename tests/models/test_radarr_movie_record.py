@@ -0,0 +1,58 @@
+from pycliarr.api import RadarrMovieItem
+
+from renamarr.common.folder_name_cache import item_fingerprint
+from renamarr.radarr.models.movie_record import MovieRecord
+from renamarr.radarr.services.movie_folder_rename import FOLDER_FINGERPRINT_FIELDS
+
+MOVIE = {
+    "id": 1,
+    "title": "Movie",
+    "path": "/movies/Movie",
+    "originalTitle": "Film",
+    "year": 2020,
+    "imdbId": "tt30",
+    "tmdbId": 40,
+    "certification": "PG",
+    "collection": {"title": "Movies", "tmdbId": 50},
+    "images": [{"coverType": "poster"}],
+    "ratings": {"imdb": {"value": 7.5}},
+}
+
+
+def test_from_dict_keeps_only_the_fields_renamarr_uses() -> None:
+    movie = MovieRecord.from_dict(MOVIE)
+
+    assert movie == MovieRecord(
+        1,
+        "Movie",
+        "/movies/Movie",
+        "Film",
+        2020,
+        "tt30",
+        40,
+        "PG",
+        {"title": "Movies", "tmdbId": 50},
+    )
+    assert not hasattr(movie, "__dict__")
+
+
+def test_from_dict_defaults_missing_fields() -> None:
+    assert MovieRecord.from_dict({"id": 1}) == MovieRecord(1, "", "", "", 0, "", 0, "")
+
+
+def test_folder_fingerprint_matches_radarr_movie_item() -> None:
+    # Folder names cached from full RadarrMovieItem objects stay valid
+    legacy_fields = (
+        "title",
+        "originalTitle",
+        "year",
+        "imdbId",
+        "tmdbId",
+        "certification",
+        "collection",
+    )
+
+    for movie in (MOVIE, {"id": 1}):
+        assert item_fingerprint(
+            MovieRecord.from_dict(movie), FOLDER_FINGERPRINT_FIELDS
+        ) == item_fingerprint(RadarrMovieItem.from_dict(movie), legacy_fields)
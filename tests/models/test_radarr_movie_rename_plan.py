@@ -1,5 +1,4 @@
-from pycliarr.api import RadarrMovieItem
-
+from renamarr.radarr.models.movie_record import MovieRecord
 from renamarr.radarr.models.movie_rename_plan import RadarrMovieRenamePlan
 
 
@@ -11,7 +10,7 @@ def test_has_movie_renames_returns_false_when_empty() -> None:
 
 def test_add_movie_stores_movie_and_reports_pending() -> None:
     movie_rename_plan = RadarrMovieRenamePlan()
-    movie = RadarrMovieItem(id=10, title="Movie")
+    movie = MovieRecord(id=10, title="Movie")
 
     movie_rename_plan.add_movie(movie)
 
@@ -21,15 +20,15 @@ def test_add_movie_stores_movie_and_reports_pending() -> None:
 
 def test_get_movie_ids_returns_pending_movie_ids() -> None:
     movie_rename_plan = RadarrMovieRenamePlan()
-    movie_rename_plan.add_movie(RadarrMovieItem(id=10, title="Movie A"))
-    movie_rename_plan.add_movie(RadarrMovieItem(id=20, title="Movie B"))
+    movie_rename_plan.add_movie(MovieRecord(id=10, title="Movie A"))
+    movie_rename_plan.add_movie(MovieRecord(id=20, title="Movie B"))
 
     assert movie_rename_plan.get_movie_ids() == [10, 20]
 
 
 def test_get_movie_titles_returns_pending_movie_titles() -> None:
     movie_rename_plan = RadarrMovieRenamePlan()
-    movie_rename_plan.add_movie(RadarrMovieItem(id=10, title="Movie A"))
-    movie_rename_plan.add_movie(RadarrMovieItem(id=20, title="Movie B"))
+    movie_rename_plan.add_movie(MovieRecord(id=10, title="Movie A"))
+    movie_rename_plan.add_movie(MovieRecord(id=20, title="Movie B"))
 
     assert movie_rename_plan.get_movie_titles() == "Movie A, Movie B"
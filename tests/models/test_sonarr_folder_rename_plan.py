@@ -1,10 +1,12 @@
-from pycliarr.api import SonarrSerieItem
+from renamarr.sonarr.models.folder_rename_plan import (
+    RootFolderRename,
+    SonarrFolderRenamePlan,
+)
+from renamarr.sonarr.models.series_record import SeriesRecord
 
-from renamarr.sonarr.models.folder_rename_plan import SonarrFolderRenamePlan
 
-
-def make_series(series_id: int, title: str) -> SonarrSerieItem:
-    return SonarrSerieItem(id=series_id, title=title)
+def make_series(series_id: int, title: str) -> SeriesRecord:
+    return SeriesRecord(id=series_id, title=title)
 
 
 def test_has_folder_renames_returns_false_when_empty() -> None:
@@ -71,3 +73,36 @@ def test_get_series_titles_returns_root_folder_rename_series_titles() -> None:
         folder_rename_plan.get_series_titles(folder_rename_plan.root_folder_renames[0])
         == "Show A, Show B"
     )
+
+
+def test_root_folder_renames_keep_first_added_order_when_interleaved() -> None:
+    folder_rename_plan = SonarrFolderRenamePlan()
+    folder_rename_plan.add_series("/root", make_series(10, "Show A"))
+    folder_rename_plan.add_series("/other", make_series(20, "Show B"))
+    folder_rename_plan.add_series("/root", make_series(30, "Show C"))
+
+    assert [
+        (root_folder_rename.root_folder_path, root_folder_rename.series_ids)
+        for root_folder_rename in folder_rename_plan.root_folder_renames
+    ] == [("/root", [10, 30]), ("/other", [20])]
+
+
+def test_get_series_titles_is_rebuilt_after_adding_series() -> None:
+    folder_rename_plan = SonarrFolderRenamePlan()
+    folder_rename_plan.add_series("/root", make_series(10, "Show A"))
+    root_folder_rename = folder_rename_plan.root_folder_renames[0]
+    assert folder_rename_plan.get_series_titles(root_folder_rename) == "Show A"
+    assert root_folder_rename.series_titles is root_folder_rename.series_titles
+
+    folder_rename_plan.add_series("/root", make_series(20, "Show B"))
+
+    assert folder_rename_plan.get_series_titles(root_folder_rename) == "Show A, Show B"
+
+
+def test_root_folder_rename_precomputes_ids_of_initial_series() -> None:
+    root_folder_rename = RootFolderRename("/root", [make_series(10, "Show A")])
+
+    root_folder_rename.add(make_series(20, "Show B"), "/root/Show B")
+
+    assert root_folder_rename.series_ids == [10, 20]
+    assert root_folder_rename.expected_paths == {20: "/root/Show B"}
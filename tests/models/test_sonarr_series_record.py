@@ -0,0 +1,41 @@
+from pycliarr.api import SonarrSerieItem
+
+from renamarr.common.folder_name_cache import item_fingerprint
+from renamarr.sonarr.models.series_record import SeriesRecord
+from renamarr.sonarr.services.series_folder_rename import FOLDER_FINGERPRINT_FIELDS
+
+SERIES = {
+    "id": 1,
+    "title": "Show",
+    "path": "/tv/Show",
+    "year": 2020,
+    "tvdbId": 10,
+    "tvMazeId": 20,
+    "imdbId": "tt30",
+    "status": "continuing",
+    "images": [{"coverType": "poster"}],
+    "statistics": {"episodeCount": 10},
+}
+
+
+def test_from_dict_keeps_only_the_fields_renamarr_uses() -> None:
+    series = SeriesRecord.from_dict(SERIES)
+
+    assert series == SeriesRecord(
+        1, "Show", "/tv/Show", 2020, 10, 20, "tt30", "continuing"
+    )
+    assert not hasattr(series, "__dict__")
+
+
+def test_from_dict_defaults_missing_fields() -> None:
+    assert SeriesRecord.from_dict({"id": 1}) == SeriesRecord(1, "", "", 0, 0, 0, "", "")
+
+
+def test_folder_fingerprint_matches_sonarr_serie_item() -> None:
+    # Folder names cached from full SonarrSerieItem objects stay valid
+    legacy_fields = ("title", "year", "tvdbId", "tvMazeId", "imdbId")
+
+    for series in (SERIES, {"id": 1}):
+        assert item_fingerprint(
+            SeriesRecord.from_dict(series), FOLDER_FINGERPRINT_FIELDS
+        ) == item_fingerprint(SonarrSerieItem.from_dict(series), legacy_fields)
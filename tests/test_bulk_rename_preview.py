@@ -0,0 +1,230 @@
+from unittest.mock import call
+
+from pycliarr.api import CliArrError, RadarrCli, SonarrCli
+
+from renamarr.common.bulk_rename_preview import (
+    BULK_PREVIEW_CHUNK_SIZE,
+    BulkRenamePreview,
+)
+from renamarr.common.rate_limiter import RateLimiter
+from renamarr.common.server_version import server_version
+
+
+def bulk_preview(sonarr_cli: SonarrCli) -> BulkRenamePreview:
+    return BulkRenamePreview(
+        sonarr_cli,
+        "/api/v3/rename/bulk",
+        "seriesIds",
+        "seriesId",
+        (4, 0, 5),
+        RateLimiter(),
+    )
+
+
+def movie_bulk_preview(radarr_cli: RadarrCli) -> BulkRenamePreview:
+    return BulkRenamePreview(
+        radarr_cli,
+        "/api/v3/rename",
+        "movieId",
+        "movieId",
+        (5, 4, 0),
+        RateLimiter(),
+        binds_single_id=True,
+    )
+
+
+class TestBulkRenamePreview:
+    def test_fetch_groups_previews_by_item_id(self, mocker) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        mocker.patch.object(
+            sonarr_cli, "get_system_status", return_value={"version": "4.0.5.1710"}
+        )
+        mocker.patch.object(
+            sonarr_cli,
+            "request_get",
+            return_value=[
+                {"seriesId": 1, "episodeFileId": 10},
+                {"seriesId": 3, "episodeFileId": 30},
+                {"seriesId": 1, "episodeFileId": 11},
+            ],
+        )
+
+        assert bulk_preview(sonarr_cli).fetch([1, 2, 3]) == {
+            1: [
+                {"seriesId": 1, "episodeFileId": 10},
+                {"seriesId": 1, "episodeFileId": 11},
+            ],
+            2: [],
+            3: [{"seriesId": 3, "episodeFileId": 30}],
+        }
+
+    def test_fetch_requests_previews_in_chunks(self, mocker) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        mocker.patch.object(
+            sonarr_cli, "get_system_status", return_value={"version": "4.1.0.1734"}
+        )
+        request_get = mocker.patch.object(sonarr_cli, "request_get", return_value=[])
+        rate_limiter = mocker.Mock()
+        item_ids = list(range(BULK_PREVIEW_CHUNK_SIZE + 1))
+
+        BulkRenamePreview(
+            sonarr_cli,
+            "/api/v3/rename/bulk",
+            "seriesIds",
+            "seriesId",
+            (4, 0, 5),
+            rate_limiter,
+        ).fetch(item_ids)
+
+        assert request_get.call_args_list == [
+            call(
+                path="/api/v3/rename/bulk",
+                url_params={"seriesIds": item_ids[:BULK_PREVIEW_CHUNK_SIZE]},
+            ),
+            call(
+                path="/api/v3/rename/bulk",
+                url_params={"seriesIds": item_ids[BULK_PREVIEW_CHUNK_SIZE:]},
+            ),
+        ]
+        assert rate_limiter.acquire.call_count == 2
+
+    def test_fetch_returns_none_for_servers_older_than_the_minimum_version(
+        self, mocker
+    ) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        mocker.patch.object(
+            sonarr_cli, "get_system_status", return_value={"version": "4.0.4.1491"}
+        )
+        request_get = mocker.patch.object(sonarr_cli, "request_get")
+
+        assert bulk_preview(sonarr_cli).fetch([1]) is None
+
+        request_get.assert_not_called()
+
+    def test_shares_the_server_version_probe_with_list_fetches(self, mocker) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        get_system_status = mocker.patch.object(
+            sonarr_cli, "get_system_status", return_value={"version": "4.0.5.1710"}
+        )
+        mocker.patch.object(sonarr_cli, "request_get", return_value=[])
+
+        server_version(sonarr_cli)
+        bulk_preview(sonarr_cli).fetch([1])
+        bulk_preview(sonarr_cli).fetch([1])
+
+        get_system_status.assert_called_once_with()
+
+    def test_fetch_remembers_rejected_bulk_request(
+        self, mock_loguru_warning, mocker
+    ) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        get_system_status = mocker.patch.object(
+            sonarr_cli, "get_system_status", return_value={"version": "4.0.5.1710"}
+        )
+        bulk_error = CliArrError("bad request")
+        request_get = mocker.patch.object(
+            sonarr_cli, "request_get", side_effect=bulk_error
+        )
+
+        assert bulk_preview(sonarr_cli).fetch([1, 2]) is None
+        assert bulk_preview(sonarr_cli).fetch([1, 2]) is None
+
+        assert request_get.call_count == 1
+        get_system_status.assert_called_once()
+        assert mock_loguru_warning.call_args_list == [
+            call("Bulk rename preview failed, falling back to per-item previews"),
+            call(bulk_error),
+        ]
+
+    def test_fetch_remembers_bulk_response_for_unrequested_items(
+        self, mock_loguru_warning, mocker
+    ) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        mocker.patch.object(
+            sonarr_cli, "get_system_status", return_value={"version": "4.0.5.1710"}
+        )
+        request_get = mocker.patch.object(
+            sonarr_cli,
+            "request_get",
+            return_value=[{"seriesId": 1}, {"seriesId": 4}],
+        )
+
+        assert bulk_preview(sonarr_cli).fetch([1, 2]) is None
+        assert bulk_preview(sonarr_cli).fetch([1, 2]) is None
+
+        assert request_get.call_count == 1
+        mock_loguru_warning.assert_called_once_with(
+            "Bulk rename preview did not answer for the requested items, "
+            "falling back to per-item previews"
+        )
+
+    def test_fetch_accepts_a_single_answered_item_other_than_the_first(
+        self, mocker
+    ) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        mocker.patch.object(
+            sonarr_cli, "get_system_status", return_value={"version": "4.0.5.1710"}
+        )
+        mocker.patch.object(sonarr_cli, "request_get", return_value=[{"seriesId": 2}])
+
+        assert bulk_preview(sonarr_cli).fetch([1, 2]) == {
+            1: [],
+            2: [{"seriesId": 2}],
+        }
+
+    def test_fetch_accepts_an_answer_for_only_the_first_item(self, mocker) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        mocker.patch.object(
+            sonarr_cli, "get_system_status", return_value={"version": "4.0.14.2939"}
+        )
+        request_get = mocker.patch.object(
+            sonarr_cli, "request_get", return_value=[{"seriesId": 1}]
+        )
+
+        assert bulk_preview(sonarr_cli).fetch([1, 2, 3]) == {
+            1: [{"seriesId": 1}],
+            2: [],
+            3: [],
+        }
+        request_get.assert_called_once()
+
+    def test_single_id_route_confirms_first_item_answer_in_reverse(
+        self, mocker
+    ) -> None:
+        radarr_cli = RadarrCli("test.tld", "test-api-key")
+        mocker.patch.object(
+            radarr_cli, "get_system_status", return_value={"version": "5.4.0.8648"}
+        )
+        request_get = mocker.patch.object(
+            radarr_cli, "request_get", return_value=[{"movieId": 1}]
+        )
+
+        assert movie_bulk_preview(radarr_cli).fetch([1, 2, 3]) == {
+            1: [{"movieId": 1}],
+            2: [],
+            3: [],
+        }
+        assert request_get.call_args_list == [
+            call(path="/api/v3/rename", url_params={"movieId": [1, 2, 3]}),
+            call(path="/api/v3/rename", url_params={"movieId": [3, 2, 1]}),
+        ]
+
+    def test_single_id_route_remembers_server_reading_only_the_first_id(
+        self, mock_loguru_warning, mocker
+    ) -> None:
+        radarr_cli = RadarrCli("test.tld", "test-api-key")
+        mocker.patch.object(
+            radarr_cli, "get_system_status", return_value={"version": "5.4.0.8648"}
+        )
+        request_get = mocker.patch.object(
+            radarr_cli, "request_get", side_effect=[[{"movieId": 1}], []]
+        )
+
+        assert movie_bulk_preview(radarr_cli).fetch([1, 2, 3]) is None
+        assert movie_bulk_preview(radarr_cli).fetch([1, 2, 3]) is None
+
+        assert request_get.call_count == 2
+        mock_loguru_warning.assert_called_once_with(
+            "Bulk rename preview did not answer for the requested items, "
+            "falling back to per-item previews"
+        )
@@ -0,0 +1,177 @@
+from unittest.mock import MagicMock, call
+
+import pytest
+from pyconfigparser import configparser
+
+import cli
+from config_schema import CONFIG_SCHEMA
+
+# disable config caching
+configparser.hold_an_instance = False
+
+
+class TestCli:
+    @pytest.fixture
+    def config(self, mocker):
+        config = configparser.get_config(
+            CONFIG_SCHEMA,
+            config_dir="tests/fixtures",
+            file_name="disabled.yml",
+        )
+        mocker.patch("cli.load_config", return_value=config)
+        mocker.patch("cli.configure_logging", return_value="format")
+        return config
+
+    @pytest.fixture(autouse=True)
+    def client_registry(self, mocker) -> MagicMock:
+        return mocker.patch(
+            "renamarr.common.client_registry.ClientRegistry"
+        ).return_value
+
+    @pytest.fixture(autouse=True)
+    def series_scanner(self, mocker) -> MagicMock:
+        return mocker.patch(
+            "renamarr.sonarr.services.series_scanner.SonarrSeriesScanner"
+        )
+
+    @pytest.fixture(autouse=True)
+    def sonarr_renamarr(self, mocker) -> MagicMock:
+        return mocker.patch("renamarr.sonarr.services.renamarr.SonarrRenamarr")
+
+    @pytest.fixture(autouse=True)
+    def radarr_renamarr(self, mocker) -> MagicMock:
+        return mocker.patch("renamarr.radarr.services.renamarr.RadarrRenamarr")
+
+    def test_without_command_runs_the_scheduler(self, mocker) -> None:
+        main = mocker.patch("main.Main")
+
+        assert cli.main([]) == cli.EXIT_SUCCESS
+
+        main.return_value.start.assert_called_once_with()
+
+    def test_run_runs_enabled_jobs_once_with_scanner_before_renamarr(
+        self,
+        config,
+        client_registry,
+        series_scanner,
+        sonarr_renamarr,
+        radarr_renamarr,
+        mocker,
+    ) -> None:
+        config.sonarr[0].series_scanner.enabled = True
+        config.sonarr[0].renamarr.enabled = True
+        config.radarr[1].renamarr.enabled = True
+        manager = mocker.Mock()
+        manager.attach_mock(series_scanner.return_value.scan, "series_scanner")
+        manager.attach_mock(sonarr_renamarr.return_value.scan, "sonarr_renamarr")
+
+        assert cli.main(["run"]) == cli.EXIT_SUCCESS
+
+        assert manager.mock_calls == [call.series_scanner(), call.sonarr_renamarr()]
+        series_scanner.assert_called_once_with(
+            name="sonarr",
+            url="https://sonarr.tld",
+            api_key="sonarr-api-key",
+            hours_before_air=2,
+            use_calendar=False,
+            calendar_lookback_days=7,
+            sonarr_cli=client_registry.get_client.return_value,
+        )
+        assert sonarr_renamarr.call_args.kwargs["name"] == "sonarr"
+        assert sonarr_renamarr.call_args.kwargs["dry_run"] is False
+        assert radarr_renamarr.call_args.kwargs["name"] == "radarr1"
+        assert (
+            radarr_renamarr.call_args.kwargs["radarr_cli"]
+            is client_registry.get_client.return_value
+        )
+        radarr_renamarr.return_value.scan.assert_called_once_with()
+        client_registry.close.assert_called_once_with()
+
+    def test_run_only_runs_selected_instances_and_jobs(
+        self, config, series_scanner, sonarr_renamarr, radarr_renamarr
+    ) -> None:
+        for sonarr_config in config.sonarr:
+            sonarr_config.series_scanner.enabled = True
+            sonarr_config.renamarr.enabled = True
+        config.radarr[0].renamarr.enabled = True
+
+        exit_code = cli.main(
+            [
+                "run",
+                "--instance",
+                "sonarr1",
+                "--instance",
+                "radarr",
+                "--job",
+                "renamarr",
+            ]
+        )
+
+        assert exit_code == cli.EXIT_SUCCESS
+        series_scanner.assert_not_called()
+        assert sonarr_renamarr.call_args.kwargs["name"] == "sonarr1"
+        sonarr_renamarr.return_value.scan.assert_called_once_with()
+        radarr_renamarr.return_value.scan.assert_called_once_with()
+
+    def test_scan_only_runs_series_scanners(
+        self, config, series_scanner, sonarr_renamarr, radarr_renamarr
+    ) -> None:
+        config.sonarr[0].series_scanner.enabled = True
+        config.sonarr[0].renamarr.enabled = True
+        config.radarr[0].renamarr.enabled = True
+
+        assert cli.main(["scan"]) == cli.EXIT_SUCCESS
+
+        series_scanner.return_value.scan.assert_called_once_with()
+        sonarr_renamarr.assert_not_called()
+        radarr_renamarr.assert_not_called()
+
+    def test_plan_runs_renamarr_jobs_as_dry_run(
+        self, config, series_scanner, sonarr_renamarr, radarr_renamarr
+    ) -> None:
+        config.sonarr[0].series_scanner.enabled = True
+        config.sonarr[0].renamarr.enabled = True
+        config.radarr[0].renamarr.enabled = True
+
+        assert cli.main(["plan"]) == cli.EXIT_SUCCESS
+
+        series_scanner.assert_not_called()
+        assert sonarr_renamarr.call_args.kwargs["dry_run"] is True
+        assert radarr_renamarr.call_args.kwargs["dry_run"] is True
+
+    def test_failed_job_sets_exit_code_without_stopping_other_jobs(
+        self, config, series_scanner, sonarr_renamarr, radarr_renamarr
+    ) -> None:
+        config.sonarr[0].series_scanner.enabled = True
+        config.sonarr[0].renamarr.enabled = True
+        config.radarr[0].renamarr.enabled = True
+        series_scanner.return_value.scan.side_effect = RuntimeError("BOOM!")
+
+        assert cli.main(["run"]) == cli.EXIT_JOB_FAILED
+
+        sonarr_renamarr.return_value.scan.assert_called_once_with()
+        radarr_renamarr.return_value.scan.assert_called_once_with()
+
+    def test_no_matching_jobs_exits_without_running_anything(
+        self, config, mock_loguru_error, client_registry
+    ) -> None:
+        config.sonarr[0].renamarr.enabled = True
+
+        exit_code = cli.main(["run", "--instance", "missing"])
+
+        assert exit_code == cli.EXIT_NO_MATCHING_JOBS
+        mock_loguru_error.assert_called_once_with(
+            "No enabled jobs match the selected instances and jobs"
+        )
+        client_registry.close.assert_not_called()
+
+    def test_configures_file_logging_for_renamarr_jobs(self, config, mocker) -> None:
+        config.sonarr[0].series_scanner.enabled = True
+        config.sonarr[0].renamarr.enabled = True
+        config.sonarr[0].renamarr.log_to_file = True
+        config.radarr[0].renamarr.enabled = True
+        configure_file_logging = mocker.patch("cli.configure_file_logging")
+
+        cli.main(["run"])
+
+        configure_file_logging.assert_called_once_with("sonarr", "sonarr", "format")
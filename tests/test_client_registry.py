@@ -0,0 +1,62 @@
+from pycliarr.api import RadarrCli, SonarrCli
+
+from renamarr.common.client_registry import ClientRegistry, TimeoutHTTPAdapter
+
+
+class TestClientRegistry:
+    def test_reuses_client_per_instance(self) -> None:
+        client_registry = ClientRegistry()
+
+        sonarr_cli = client_registry.get_client(SonarrCli, "http://tv", "key")
+
+        assert isinstance(sonarr_cli, SonarrCli)
+        assert client_registry.get_client(SonarrCli, "http://tv", "key") is sonarr_cli
+        assert client_registry.get_client(SonarrCli, "http://anime", "key") is not (
+            sonarr_cli
+        )
+        assert client_registry.get_client(RadarrCli, "http://tv", "key") is not (
+            sonarr_cli
+        )
+
+    def test_mounts_pooled_adapter_with_timeouts(self) -> None:
+        sonarr_cli = ClientRegistry().get_client(
+            SonarrCli,
+            "https://tv",
+            "key",
+            pool_size=4,
+            connect_timeout_seconds=3,
+            read_timeout_seconds=30,
+        )
+
+        adapter = sonarr_cli._session.get_adapter("https://tv/api/v3/series")
+        assert isinstance(adapter, TimeoutHTTPAdapter)
+        assert sonarr_cli._session.get_adapter("http://tv") is adapter
+        assert adapter.timeout == (3, 30)
+        assert adapter._pool_maxsize == 4
+
+    def test_close_closes_and_forgets_clients(self, mocker) -> None:
+        client_registry = ClientRegistry()
+        sonarr_cli = client_registry.get_client(SonarrCli, "http://tv", "key")
+        close = mocker.patch.object(sonarr_cli, "close")
+
+        client_registry.close()
+
+        close.assert_called_once_with()
+        assert client_registry.get_client(SonarrCli, "http://tv", "key") is not (
+            sonarr_cli
+        )
+
+
+class TestTimeoutHTTPAdapter:
+    def test_applies_default_timeout_only_when_missing(self, mocker) -> None:
+        send = mocker.patch("requests.adapters.HTTPAdapter.send")
+        adapter = TimeoutHTTPAdapter((3, 30))
+        request = mocker.Mock()
+
+        adapter.send(request)
+        adapter.send(request, timeout=5)
+
+        assert send.call_args_list == [
+            mocker.call(request, timeout=(3, 30)),
+            mocker.call(request, timeout=5),
+        ]
@@ -0,0 +1,41 @@
+from unittest.mock import call
+
+from renamarr.common.command_tracker import CommandTracker
+from renamarr.common.command_waiter import CommandResult, CommandWaiter
+
+
+class TestCommandTracker:
+    def test_wait_all_awaits_tracked_commands_in_submission_order(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        command_waiter = mocker.Mock(spec=CommandWaiter)
+        command_waiter.wait.side_effect = [
+            CommandResult(successful=True, elapsed_seconds=1),
+            CommandResult(successful=False, elapsed_seconds=2),
+        ]
+        command_tracker = CommandTracker(command_waiter)
+
+        command_tracker.track({"id": 10}, "Sonarr series rescan")
+        command_tracker.track({"id": 20}, "Sonarr series rescan")
+        command_tracker.wait_all()
+        command_tracker.wait_all()
+
+        assert command_waiter.wait.call_args_list == [
+            call({"id": 10}, "Sonarr series rescan"),
+            call({"id": 20}, "Sonarr series rescan"),
+        ]
+        assert mock_loguru_info.call_args_list == [
+            call("Waiting for 2 deferred commands"),
+            call("Sonarr series rescan finished successfully"),
+            call("Sonarr series rescan failed"),
+        ]
+
+    def test_wait_all_without_tracked_commands_does_nothing(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        command_waiter = mocker.Mock(spec=CommandWaiter)
+
+        CommandTracker(command_waiter).wait_all()
+
+        command_waiter.wait.assert_not_called()
+        mock_loguru_info.assert_not_called()
@@ -0,0 +1,110 @@
+from threading import Event
+from unittest.mock import call
+
+from pycliarr.api import SonarrCli
+
+from renamarr.common.command_waiter import CommandResult, CommandWaiter
+
+
+class TestCommandWaiter:
+    def test_backs_off_exponentially_up_to_cap(self, mock_loguru_debug, mocker) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        get_command = mocker.patch.object(
+            sonarr_cli,
+            "get_command",
+            side_effect=[{"status": "started"}] * 5
+            + [{"status": "completed", "result": "successful"}],
+        )
+        sleep = mocker.patch("renamarr.common.command_waiter.sleep")
+        mocker.patch(
+            "renamarr.common.command_waiter.monotonic",
+            side_effect=[0, 0, 1, 3, 7, 15, 25, 35],
+        )
+
+        result = CommandWaiter(sonarr_cli).wait({"id": 10}, "Sonarr series rescan")
+
+        assert result == CommandResult(successful=True, elapsed_seconds=35)
+        assert sleep.call_args_list == [
+            call(1),
+            call(2),
+            call(4),
+            call(8),
+            call(10),
+            call(10),
+        ]
+        get_command.assert_called_with(cid=10)
+        mock_loguru_debug.assert_called_once_with(
+            "Sonarr series rescan command 10 completed after 35.0 seconds"
+        )
+
+    def test_stops_polling_commands_that_fail(self, mocker) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        get_command = mocker.patch.object(
+            sonarr_cli, "get_command", return_value={"status": "failed"}
+        )
+        mocker.patch("renamarr.common.command_waiter.sleep")
+
+        result = CommandWaiter(sonarr_cli).wait({"id": 10}, "Sonarr series rescan")
+
+        assert result.successful is False
+        get_command.assert_called_once_with(cid=10)
+
+    def test_does_not_sleep_past_deadline(self, mock_loguru_error, mocker) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        mocker.patch.object(
+            sonarr_cli, "get_command", return_value={"status": "started"}
+        )
+        sleep = mocker.patch("renamarr.common.command_waiter.sleep")
+        mocker.patch(
+            "renamarr.common.command_waiter.monotonic",
+            side_effect=[0, 0, 1, 3, 4.5],
+        )
+
+        result = CommandWaiter(sonarr_cli, timeout_seconds=4.5).wait(
+            {"id": 10}, "Sonarr series rescan"
+        )
+
+        assert result == CommandResult(successful=False, elapsed_seconds=4.5)
+        assert sleep.call_args_list == [call(1), call(2), call(1.5)]
+        mock_loguru_error.assert_called_once_with(
+            "Timed out waiting for Sonarr series rescan command 10 after 4.5 seconds"
+        )
+
+    def test_waits_on_stop_event_between_polls(self, mocker) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        mocker.patch.object(
+            sonarr_cli,
+            "get_command",
+            side_effect=[{"status": "started"}, {"status": "completed"}],
+        )
+        stop_requested = mocker.MagicMock(spec=Event)
+        stop_requested.wait.return_value = False
+        sleep = mocker.patch("renamarr.common.command_waiter.sleep")
+
+        CommandWaiter(sonarr_cli, stop_requested=stop_requested).wait(
+            {"id": 10}, "Sonarr series rescan"
+        )
+
+        assert stop_requested.wait.call_args_list == [call(1), call(2)]
+        sleep.assert_not_called()
+
+    def test_stops_waiting_when_shutdown_is_requested(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        get_command = mocker.patch.object(sonarr_cli, "get_command")
+        stop_requested = Event()
+        stop_requested.set()
+        mocker.patch(
+            "renamarr.common.command_waiter.monotonic", side_effect=[0, 0, 0.5]
+        )
+
+        result = CommandWaiter(sonarr_cli, stop_requested=stop_requested).wait(
+            {"id": 10}, "Sonarr series rescan"
+        )
+
+        assert result == CommandResult(successful=False, elapsed_seconds=0.5)
+        get_command.assert_not_called()
+        mock_loguru_info.assert_called_once_with(
+            "Shutdown requested, no longer waiting for Sonarr series rescan command 10"
+        )
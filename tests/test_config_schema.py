@@ -32,19 +32,38 @@ def test_minimal_sonarr_config_receives_defaults() -> None:
             "name": "instance",
             "url": "https://instance.tld",
             "api_key": "api-key",
+            "http": {
+                "pool_size": 10,
+                "connect_timeout_seconds": 10,
+                "read_timeout_seconds": 300,
+            },
             "series_scanner": {
                 "enabled": False,
                 "hourly_job": False,
                 "hours_before_air": 4,
+                "use_calendar": False,
+                "calendar_lookback_days": 7,
             },
             "renamarr": {
                 "enabled": False,
                 "analyze_files": False,
                 "rename_folders": False,
                 "log_to_file": False,
+                "max_concurrency": 1,
+                "max_requests_per_second": 0,
+                "cache_folder_names": False,
+                "incremental": {"enabled": False, "full_sweep_runs": 24},
+                "command_timeout_minutes": 5,
+                "analyze_timeout_minutes": 120,
+                "defer_rescans": False,
+                "rename_batch_size": 0,
+                "bulk_rename_preview": False,
+                "dry_run": False,
                 "schedule": {
                     "enabled": True,
                     "interval": Interval(days=0, hours=1, minutes=0),
+                    "start_offset_minutes": 0,
+                    "jitter_minutes": 0,
                 },
             },
         }
@@ -60,14 +79,31 @@ def test_minimal_radarr_config_receives_defaults() -> None:
             "name": "instance",
             "url": "https://instance.tld",
             "api_key": "api-key",
+            "http": {
+                "pool_size": 10,
+                "connect_timeout_seconds": 10,
+                "read_timeout_seconds": 300,
+            },
             "renamarr": {
                 "enabled": False,
                 "analyze_files": False,
                 "rename_folders": False,
                 "log_to_file": False,
+                "max_concurrency": 1,
+                "max_requests_per_second": 0,
+                "cache_folder_names": False,
+                "incremental": {"enabled": False, "full_sweep_runs": 24},
+                "command_timeout_minutes": 5,
+                "analyze_timeout_minutes": 120,
+                "defer_rescans": False,
+                "rename_batch_size": 0,
+                "bulk_rename_preview": False,
+                "dry_run": False,
                 "schedule": {
                     "enabled": True,
                     "interval": Interval(days=0, hours=1, minutes=0),
+                    "start_offset_minutes": 0,
+                    "jitter_minutes": 0,
                 },
             },
         }
@@ -149,6 +185,7 @@ def test_extra_service_and_nested_keys_are_ignored() -> None:
     [
         ("sonarr", "series_scanner", "enabled"),
         ("sonarr", "series_scanner", "hourly_job"),
+        ("sonarr", "series_scanner", "use_calendar"),
         ("sonarr", "renamarr", "enabled"),
         ("sonarr", "renamarr", "analyze_files"),
         ("sonarr", "renamarr", "rename_folders"),
@@ -157,6 +194,12 @@ def test_extra_service_and_nested_keys_are_ignored() -> None:
         ("radarr", "renamarr", "analyze_files"),
         ("radarr", "renamarr", "rename_folders"),
         ("radarr", "renamarr", "log_to_file"),
+        ("sonarr", "renamarr", "cache_folder_names"),
+        ("radarr", "renamarr", "cache_folder_names"),
+        ("sonarr", "renamarr", "defer_rescans"),
+        ("radarr", "renamarr", "defer_rescans"),
+        ("sonarr", "renamarr", "dry_run"),
+        ("radarr", "renamarr", "dry_run"),
     ],
 )
 def test_boolean_fields_reject_non_bool_values(
@@ -170,6 +213,170 @@ def test_boolean_fields_reject_non_bool_values(
         validate_config({service: [instance_config]})
 
 
+@pytest.mark.parametrize("service", ["sonarr", "radarr"])
+@pytest.mark.parametrize("max_concurrency", [0, -1, True, 1.5, "4"])
+def test_max_concurrency_rejects_non_positive_integers(
+    service: str, max_concurrency: object
+) -> None:
+    instance_config: dict[str, object] = minimal_instance_config() | {
+        "renamarr": {"max_concurrency": max_concurrency}
+    }
+
+    with pytest.raises(SchemaError):
+        validate_config({service: [instance_config]})
+
+
+@pytest.mark.parametrize("service", ["sonarr", "radarr"])
+def test_max_concurrency_accepts_positive_integer(service: str) -> None:
+    instance_config: dict[str, object] = minimal_instance_config() | {
+        "renamarr": {"max_concurrency": 8}
+    }
+
+    validated = validate_config({service: [instance_config]})
+
+    assert validated[service][0]["renamarr"]["max_concurrency"] == 8
+
+
+@pytest.mark.parametrize("service", ["sonarr", "radarr"])
+@pytest.mark.parametrize("max_requests_per_second", [-1, True, float("inf"), "4"])
+def test_max_requests_per_second_rejects_invalid_values(
+    service: str, max_requests_per_second: object
+) -> None:
+    instance_config: dict[str, object] = minimal_instance_config() | {
+        "renamarr": {"max_requests_per_second": max_requests_per_second}
+    }
+
+    with pytest.raises(SchemaError):
+        validate_config({service: [instance_config]})
+
+
+@pytest.mark.parametrize("service", ["sonarr", "radarr"])
+@pytest.mark.parametrize("max_requests_per_second", [0, 5, 2.5])
+def test_max_requests_per_second_accepts_non_negative_numbers(
+    service: str, max_requests_per_second: float
+) -> None:
+    instance_config: dict[str, object] = minimal_instance_config() | {
+        "renamarr": {"max_requests_per_second": max_requests_per_second}
+    }
+
+    validated = validate_config({service: [instance_config]})
+
+    assert (
+        validated[service][0]["renamarr"]["max_requests_per_second"]
+        == max_requests_per_second
+    )
+
+
+@pytest.mark.parametrize("calendar_lookback_days", [0, -1, True, 1.5, "7"])
+def test_calendar_lookback_days_rejects_non_positive_integers(
+    calendar_lookback_days: object,
+) -> None:
+    instance_config: dict[str, object] = minimal_instance_config() | {
+        "series_scanner": {"calendar_lookback_days": calendar_lookback_days}
+    }
+
+    with pytest.raises(SchemaError):
+        validate_config({"sonarr": [instance_config]})
+
+
+@pytest.mark.parametrize("service", ["sonarr", "radarr"])
+@pytest.mark.parametrize(
+    "http",
+    [
+        {"pool_size": 0},
+        {"pool_size": 2.5},
+        {"connect_timeout_seconds": 0},
+        {"read_timeout_seconds": -1},
+        {"read_timeout_seconds": float("inf")},
+        {"read_timeout_seconds": "30"},
+    ],
+)
+def test_http_rejects_invalid_values(service: str, http: dict[str, object]) -> None:
+    instance_config: dict[str, object] = minimal_instance_config() | {"http": http}
+
+    with pytest.raises(SchemaError):
+        validate_config({service: [instance_config]})
+
+
+@pytest.mark.parametrize("service", ["sonarr", "radarr"])
+def test_http_accepts_fractional_timeouts(service: str) -> None:
+    instance_config: dict[str, object] = minimal_instance_config() | {
+        "http": {"pool_size": 4, "read_timeout_seconds": 2.5}
+    }
+
+    validated = validate_config({service: [instance_config]})
+
+    assert validated[service][0]["http"] == {
+        "pool_size": 4,
+        "connect_timeout_seconds": 10,
+        "read_timeout_seconds": 2.5,
+    }
+
+
+@pytest.mark.parametrize("service", ["sonarr", "radarr"])
+@pytest.mark.parametrize(
+    "option", ["command_timeout_minutes", "analyze_timeout_minutes"]
+)
+@pytest.mark.parametrize("timeout_minutes", [0, -1, True, 1.5, "5"])
+def test_timeout_minutes_rejects_non_positive_integers(
+    service: str, option: str, timeout_minutes: object
+) -> None:
+    instance_config: dict[str, object] = minimal_instance_config() | {
+        "renamarr": {option: timeout_minutes}
+    }
+
+    with pytest.raises(SchemaError):
+        validate_config({service: [instance_config]})
+
+
+@pytest.mark.parametrize("service", ["sonarr", "radarr"])
+@pytest.mark.parametrize("rename_batch_size", [-1, True, 1.5, "100"])
+def test_rename_batch_size_rejects_non_integers_and_negatives(
+    service: str, rename_batch_size: object
+) -> None:
+    instance_config: dict[str, object] = minimal_instance_config() | {
+        "renamarr": {"rename_batch_size": rename_batch_size}
+    }
+
+    with pytest.raises(SchemaError):
+        validate_config({service: [instance_config]})
+
+
+@pytest.mark.parametrize("service", ["sonarr", "radarr"])
+@pytest.mark.parametrize(
+    "incremental",
+    [
+        {"enabled": "true"},
+        {"full_sweep_runs": 0},
+        {"full_sweep_runs": True},
+        {"full_sweep_runs": "24"},
+    ],
+)
+def test_incremental_rejects_invalid_values(
+    service: str, incremental: dict[str, object]
+) -> None:
+    instance_config: dict[str, object] = minimal_instance_config() | {
+        "renamarr": {"incremental": incremental}
+    }
+
+    with pytest.raises(SchemaError):
+        validate_config({service: [instance_config]})
+
+
+@pytest.mark.parametrize("service", ["sonarr", "radarr"])
+def test_incremental_fills_missing_defaults(service: str) -> None:
+    instance_config: dict[str, object] = minimal_instance_config() | {
+        "renamarr": {"incremental": {"enabled": True}}
+    }
+
+    validated = validate_config({service: [instance_config]})
+
+    assert validated[service][0]["renamarr"]["incremental"] == {
+        "enabled": True,
+        "full_sweep_runs": 24,
+    }
+
+
 @pytest.mark.parametrize("service", ["sonarr", "radarr"])
 @pytest.mark.parametrize(
     ("configured", "expected"),
@@ -195,6 +402,8 @@ def test_schedule_interval_is_validated(
     assert validated[service][0]["renamarr"]["schedule"] == {
         "enabled": True,
         "interval": expected,
+        "start_offset_minutes": 0,
+        "jitter_minutes": 0,
     }
 
 
@@ -248,6 +457,8 @@ def test_deprecated_hourly_job_sets_enabled_on_custom_schedule(
     assert validated[service][0]["renamarr"]["schedule"] == {
         "enabled": False,
         "interval": Interval(days=0, hours=0, minutes=30),
+        "start_offset_minutes": 0,
+        "jitter_minutes": 0,
     }
 
 
@@ -326,3 +537,63 @@ def test_enabled_schedule_rejects_invalid_interval(
 
     with pytest.raises(SchemaError):
         validate_config({service: [instance_config]})
+
+
+@pytest.mark.parametrize("service", ["sonarr", "radarr"])
+def test_schedule_accepts_start_offset_and_jitter(service: str) -> None:
+    instance_config: dict[str, object] = minimal_instance_config() | {
+        "renamarr": {"schedule": {"start_offset_minutes": 10, "jitter_minutes": 5}}
+    }
+
+    validated = validate_config({service: [instance_config]})
+
+    assert validated[service][0]["renamarr"]["schedule"] == {
+        "enabled": True,
+        "interval": Interval(days=0, hours=1, minutes=0),
+        "start_offset_minutes": 10,
+        "jitter_minutes": 5,
+    }
+
+
+@pytest.mark.parametrize("service", ["sonarr", "radarr"])
+@pytest.mark.parametrize(
+    ("schedule", "error"),
+    [
+        ({"start_offset_minutes": -1}, None),
+        ({"jitter_minutes": 1.5}, None),
+        (
+            {"start_offset_minutes": 43201},
+            "renamarr.schedule.start_offset_minutes must not exceed 30 days",
+        ),
+        (
+            {"jitter_minutes": 60},
+            "renamarr.schedule.jitter_minutes must be less than the interval",
+        ),
+    ],
+)
+def test_schedule_rejects_invalid_start_offset_and_jitter(
+    service: str, schedule: dict[str, object], error: str | None
+) -> None:
+    instance_config: dict[str, object] = minimal_instance_config() | {
+        "renamarr": {"schedule": schedule}
+    }
+
+    with pytest.raises(SchemaError, match=error):
+        validate_config({service: [instance_config]})
+
+
+@pytest.mark.parametrize("service", ["sonarr", "radarr"])
+def test_disabled_schedule_ignores_jitter(service: str) -> None:
+    instance_config: dict[str, object] = minimal_instance_config() | {
+        "renamarr": {
+            "schedule": {
+                "enabled": False,
+                "interval": {"minutes": 0},
+                "jitter_minutes": 5,
+            }
+        }
+    }
+
+    validated = validate_config({service: [instance_config]})
+
+    assert validated[service][0]["renamarr"]["schedule"]["jitter_minutes"] == 5
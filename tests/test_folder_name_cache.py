@@ -0,0 +1,58 @@
+import sqlite3
+
+from pycliarr.api import SonarrSerieItem
+
+from renamarr.common.folder_name_cache import (
+    FolderNameCache,
+    fingerprint,
+    item_fingerprint,
+)
+
+
+def test_fingerprint_ignores_key_order() -> None:
+    assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+    assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+
+def test_item_fingerprint_uses_selected_fields_only() -> None:
+    show = SonarrSerieItem(id=1, title="Show", year=2020, overview="one")
+    updated_overview = SonarrSerieItem(id=1, title="Show", year=2020, overview="two")
+    renamed = SonarrSerieItem(id=1, title="Renamed", year=2020)
+
+    fields = ("title", "year", "missingField")
+
+    assert item_fingerprint(show, fields) == item_fingerprint(updated_overview, fields)
+    assert item_fingerprint(show, fields) != item_fingerprint(renamed, fields)
+
+
+def test_returns_folder_names_only_for_matching_fingerprints() -> None:
+    connection = sqlite3.connect(":memory:")
+    folder_name_cache = FolderNameCache(connection, {"seriesFolderFormat": "{x}"})
+    folder_name_cache.set_folder_name(1, "fingerprint-1", "Show A")
+    folder_name_cache.set_folder_name(2, "fingerprint-2", "Show B")
+
+    assert folder_name_cache.get_folder_names(
+        {1: "fingerprint-1", 2: "moved", 3: "fingerprint-3"}
+    ) == {1: "Show A"}
+
+
+def test_keeps_folder_names_while_naming_config_is_unchanged() -> None:
+    connection = sqlite3.connect(":memory:")
+    FolderNameCache(connection, {"seriesFolderFormat": "{x}"}).set_folder_name(
+        1, "fingerprint-1", "Show A"
+    )
+
+    folder_name_cache = FolderNameCache(connection, {"seriesFolderFormat": "{x}"})
+
+    assert folder_name_cache.get_folder_names({1: "fingerprint-1"}) == {1: "Show A"}
+
+
+def test_clears_folder_names_when_naming_config_changes() -> None:
+    connection = sqlite3.connect(":memory:")
+    FolderNameCache(connection, {"seriesFolderFormat": "{x}"}).set_folder_name(
+        1, "fingerprint-1", "Show A"
+    )
+
+    folder_name_cache = FolderNameCache(connection, {"seriesFolderFormat": "{y}"})
+
+    assert folder_name_cache.get_folder_names({1: "fingerprint-1"}) == {}
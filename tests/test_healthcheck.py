@@ -46,6 +46,16 @@ def test_reporter_throttles_idle_heartbeat(tmp_path: Path, mocker) -> None:
     )
 
 
+def test_reporter_reports_time_until_next_heartbeat(tmp_path: Path, mocker) -> None:
+    clock = mocker.Mock(side_effect=[0.0, 4.0, 12.0])
+    reporter = HealthReporter(
+        path=tmp_path / "health.json", clock=clock, heartbeat_interval=10.0
+    )
+
+    assert reporter.seconds_until_heartbeat() == 6.0
+    assert reporter.seconds_until_heartbeat() == 0.0
+
+
 def test_running_job_starts_and_joins_heartbeat_thread(tmp_path: Path, mocker) -> None:
     path = tmp_path / "health.json"
     thread = mocker.patch("renamarr.healthcheck.health_reporter.Thread")
@@ -69,6 +79,27 @@ def test_running_job_returns_to_idle_after_exception(tmp_path: Path) -> None:
     assert json.loads(path.read_text(encoding="utf-8"))["state"] == "idle"
 
 
+def test_overlapping_jobs_share_heartbeat_until_last_job_finishes(
+    tmp_path: Path, mocker
+) -> None:
+    path = tmp_path / "health.json"
+    thread = mocker.patch("renamarr.healthcheck.health_reporter.Thread")
+    reporter = HealthReporter(path=path, heartbeat_interval=60.0)
+
+    with reporter.running_job():
+        with reporter.running_job():
+            reporter.idle()
+            assert json.loads(path.read_text(encoding="utf-8"))["state"] == "running"
+
+        assert json.loads(path.read_text(encoding="utf-8"))["state"] == "running"
+        thread.return_value.join.assert_not_called()
+
+    thread.assert_called_once()
+    thread.return_value.start.assert_called_once_with()
+    thread.return_value.join.assert_called_once_with()
+    assert json.loads(path.read_text(encoding="utf-8"))["state"] == "idle"
+
+
 def test_job_heartbeat_refreshes_until_stopped(tmp_path: Path, mocker) -> None:
     path = tmp_path / "health.json"
     stopped = mocker.Mock()
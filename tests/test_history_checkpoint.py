@@ -0,0 +1,138 @@
+import sqlite3
+
+from pycliarr.api import SonarrCli
+
+from renamarr.common.history_checkpoint import EPOCH, HistoryCheckpoint
+
+IMPORTED = "downloadFolderImported"
+
+
+def history_record(id: int, series_id: int, event_type: str = IMPORTED) -> dict:
+    return {
+        "id": id,
+        "seriesId": series_id,
+        "eventType": event_type,
+        "date": f"2024-01-01T00:00:{id:02}Z",
+    }
+
+
+def checkpoint_for(
+    connection: sqlite3.Connection, sonarr_cli: SonarrCli, full_sweep_runs: int = 24
+) -> HistoryCheckpoint:
+    return HistoryCheckpoint(
+        connection, sonarr_cli, "seriesId", (IMPORTED,), full_sweep_runs
+    )
+
+
+def stored_checkpoint(connection: sqlite3.Connection) -> tuple | None:
+    return connection.execute(
+        "SELECT date, history_id, runs_since_full_sweep FROM history_checkpoint"
+    ).fetchone()
+
+
+class TestHistoryCheckpoint:
+    def test_missing_checkpoint_requests_full_sweep_from_newest_history(
+        self, mocker
+    ) -> None:
+        connection = sqlite3.connect(":memory:")
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        request_get = mocker.patch.object(
+            sonarr_cli, "request_get", return_value={"records": [history_record(7, 1)]}
+        )
+        history_checkpoint = checkpoint_for(connection, sonarr_cli)
+
+        assert history_checkpoint.changed_item_ids() is None
+        assert stored_checkpoint(connection) is None
+
+        history_checkpoint.save()
+
+        request_get.assert_called_once_with(
+            path="/api/v3/history",
+            url_params={
+                "page": 1,
+                "pageSize": 1,
+                "sortKey": "date",
+                "sortDirection": "descending",
+            },
+        )
+        assert stored_checkpoint(connection) == ("2024-01-01T00:00:07Z", 7, 0)
+
+    def test_full_sweep_with_empty_history_checkpoints_at_epoch(self, mocker) -> None:
+        connection = sqlite3.connect(":memory:")
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        mocker.patch.object(sonarr_cli, "request_get", return_value={"records": []})
+        history_checkpoint = checkpoint_for(connection, sonarr_cli)
+
+        assert history_checkpoint.changed_item_ids() is None
+        history_checkpoint.save()
+
+        assert stored_checkpoint(connection) == (EPOCH, 0, 0)
+
+    def test_returns_items_with_import_events_after_checkpoint(self, mocker) -> None:
+        connection = sqlite3.connect(":memory:")
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        history_checkpoint = checkpoint_for(connection, sonarr_cli)
+        connection.execute(
+            "INSERT INTO history_checkpoint VALUES (0, '2024-01-01T00:00:05Z', 5, 0)"
+        )
+        request_get = mocker.patch.object(
+            sonarr_cli,
+            "request_get",
+            return_value=[
+                history_record(5, 1),
+                history_record(9, 2),
+                history_record(6, 3),
+                history_record(8, 4, "grabbed"),
+            ],
+        )
+
+        assert history_checkpoint.changed_item_ids() == {2, 3}
+        history_checkpoint.save()
+
+        request_get.assert_called_once_with(
+            path="/api/v3/history/since",
+            url_params={"date": "2024-01-01T00:00:05Z"},
+        )
+        assert stored_checkpoint(connection) == ("2024-01-01T00:00:09Z", 9, 1)
+
+    def test_keeps_checkpoint_position_when_history_is_quiet(self, mocker) -> None:
+        connection = sqlite3.connect(":memory:")
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        history_checkpoint = checkpoint_for(connection, sonarr_cli)
+        connection.execute(
+            "INSERT INTO history_checkpoint VALUES (0, '2024-01-01T00:00:05Z', 5, 2)"
+        )
+        mocker.patch.object(
+            sonarr_cli, "request_get", return_value=[history_record(5, 1)]
+        )
+
+        assert history_checkpoint.changed_item_ids() == set()
+        history_checkpoint.save()
+
+        assert stored_checkpoint(connection) == ("2024-01-01T00:00:05Z", 5, 3)
+
+    def test_requests_full_sweep_every_configured_number_of_runs(self, mocker) -> None:
+        connection = sqlite3.connect(":memory:")
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        history_checkpoint = checkpoint_for(connection, sonarr_cli, full_sweep_runs=3)
+        connection.execute(
+            "INSERT INTO history_checkpoint VALUES (0, '2024-01-01T00:00:05Z', 5, 2)"
+        )
+        mocker.patch.object(
+            sonarr_cli, "request_get", return_value={"records": [history_record(9, 1)]}
+        )
+
+        assert history_checkpoint.changed_item_ids() is None
+        history_checkpoint.save()
+
+        assert stored_checkpoint(connection) == ("2024-01-01T00:00:09Z", 9, 0)
+
+    def test_save_without_pending_checkpoint_does_nothing(self) -> None:
+        connection = sqlite3.connect(":memory:")
+        history_checkpoint = checkpoint_for(
+            connection, SonarrCli("test.tld", "test-api-key")
+        )
+
+        history_checkpoint.save()
+
+        assert stored_checkpoint(connection) is None
@@ -0,0 +1,88 @@
+from threading import Event
+
+import pytest
+from loguru import logger
+
+from renamarr.common.job_runner import JobRunner
+
+
+class TestJobRunner:
+    def test_runs_jobs_inline_by_default(self, mocker) -> None:
+        job = mocker.Mock()
+        job_runner = JobRunner()
+
+        job_runner.submit("sonarr:renamarr:tv", job, "config")
+        job_runner.submit("sonarr:renamarr:tv", job, "config")
+        job_runner.shutdown()
+
+        assert job.call_args_list == [mocker.call("config"), mocker.call("config")]
+
+    def test_inline_job_errors_propagate_and_release_key(self, mocker) -> None:
+        job = mocker.Mock(side_effect=[RuntimeError("job failed"), None])
+        job_runner = JobRunner()
+
+        with pytest.raises(RuntimeError, match="job failed"):
+            job_runner.submit("sonarr:renamarr:tv", job)
+        job_runner.submit("sonarr:renamarr:tv", job)
+
+        assert job.call_count == 2
+
+    def test_runs_different_jobs_concurrently_on_workers(self) -> None:
+        first_started = Event()
+        second_started = Event()
+
+        def first_job() -> None:
+            first_started.set()
+            assert second_started.wait(5)
+
+        def second_job() -> None:
+            second_started.set()
+            assert first_started.wait(5)
+
+        job_runner = JobRunner(max_workers=2)
+        job_runner.submit("sonarr:renamarr:tv", first_job)
+        job_runner.submit("radarr:renamarr:movies", second_job)
+        job_runner.shutdown()
+
+        assert first_started.is_set()
+        assert second_started.is_set()
+
+    def test_skips_job_that_is_still_running(self, mock_loguru_warning) -> None:
+        release = Event()
+        runs: list[str] = []
+
+        def job(name: str) -> None:
+            runs.append(name)
+            release.wait(5)
+
+        job_runner = JobRunner(max_workers=2)
+        assert job_runner.submit("sonarr:renamarr:tv", job, "first") is True
+        assert job_runner.submit("sonarr:renamarr:tv", job, "overlap") is False
+        release.set()
+        job_runner.shutdown()
+
+        assert runs == ["first"]
+        mock_loguru_warning.assert_called_once_with(
+            "Skipping sonarr:renamarr:tv, previous run is still in progress"
+        )
+
+    def test_logs_worker_errors_and_releases_key(self, mocker) -> None:
+        catch = mocker.spy(logger, "catch")
+        job_runner = JobRunner(max_workers=2)
+
+        job_runner.submit(
+            "sonarr:renamarr:tv", mocker.Mock(side_effect=RuntimeError("job failed"))
+        )
+        job_runner.shutdown()
+
+        catch.assert_called_once_with(message="Unhandled error in sonarr:renamarr:tv")
+        assert job_runner._running == set()
+
+    @pytest.mark.parametrize("cancel_pending", [False, True])
+    def test_shutdown_can_drop_queued_jobs(self, cancel_pending, mocker) -> None:
+        job_runner = JobRunner(max_workers=2)
+        shutdown = mocker.spy(job_runner._executor, "shutdown")
+
+        job_runner.shutdown(cancel_pending=cancel_pending)
+
+        shutdown.assert_called_once_with(wait=True, cancel_futures=cancel_pending)
@@ -0,0 +1,151 @@
+import json
+
+import pytest
+from pycliarr.api import SonarrCli
+from pycliarr.api.exceptions import CliArrError, CliDecodeError, CliServerError
+from requests import ConnectionError as RequestsConnectionError
+
+from renamarr.common.json_stream import CHUNK_SIZE, iter_json_array, stream_json_array
+from renamarr.common.run_summary import RunSummary
+
+DOCUMENT = [
+    {"id": 1, "title": "Amélie", "tags": [1, 2], "monitored": True},
+    {"id": 2, "title": "Ünïcödé 🎬", "path": None},
+    12345,
+    "text, with ] and [",
+]
+
+
+def chunked(data: bytes, size: int) -> list[bytes]:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class TestIterJsonArray:
+    @pytest.mark.parametrize("split", range(1, 40))
+    def test_decodes_the_array_wherever_chunks_split(self, split: int) -> None:
+        data = json.dumps(DOCUMENT, ensure_ascii=False, indent=2).encode()
+
+        assert list(iter_json_array(chunked(data, split))) == DOCUMENT
+
+    def test_trailing_number_split_across_chunks_is_not_cut_short(self) -> None:
+        assert list(iter_json_array([b"[12", b"34", b"5]"])) == [12345]
+
+    @pytest.mark.parametrize(
+        ("chunks", "expected"),
+        [
+            ([b"[1.", b"5]"], [1.5]),
+            ([b"[1e", b"5]"], [1e5]),
+            ([b"[2, 1", b".5e", b"-2 ", b" ]"], [2, 1.5e-2]),
+        ],
+        ids=["at-point", "at-exponent", "at-both"],
+    )
+    def test_float_split_across_chunks_is_not_cut_short(
+        self, chunks: list[bytes], expected: list[float]
+    ) -> None:
+        assert list(iter_json_array(chunks)) == expected
+
+    @pytest.mark.parametrize("chunks", [[b"[]"], [b" [ ", b" ] \n"]])
+    def test_empty_array(self, chunks: list[bytes]) -> None:
+        assert list(iter_json_array(chunks)) == []
+
+    def test_elements_are_yielded_before_the_array_ends(self) -> None:
+        def chunks():
+            yield b'[{"id": 1}, '
+            raise AssertionError("read past the first element")
+
+        assert next(iter_json_array(chunks())) == {"id": 1}
+
+    @pytest.mark.parametrize(
+        ("chunks", "message"),
+        [
+            ([b""], "Expected a JSON array"),
+            ([b'{"id": 1}'], "Expected a JSON array"),
+            ([b"[1, "], "JSON array ended early"),
+            ([b"[1 2]"], "Expected ',' or ']' in JSON array, got '2'"),
+            ([b"[1"], "Expected ',' or ']' in JSON array, got None"),
+            ([b'[{"id": 1'], "Invalid JSON array element '{\"id\": 1'"),
+            ([b"[1] 2"], "Unexpected data after JSON array"),
+        ],
+        ids=[
+            "empty",
+            "not-an-array",
+            "ends-after-separator",
+            "missing-separator",
+            "unterminated",
+            "truncated-element",
+            "trailing-data",
+        ],
+    )
+    def test_invalid_json_raises_decode_error(
+        self, chunks: list[bytes], message: str
+    ) -> None:
+        with pytest.raises(CliDecodeError, match=message):
+            list(iter_json_array(chunks))
+
+
+class TestStreamJsonArray:
+    def response(self, mocker, status_code: int = 200, chunks=()):
+        response = mocker.MagicMock(status_code=status_code, text="error body")
+        response.__enter__.return_value = response
+        response.iter_content.return_value = chunks
+        return response
+
+    def test_streams_the_endpoint_and_counts_bytes(self, mocker) -> None:
+        sonarr_cli = SonarrCli("http://test.tld", "test-api-key")
+        response = self.response(mocker, chunks=[b'[{"id": 1},', b' {"id": 2}]'])
+        get = mocker.patch.object(sonarr_cli._session, "get", return_value=response)
+        run_summary = RunSummary()
+
+        items = list(stream_json_array(sonarr_cli, "/api/v3/series", run_summary))
+
+        assert items == [{"id": 1}, {"id": 2}]
+        get.assert_called_once_with(
+            "http://test.tld/api/v3/series", params=None, stream=True
+        )
+        response.iter_content.assert_called_once_with(CHUNK_SIZE)
+        response.__exit__.assert_called_once()
+        assert run_summary.as_dict()["bytes_received"] == 22
+
+    def test_without_run_summary_counts_nothing(self, mocker) -> None:
+        sonarr_cli = SonarrCli("http://test.tld", "test-api-key")
+        mocker.patch.object(
+            sonarr_cli._session,
+            "get",
+            return_value=self.response(mocker, chunks=[b"[]"]),
+        )
+
+        assert list(stream_json_array(sonarr_cli, "/api/v3/series")) == []
+
+    def test_error_status_raises_server_error(self, mocker) -> None:
+        sonarr_cli = SonarrCli("http://test.tld", "test-api-key")
+        response = self.response(mocker, status_code=401)
+        mocker.patch.object(sonarr_cli._session, "get", return_value=response)
+
+        with pytest.raises(CliServerError) as error:
+            list(stream_json_array(sonarr_cli, "/api/v3/series"))
+
+        assert error.value.status_code == 401
+        response.iter_content.assert_not_called()
+        response.__exit__.assert_called_once()
+
+    def test_failed_request_raises_cli_error(self, mocker) -> None:
+        sonarr_cli = SonarrCli("http://test.tld", "test-api-key")
+        mocker.patch.object(
+            sonarr_cli._session, "get", side_effect=RequestsConnectionError("refused")
+        )
+
+        with pytest.raises(CliArrError, match="Error sending request"):
+            list(stream_json_array(sonarr_cli, "/api/v3/series"))
+
+    def test_connection_lost_mid_stream_raises_cli_error(self, mocker) -> None:
+        def chunks():
+            yield b'[{"id": 1},'
+            raise RequestsConnectionError("reset")
+
+        sonarr_cli = SonarrCli("http://test.tld", "test-api-key")
+        response = self.response(mocker, chunks=chunks())
+        mocker.patch.object(sonarr_cli._session, "get", return_value=response)
+
+        with pytest.raises(CliArrError, match="Error reading response"):
+            list(stream_json_array(sonarr_cli, "/api/v3/series"))
+        response.__exit__.assert_called_once()
@@ -0,0 +1,51 @@
+import pytest
+from pycliarr.api import RadarrCli, SonarrCli
+
+from renamarr.common.list_fetcher import ListFetcher
+from renamarr.common.run_summary import RunSummary
+
+
+class TestListFetcher:
+    @pytest.mark.parametrize(
+        ("version", "expected_params"),
+        [
+            ("5.14.0.9383", {"excludeLocalCovers": "true"}),
+            ("4.7.5.7809", None),
+            ("", None),
+        ],
+        ids=["supported", "too-old", "unknown"],
+    )
+    def test_fetch_requests_light_list_when_server_supports_it(
+        self, version, expected_params, mocker
+    ) -> None:
+        radarr_cli = RadarrCli("test.tld", "test-api-key")
+        mocker.patch.object(
+            radarr_cli, "get_system_status", return_value={"version": version}
+        )
+        stream_json_array = mocker.patch(
+            "renamarr.common.list_fetcher.stream_json_array",
+            return_value=iter([{"id": 1}]),
+        )
+        run_summary = RunSummary()
+
+        movies = list(ListFetcher(radarr_cli).fetch("/api/v3/movie", run_summary))
+
+        assert movies == [{"id": 1}]
+        stream_json_array.assert_called_once_with(
+            radarr_cli, "/api/v3/movie", run_summary, params=expected_params
+        )
+
+    @pytest.mark.parametrize("path", ["/api/v3/series", "/api/v3/rootfolder"])
+    def test_lists_without_light_representation_skip_the_probe(
+        self, path, mocker
+    ) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        get_system_status = mocker.patch.object(sonarr_cli, "get_system_status")
+        stream_json_array = mocker.patch(
+            "renamarr.common.list_fetcher.stream_json_array"
+        )
+
+        ListFetcher(sonarr_cli).fetch(path)
+
+        get_system_status.assert_not_called()
+        stream_json_array.assert_called_once_with(sonarr_cli, path, None, params=None)
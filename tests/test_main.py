@@ -1,4 +1,5 @@
 import os
+import signal
 from collections.abc import Generator
 from contextlib import nullcontext
 from pathlib import Path
@@ -8,11 +9,15 @@ import pytest
 from loguru import logger
 from pycliarr.api import CliArrError
 from pyconfigparser import ConfigError, ConfigFileNotFoundError, configparser
-from schedule import Job, Scheduler, clear, get_jobs
+from schedule import Job, Scheduler, clear, get_jobs, run_all
 
 from config_schema import CONFIG_SCHEMA
 from main import Main
+from renamarr.common.client_registry import ClientRegistry
+from renamarr.common.job_runner import JobRunner
+from renamarr.common.plan_writer import PlanWriteError
 from renamarr.healthcheck.health_reporter import HealthReporter
+from renamarr.metrics.metrics_registry import MetricsRegistry
 
 # disable config caching
 configparser.hold_an_instance = False
@@ -23,14 +28,25 @@ class TestMain:
     def health_reporter(self, mocker) -> None:
         self.health_reporter = mocker.Mock(spec=HealthReporter)
         self.health_reporter.running_job.side_effect = nullcontext
+        self.health_reporter.seconds_until_heartbeat.return_value = 0.0
         mocker.patch("main.HealthReporter", return_value=self.health_reporter)
 
+    @pytest.fixture(autouse=True)
+    def client_registry(self, mocker) -> None:
+        self.client_registry = mocker.Mock(spec=ClientRegistry)
+        mocker.patch("main.ClientRegistry", return_value=self.client_registry)
+
+    @pytest.fixture(autouse=True)
+    def metrics_registry(self, mocker) -> None:
+        self.metrics_registry = mocker.Mock(spec=MetricsRegistry)
+        self.metrics_registry.job.side_effect = lambda *args: nullcontext()
+        mocker.patch("main.MetricsRegistry", return_value=self.metrics_registry)
+
     @pytest.fixture
     def enable_scheduler(self, mocker) -> Generator:
         """
         Allows scheduler loop to enter, exactly one time, and then exit
         """
-        mocker.patch("main.sleep").return_value = None
         Main.RUN_SCHEDULER = PropertyMock(side_effect=[True, False])
         yield
         Main.RUN_SCHEDULER = True
@@ -92,6 +108,301 @@ class TestMain:
         radarr_renamarr.assert_not_called()
         job.assert_not_called()
 
+    def test_metrics_server_is_off_by_default(self, config, mocker) -> None:
+        mocker.patch("pyconfigparser.configparser.get_config").return_value = config
+        metrics_server = mocker.patch("main.MetricsServer")
+
+        Main().start()
+
+        metrics_server.assert_not_called()
+
+    def test_metrics_server_serves_while_running_when_port_is_set(
+        self, config, mock_loguru_info, monkeypatch, mocker
+    ) -> None:
+        monkeypatch.setenv("METRICS_PORT", "9707")
+        mocker.patch("pyconfigparser.configparser.get_config").return_value = config
+        metrics_server = mocker.patch("main.MetricsServer")
+        metrics_server.return_value.port = 9707
+
+        Main().start()
+
+        metrics_server.assert_called_once_with(self.metrics_registry, 9707)
+        metrics_server.return_value.start.assert_called_once_with()
+        metrics_server.return_value.stop.assert_called_once_with()
+        mock_loguru_info.assert_any_call("Serving metrics on port 9707")
+
+    def test_webhook_server_is_off_by_default(self, config, mocker) -> None:
+        mocker.patch("pyconfigparser.configparser.get_config").return_value = config
+        webhook_server = mocker.patch("main.WebhookServer")
+
+        Main().start()
+
+        webhook_server.assert_not_called()
+
+    def test_webhook_server_listens_for_renamarr_instances_when_port_is_set(
+        self, config, mock_loguru_info, monkeypatch, mocker
+    ) -> None:
+        config.sonarr[0].renamarr.enabled = True
+        config.radarr[1].renamarr.enabled = True
+        monkeypatch.setenv("WEBHOOK_PORT", "9708")
+        monkeypatch.setenv("WEBHOOK_DEBOUNCE_SECONDS", "5")
+        mocker.patch("pyconfigparser.configparser.get_config").return_value = config
+        mocker.patch.object(Job, "do")
+        mocker.patch("main.SonarrRenamarr")
+        mocker.patch("main.RadarrRenamarr")
+        webhook_debouncer = mocker.patch("main.WebhookDebouncer")
+        webhook_server = mocker.patch("main.WebhookServer")
+        webhook_server.return_value.port = 9708
+
+        Main().start()
+
+        assert webhook_debouncer.call_args.kwargs == {
+            "delay_seconds": 5.0,
+            "max_delay_seconds": 300.0,
+        }
+        api_keys, on_event, port = webhook_server.call_args.args
+        assert api_keys == {
+            ("sonarr", config.sonarr[0].name): config.sonarr[0].api_key,
+            ("radarr", config.radarr[1].name): config.radarr[1].api_key,
+        }
+        assert port == 9708
+        webhook_server.return_value.start.assert_called_once_with()
+        webhook_server.return_value.stop.assert_called_once_with()
+        webhook_debouncer.return_value.cancel.assert_called_once_with()
+        mock_loguru_info.assert_any_call("Listening for webhooks on port 9708")
+
+        on_event("sonarr", config.sonarr[0].name, 1)
+
+        webhook_debouncer.return_value.add.assert_called_once_with(
+            "sonarr", config.sonarr[0].name, {1}
+        )
+
+    def test_webhook_server_keeps_scheduler_running_without_scheduled_jobs(
+        self, config, enable_scheduler, monkeypatch, mocker
+    ) -> None:
+        config.sonarr[0].renamarr.enabled = True
+        config.sonarr[0].renamarr.schedule.enabled = False
+        monkeypatch.setenv("WEBHOOK_PORT", "9708")
+        mocker.patch("pyconfigparser.configparser.get_config").return_value = config
+        mocker.patch("main.SonarrRenamarr")
+        mocker.patch("main.WebhookDebouncer")
+        mocker.patch("main.WebhookServer")
+
+        Main().start()
+
+        self.health_reporter.heartbeat.assert_called_once_with()
+
+    @pytest.mark.parametrize(
+        ("idle_seconds", "seconds_until_heartbeat", "timeout"),
+        [
+            (4.0, 10.0, 4.0),
+            (30.0, 3.0, 3.0),
+            (-2.0, 10.0, 0.0),
+            (None, 10.0, 10.0),
+        ],
+    )
+    def test_scheduler_waits_until_next_job_or_heartbeat(
+        self,
+        config,
+        enable_scheduler,
+        idle_seconds,
+        seconds_until_heartbeat,
+        timeout,
+        monkeypatch,
+        mocker,
+    ) -> None:
+        config.sonarr[0].renamarr.enabled = True
+        config.sonarr[0].renamarr.schedule.enabled = False
+        monkeypatch.setenv("WEBHOOK_PORT", "9708")
+        mocker.patch("pyconfigparser.configparser.get_config").return_value = config
+        mocker.patch("main.SonarrRenamarr")
+        mocker.patch("main.WebhookDebouncer")
+        mocker.patch("main.WebhookServer")
+        mocker.patch("main.schedule.idle_seconds", return_value=idle_seconds)
+        self.health_reporter.seconds_until_heartbeat.return_value = (
+            seconds_until_heartbeat
+        )
+        main = Main()
+        main._wake_up = mocker.Mock()
+
+        main.start()
+
+        main._wake_up.wait.assert_called_once_with(timeout)
+
+    def test_stop_wakes_the_scheduler_loop(self, config, monkeypatch, mocker) -> None:
+        config.sonarr[0].renamarr.enabled = True
+        config.sonarr[0].renamarr.schedule.enabled = False
+        monkeypatch.setenv("WEBHOOK_PORT", "9708")
+        monkeypatch.setattr(Main, "RUN_SCHEDULER", True)
+        mocker.patch("pyconfigparser.configparser.get_config").return_value = config
+        mocker.patch("main.SonarrRenamarr")
+        mocker.patch("main.WebhookDebouncer")
+        mocker.patch("main.WebhookServer")
+        self.health_reporter.seconds_until_heartbeat.return_value = 3600.0
+        main = Main()
+        run_pending = mocker.patch("main.schedule.run_pending", side_effect=main.stop)
+
+        main.start()
+
+        run_pending.assert_called_once_with()
+        assert main.RUN_SCHEDULER is False
+        self.health_reporter.heartbeat.assert_called_once_with()
+
+    @pytest.mark.parametrize("signum", [signal.SIGTERM, signal.SIGINT])
+    def test_shutdown_signal_asks_running_jobs_to_stop(
+        self, config, signum, mock_loguru_info, mocker
+    ) -> None:
+        config.sonarr[0].renamarr.enabled = True
+        config.sonarr[0].renamarr.schedule.enabled = False
+        config.radarr[0].renamarr.enabled = True
+        config.radarr[0].renamarr.schedule.enabled = False
+        mocker.patch("pyconfigparser.configparser.get_config").return_value = config
+        sonarr_renamarr = mocker.patch("main.SonarrRenamarr")
+        sonarr_renamarr.return_value.scan.side_effect = lambda: (
+            signal.raise_signal(signum) or mocker.MagicMock()
+        )
+        radarr_renamarr = mocker.patch("main.RadarrRenamarr")
+        shutdown = mocker.spy(JobRunner, "shutdown")
+        previous_handler = signal.getsignal(signum)
+
+        Main().start()
+
+        stop_requested = sonarr_renamarr.call_args.kwargs["stop_requested"]
+        assert stop_requested.is_set()
+        assert radarr_renamarr.call_args.kwargs["stop_requested"] is stop_requested
+        mock_loguru_info.assert_any_call(
+            f"Received {signum.name}, stopping after the current item"
+        )
+        assert signal.getsignal(signum) is previous_handler
+        shutdown.assert_called_once_with(mocker.ANY, cancel_pending=True)
+
+    @pytest.mark.parametrize(
+        ("service", "renamarr_class"),
+        [
+            ("sonarr", "main.SonarrRenamarr"),
+            ("radarr", "main.RadarrRenamarr"),
+        ],
+    )
+    def test_webhook_flush_runs_targeted_renamarr_job_on_the_scheduler_loop(
+        self, config, service, renamarr_class, monkeypatch, mocker
+    ) -> None:
+        service_config = getattr(config, service)[0]
+        service_config.renamarr.enabled = True
+        service_config.renamarr.schedule.enabled = False
+        monkeypatch.setenv("WEBHOOK_PORT", "9708")
+        monkeypatch.setattr(Main, "RUN_SCHEDULER", True)
+        mocker.patch("pyconfigparser.configparser.get_config").return_value = config
+        renamarr = mocker.patch(renamarr_class)
+        webhook_debouncer = mocker.patch("main.WebhookDebouncer")
+        mocker.patch("main.WebhookServer")
+        main = Main()
+
+        def flush_from_timer_thread() -> None:
+            flush = webhook_debouncer.call_args.args[0]
+            flush(service, service_config.name, {3, 4})
+            renamarr.return_value.scan_items.assert_not_called()
+
+        mocker.patch("main.schedule.run_pending", side_effect=flush_from_timer_thread)
+        mocker.patch.object(main._wake_up, "wait", side_effect=lambda _: main.stop())
+
+        main.start()
+
+        renamarr.return_value.scan_items.assert_called_once_with({3, 4})
+        self.metrics_registry.record_counts.assert_called_with(
+            service,
+            service_config.name,
+            renamarr.return_value.scan_items.return_value.as_dict.return_value[
+                "counts"
+            ],
+        )
+
+    def test_webhook_run_for_busy_instance_is_requeued(
+        self, config, monkeypatch, mocker, mock_loguru_debug
+    ) -> None:
+        config.sonarr[0].renamarr.enabled = True
+        config.sonarr[0].renamarr.schedule.enabled = False
+        monkeypatch.setenv("WEBHOOK_PORT", "9708")
+        monkeypatch.setattr(Main, "RUN_SCHEDULER", True)
+        mocker.patch("pyconfigparser.configparser.get_config").return_value = config
+        mocker.patch("main.SonarrRenamarr")
+        webhook_debouncer = mocker.patch("main.WebhookDebouncer")
+        mocker.patch("main.WebhookServer")
+        mocker.patch.object(JobRunner, "submit", return_value=False)
+        main = Main()
+        mocker.patch(
+            "main.schedule.run_pending",
+            side_effect=lambda: webhook_debouncer.call_args.args[0](
+                "sonarr", config.sonarr[0].name, {3}
+            ),
+        )
+        mocker.patch.object(main._wake_up, "wait", side_effect=lambda _: main.stop())
+
+        main.start()
+
+        webhook_debouncer.return_value.add.assert_called_once_with(
+            "sonarr", config.sonarr[0].name, {3}
+        )
+        mock_loguru_debug.assert_any_call("Requeued 1 webhook items")
+
+    def test_webhook_runs_queued_at_shutdown_are_dropped(
+        self, config, monkeypatch, mocker
+    ) -> None:
+        config.sonarr[0].renamarr.enabled = True
+        config.sonarr[0].renamarr.schedule.enabled = False
+        monkeypatch.setenv("WEBHOOK_PORT", "9708")
+        monkeypatch.setattr(Main, "RUN_SCHEDULER", True)
+        mocker.patch("pyconfigparser.configparser.get_config").return_value = config
+        renamarr = mocker.patch("main.SonarrRenamarr")
+        webhook_debouncer = mocker.patch("main.WebhookDebouncer")
+        mocker.patch("main.WebhookServer")
+        main = Main()
+
+        def flush_then_stop() -> None:
+            webhook_debouncer.call_args.args[0]("sonarr", config.sonarr[0].name, {3})
+            main.stop()
+
+        mocker.patch("main.schedule.run_pending", side_effect=flush_then_stop)
+
+        main.start()
+
+        renamarr.return_value.scan_items.assert_not_called()
+
+    @pytest.mark.parametrize("service", ["sonarr", "radarr"])
+    def test_renamarr_job_records_metrics(self, config, service: str, mocker) -> None:
+        service_config = getattr(config, service)[0]
+        service_config.renamarr.enabled = True
+        mocker.patch("pyconfigparser.configparser.get_config").return_value = config
+        mocker.patch.object(Job, "do")
+        renamarr = mocker.patch(
+            "main.SonarrRenamarr" if service == "sonarr" else "main.RadarrRenamarr"
+        )
+
+        Main().start()
+
+        self.metrics_registry.instrument.assert_called_once_with(
+            self.client_registry.get_client.return_value, service, service_config.name
+        )
+        self.metrics_registry.job.assert_called_once_with(
+            service, service_config.name, "renamarr"
+        )
+        self.metrics_registry.record_counts.assert_called_once_with(
+            service,
+            service_config.name,
+            renamarr.return_value.scan.return_value.as_dict.return_value["counts"],
+        )
+
+    def test_sonarr_series_scanner_job_records_metrics(self, config, mocker) -> None:
+        config.sonarr[0].series_scanner.enabled = True
+        mocker.patch("pyconfigparser.configparser.get_config").return_value = config
+        mocker.patch.object(Job, "do")
+        mocker.patch("main.SonarrSeriesScanner")
+
+        Main().start()
+
+        self.metrics_registry.job.assert_called_once_with(
+            "sonarr", config.sonarr[0].name, "series_scanner"
+        )
+
     def test_sonarr_series_scanner_scan(self, config, mocker) -> None:
         config.sonarr[0].series_scanner.enabled = True
         mocker.patch("pyconfigparser.configparser.get_config").return_value = config
@@ -106,6 +417,11 @@ class TestMain:
             url=config.sonarr[0].url,
             api_key=config.sonarr[0].api_key,
             hours_before_air=config.sonarr[0].series_scanner.hours_before_air,
+            sonarr_cli=self.client_registry.get_client.return_value,
+            use_calendar=config.sonarr[0].series_scanner.use_calendar,
+            calendar_lookback_days=config.sonarr[
+                0
+            ].series_scanner.calendar_lookback_days,
         )
         sonarr_series_scanner.return_value.scan.assert_called_once_with()
         self.health_reporter.running_job.assert_called_once_with()
@@ -116,7 +432,7 @@ class TestMain:
             config_dir="tests/fixtures",
             file_name="disabled.yml",
         )
-        set_directory = mocker.patch("main.set_directory")
+        set_directory = mocker.patch("config_loader.set_directory")
         get_config = mocker.patch("pyconfigparser.configparser.get_config")
         get_config.return_value = config
         mocker.patch.object(Job, "do")
@@ -184,6 +500,25 @@ class TestMain:
         assert load_dotenv.call_args.args == (".env.local",)
         assert logger_add.called
 
+    def test_max_concurrent_jobs_runs_instance_jobs_on_worker_pool(
+        self, config, monkeypatch, mocker
+    ) -> None:
+        monkeypatch.setenv("MAX_CONCURRENT_JOBS", "3")
+        config.sonarr[0].renamarr.enabled = True
+        config.sonarr[0].renamarr.schedule.enabled = False
+        config.radarr[0].renamarr.enabled = True
+        config.radarr[0].renamarr.schedule.enabled = False
+        mocker.patch("pyconfigparser.configparser.get_config").return_value = config
+        job_runner = mocker.patch("main.JobRunner", wraps=JobRunner)
+        sonarr_renamarr = mocker.patch("main.SonarrRenamarr")
+        radarr_renamarr = mocker.patch("main.RadarrRenamarr")
+
+        Main().start()
+
+        job_runner.assert_called_once_with(3)
+        sonarr_renamarr.return_value.scan.assert_called_once_with()
+        radarr_renamarr.return_value.scan.assert_called_once_with()
+
     def test_sonarr_log_to_file_configures_instance_sink(
         self, config, log_dir, log_retention, log_rotation, log_level, mocker
     ) -> None:
@@ -191,6 +526,7 @@ class TestMain:
         config.sonarr[0].renamarr.log_to_file = True
         mocker.patch("pyconfigparser.configparser.get_config").return_value = config
         mocker.patch.object(Job, "do")
+        mocker.patch("main.SonarrRenamarr")
         main = Main()
         logger_add = mocker.patch.object(logger, "add")
 
@@ -269,6 +605,11 @@ class TestMain:
             url=config.sonarr[0].url,
             api_key=config.sonarr[0].api_key,
             hours_before_air=config.sonarr[0].series_scanner.hours_before_air,
+            sonarr_cli=self.client_registry.get_client.return_value,
+            use_calendar=config.sonarr[0].series_scanner.use_calendar,
+            calendar_lookback_days=config.sonarr[
+                0
+            ].series_scanner.calendar_lookback_days,
         )
         sonarr_series_scanner.return_value.scan.assert_called_once_with()
         job.assert_called()
@@ -328,6 +669,11 @@ class TestMain:
             url=config.sonarr[0].url,
             api_key=config.sonarr[0].api_key,
             hours_before_air=config.sonarr[0].series_scanner.hours_before_air,
+            sonarr_cli=self.client_registry.get_client.return_value,
+            use_calendar=config.sonarr[0].series_scanner.use_calendar,
+            calendar_lookback_days=config.sonarr[
+                0
+            ].series_scanner.calendar_lookback_days,
         )
         contextualize.assert_any_call(service="sonarr", instance=config.sonarr[0].name)
         mock_loguru_error.assert_called_once_with(exception)
@@ -350,6 +696,19 @@ class TestMain:
             api_key=config.sonarr[0].api_key,
             analyze_files=True,
             rename_folders=True,
+            max_concurrency=1,
+            max_requests_per_second=0,
+            cache_folder_names=False,
+            incremental=False,
+            full_sweep_runs=24,
+            command_timeout_minutes=5,
+            analyze_timeout_minutes=120,
+            defer_rescans=False,
+            rename_batch_size=0,
+            bulk_rename_preview=False,
+            dry_run=False,
+            stop_requested=mocker.ANY,
+            sonarr_cli=self.client_registry.get_client.return_value,
         )
         sonarr_renamarr.return_value.scan.assert_called_once_with()
         self.health_reporter.running_job.assert_called_once_with()
@@ -410,6 +769,99 @@ class TestMain:
         finally:
             clear()
 
+    @pytest.mark.parametrize(
+        ("service", "renamarr_class"),
+        [
+            ("sonarr", "main.SonarrRenamarr"),
+            ("radarr", "main.RadarrRenamarr"),
+        ],
+    )
+    def test_renamarr_start_offset_delays_first_and_recurring_runs(
+        self, config, service, renamarr_class, mocker
+    ) -> None:
+        service_config = getattr(config, service)[0]
+        service_config.renamarr.enabled = True
+        service_config.renamarr.schedule.start_offset_minutes = 15
+        mocker.patch("pyconfigparser.configparser.get_config").return_value = config
+        renamarr = mocker.patch(renamarr_class)
+        clear()
+
+        try:
+            Main().start()
+
+            renamarr.return_value.scan.assert_not_called()
+            jobs = get_jobs()
+            assert len(jobs) == 1
+            assert (jobs[0].interval, jobs[0].latest) == (900, None)
+            assert jobs[0].unit == "seconds"
+
+            run_all()
+
+            renamarr.return_value.scan.assert_called_once_with()
+            jobs = get_jobs()
+            assert len(jobs) == 1
+            assert jobs[0].interval == 60
+        finally:
+            clear()
+
+    def test_delayed_one_off_renamarr_run_ends_scheduler_loop(
+        self, config, mocker
+    ) -> None:
+        config.radarr[0].renamarr.enabled = True
+        config.radarr[0].renamarr.schedule.enabled = False
+        config.radarr[0].renamarr.schedule.start_offset_minutes = 5
+        mocker.patch("pyconfigparser.configparser.get_config").return_value = config
+        run_pending = mocker.patch("main.schedule.run_pending", side_effect=run_all)
+        radarr_renamarr = mocker.patch("main.RadarrRenamarr")
+        shutdown = mocker.spy(JobRunner, "shutdown")
+        clear()
+
+        try:
+            main = Main()
+            main.RUN_SCHEDULER = True
+            main.start()
+
+            radarr_renamarr.return_value.scan.assert_called_once_with()
+            run_pending.assert_called_once_with()
+            assert get_jobs() == []
+            # Nothing asked to stop, so jobs still queued must run
+            shutdown.assert_called_once_with(mocker.ANY, cancel_pending=False)
+        finally:
+            clear()
+
+    @pytest.mark.parametrize(
+        ("start_offset_minutes", "first_run_seconds"),
+        [(0, (0, 300)), (15, (900, 1200))],
+        ids=["no-offset", "after-offset"],
+    )
+    def test_renamarr_jitter_randomizes_first_and_recurring_runs(
+        self, config, start_offset_minutes, first_run_seconds, mocker
+    ) -> None:
+        config.sonarr[0].renamarr.enabled = True
+        config.sonarr[0].renamarr.schedule.jitter_minutes = 5
+        config.sonarr[0].renamarr.schedule.start_offset_minutes = start_offset_minutes
+        mocker.patch("pyconfigparser.configparser.get_config").return_value = config
+        sonarr_renamarr = mocker.patch("main.SonarrRenamarr")
+        clear()
+
+        try:
+            Main().start()
+
+            sonarr_renamarr.return_value.scan.assert_not_called()
+            jobs = get_jobs()
+            assert len(jobs) == 1
+            assert (jobs[0].interval, jobs[0].latest) == first_run_seconds
+            assert jobs[0].unit == "seconds"
+
+            run_all()
+
+            sonarr_renamarr.return_value.scan.assert_called_once_with()
+            jobs = get_jobs()
+            assert len(jobs) == 1
+            assert (jobs[0].interval, jobs[0].latest) == (55, 65)
+        finally:
+            clear()
+
     @pytest.mark.parametrize("service", ["sonarr", "radarr"])
     def test_deprecated_hourly_job_warns_before_and_after_renamarr_job(
         self, config, service: str, mock_loguru_warning, mocker
@@ -434,7 +886,9 @@ class TestMain:
                 events.append("warning")
 
         mock_loguru_warning.side_effect = record_warning
-        renamarr.return_value.scan.side_effect = lambda: events.append("scan")
+        renamarr.return_value.scan.side_effect = lambda: (
+            events.append("scan") or mocker.MagicMock()
+        )
 
         Main().start()
 
@@ -473,6 +927,19 @@ class TestMain:
             api_key=config.sonarr[0].api_key,
             analyze_files=config.sonarr[0].renamarr.analyze_files,
             rename_folders=config.sonarr[0].renamarr.rename_folders,
+            max_concurrency=config.sonarr[0].renamarr.max_concurrency,
+            max_requests_per_second=config.sonarr[0].renamarr.max_requests_per_second,
+            cache_folder_names=config.sonarr[0].renamarr.cache_folder_names,
+            incremental=config.sonarr[0].renamarr.incremental.enabled,
+            full_sweep_runs=config.sonarr[0].renamarr.incremental.full_sweep_runs,
+            command_timeout_minutes=config.sonarr[0].renamarr.command_timeout_minutes,
+            analyze_timeout_minutes=config.sonarr[0].renamarr.analyze_timeout_minutes,
+            defer_rescans=config.sonarr[0].renamarr.defer_rescans,
+            rename_batch_size=config.sonarr[0].renamarr.rename_batch_size,
+            bulk_rename_preview=config.sonarr[0].renamarr.bulk_rename_preview,
+            dry_run=config.sonarr[0].renamarr.dry_run,
+            stop_requested=mocker.ANY,
+            sonarr_cli=self.client_registry.get_client.return_value,
         )
         contextualize.assert_any_call(service="sonarr", instance=config.sonarr[0].name)
         mock_loguru_error.assert_called_once_with(exception)
@@ -544,6 +1011,19 @@ class TestMain:
             api_key=config.radarr[0].api_key,
             analyze_files=config.radarr[0].renamarr.analyze_files,
             rename_folders=config.radarr[0].renamarr.rename_folders,
+            max_concurrency=config.radarr[0].renamarr.max_concurrency,
+            max_requests_per_second=config.radarr[0].renamarr.max_requests_per_second,
+            cache_folder_names=config.radarr[0].renamarr.cache_folder_names,
+            incremental=config.radarr[0].renamarr.incremental.enabled,
+            full_sweep_runs=config.radarr[0].renamarr.incremental.full_sweep_runs,
+            command_timeout_minutes=config.radarr[0].renamarr.command_timeout_minutes,
+            analyze_timeout_minutes=config.radarr[0].renamarr.analyze_timeout_minutes,
+            defer_rescans=config.radarr[0].renamarr.defer_rescans,
+            rename_batch_size=config.radarr[0].renamarr.rename_batch_size,
+            bulk_rename_preview=config.radarr[0].renamarr.bulk_rename_preview,
+            dry_run=config.radarr[0].renamarr.dry_run,
+            stop_requested=mocker.ANY,
+            radarr_cli=self.client_registry.get_client.return_value,
         )
         radarr_renamarr.return_value.scan.assert_called_once_with()
         self.health_reporter.running_job.assert_called_once_with()
@@ -568,6 +1048,19 @@ class TestMain:
             api_key=config.radarr[0].api_key,
             analyze_files=True,
             rename_folders=True,
+            max_concurrency=1,
+            max_requests_per_second=0,
+            cache_folder_names=False,
+            incremental=False,
+            full_sweep_runs=24,
+            command_timeout_minutes=5,
+            analyze_timeout_minutes=120,
+            defer_rescans=False,
+            rename_batch_size=0,
+            bulk_rename_preview=False,
+            dry_run=False,
+            stop_requested=mocker.ANY,
+            radarr_cli=self.client_registry.get_client.return_value,
         )
         radarr_renamarr.return_value.scan.assert_called_once_with()
 
@@ -578,6 +1071,7 @@ class TestMain:
         config.radarr[0].renamarr.log_to_file = True
         mocker.patch("pyconfigparser.configparser.get_config").return_value = config
         mocker.patch.object(Job, "do")
+        mocker.patch("main.RadarrRenamarr")
         main = Main()
         logger_add = mocker.patch.object(logger, "add")
 
@@ -620,6 +1114,24 @@ class TestMain:
             mock_loguru_warning.call_args_list[-1].args[0], PermissionError
         )
 
+    @pytest.mark.parametrize(
+        ("service", "renamarr_class"),
+        [("sonarr", "main.SonarrRenamarr"), ("radarr", "main.RadarrRenamarr")],
+    )
+    def test_renamarr_plan_write_error_is_logged(
+        self, config, service, renamarr_class, mock_loguru_error, mocker
+    ) -> None:
+        getattr(config, service)[0].renamarr.enabled = True
+        mocker.patch("pyconfigparser.configparser.get_config").return_value = config
+        mocker.patch.object(Job, "do")
+        exception = PlanWriteError("Unable to write plan file")
+        renamarr = mocker.patch(renamarr_class)
+        renamarr.return_value.scan.side_effect = exception
+
+        Main().start()
+
+        mock_loguru_error.assert_called_once_with(exception)
+
     def test_radarr_renamarr_pycliarr_exception(
         self, config, mock_loguru_error, mocker
     ) -> None:
@@ -643,6 +1155,19 @@ class TestMain:
             api_key=config.radarr[0].api_key,
             analyze_files=config.radarr[0].renamarr.analyze_files,
             rename_folders=config.radarr[0].renamarr.rename_folders,
+            max_concurrency=config.radarr[0].renamarr.max_concurrency,
+            max_requests_per_second=config.radarr[0].renamarr.max_requests_per_second,
+            cache_folder_names=config.radarr[0].renamarr.cache_folder_names,
+            incremental=config.radarr[0].renamarr.incremental.enabled,
+            full_sweep_runs=config.radarr[0].renamarr.incremental.full_sweep_runs,
+            command_timeout_minutes=config.radarr[0].renamarr.command_timeout_minutes,
+            analyze_timeout_minutes=config.radarr[0].renamarr.analyze_timeout_minutes,
+            defer_rescans=config.radarr[0].renamarr.defer_rescans,
+            rename_batch_size=config.radarr[0].renamarr.rename_batch_size,
+            bulk_rename_preview=config.radarr[0].renamarr.bulk_rename_preview,
+            dry_run=config.radarr[0].renamarr.dry_run,
+            stop_requested=mocker.ANY,
+            radarr_cli=self.client_registry.get_client.return_value,
         )
         contextualize.assert_any_call(service="radarr", instance=config.radarr[0].name)
         mock_loguru_error.assert_called_once_with(exception)
@@ -0,0 +1,129 @@
+from datetime import timedelta
+
+import pytest
+from pycliarr.api import SonarrCli
+
+from renamarr.metrics.metrics_registry import MetricsRegistry
+
+
+def sample_lines(metrics_registry: MetricsRegistry, name: str) -> list[str]:
+    return [
+        line for line in metrics_registry.render().splitlines() if line.startswith(name)
+    ]
+
+
+class TestMetricsRegistry:
+    def test_render_includes_help_and_type_for_every_metric(self) -> None:
+        rendered = MetricsRegistry().render()
+
+        assert rendered.endswith("\n")
+        for name, metric_type in [
+            ("renamarr_api_request_duration_seconds", "histogram"),
+            ("renamarr_job_duration_seconds", "histogram"),
+            ("renamarr_job_failures_total", "counter"),
+            ("renamarr_job_last_success_timestamp_seconds", "gauge"),
+            ("renamarr_renames_total", "counter"),
+            ("renamarr_folder_moves_total", "counter"),
+        ]:
+            assert f"# TYPE {name} {metric_type}" in rendered
+            assert f"# HELP {name} " in rendered
+
+    def test_instrument_records_request_latency_per_endpoint_once(self, mocker) -> None:
+        metrics_registry = MetricsRegistry()
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+
+        metrics_registry.instrument(sonarr_cli, "sonarr", "tv")
+        metrics_registry.instrument(sonarr_cli, "sonarr", "tv")
+        assert len(sonarr_cli._session.hooks["response"]) == 1
+
+        hook = sonarr_cli._session.hooks["response"][0]
+        for elapsed in (0.02, 0.3):
+            hook(
+                mocker.Mock(
+                    request=mocker.Mock(
+                        method="GET",
+                        url="http://test.tld/api/v3/series/12/folder?x=1",
+                    ),
+                    elapsed=timedelta(seconds=elapsed),
+                )
+            )
+
+        labels = 'service="sonarr",instance="tv",method="GET",endpoint="/api/v3/series/{id}/folder"'
+        lines = sample_lines(metrics_registry, "renamarr_api_request_duration_seconds")
+        assert (
+            f'renamarr_api_request_duration_seconds_bucket{{{labels},le="0.01"}} 0'
+            in lines
+        )
+        assert (
+            f'renamarr_api_request_duration_seconds_bucket{{{labels},le="0.025"}} 1'
+            in lines
+        )
+        assert (
+            f'renamarr_api_request_duration_seconds_bucket{{{labels},le="0.5"}} 2'
+            in lines
+        )
+        assert (
+            f'renamarr_api_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2'
+            in lines
+        )
+        assert f"renamarr_api_request_duration_seconds_sum{{{labels}}} 0.32" in lines
+        assert f"renamarr_api_request_duration_seconds_count{{{labels}}} 2" in lines
+
+    def test_job_records_duration_and_last_success(self, mocker) -> None:
+        mocker.patch(
+            "renamarr.metrics.metrics_registry.monotonic",
+            side_effect=[10.0, 1234.5678],
+        )
+        mocker.patch(
+            "renamarr.metrics.metrics_registry.time", return_value=1792340123.25
+        )
+        metrics_registry = MetricsRegistry()
+
+        with metrics_registry.job("radarr", "movies", "renamarr"):
+            pass
+
+        labels = 'service="radarr",instance="movies",job="renamarr"'
+        assert sample_lines(metrics_registry, "renamarr_job_last_success") == [
+            f"renamarr_job_last_success_timestamp_seconds{{{labels}}} 1792340123.25"
+        ]
+        assert (
+            f"renamarr_job_duration_seconds_sum{{{labels}}} 1224.5678"
+            in sample_lines(metrics_registry, "renamarr_job_duration_seconds")
+        )
+        assert sample_lines(metrics_registry, "renamarr_job_failures_total") == []
+
+    def test_job_counts_failures_and_reraises(self) -> None:
+        metrics_registry = MetricsRegistry()
+
+        with (
+            pytest.raises(RuntimeError),
+            metrics_registry.job("sonarr", "tv", "series_scanner"),
+        ):
+            raise RuntimeError("boom")
+
+        labels = 'service="sonarr",instance="tv",job="series_scanner"'
+        assert sample_lines(metrics_registry, "renamarr_job_failures_total") == [
+            f"renamarr_job_failures_total{{{labels}}} 1"
+        ]
+        assert sample_lines(metrics_registry, "renamarr_job_last_success") == []
+        assert f"renamarr_job_duration_seconds_count{{{labels}}} 1" in sample_lines(
+            metrics_registry, "renamarr_job_duration_seconds"
+        )
+
+    def test_record_counts_adds_renames_and_folder_moves(self) -> None:
+        metrics_registry = MetricsRegistry()
+
+        metrics_registry.record_counts(
+            "sonarr", "tv", {"series": 10, "renamed_files": 4, "folder_renames": 1}
+        )
+        metrics_registry.record_counts("sonarr", "tv", {"renamed_files": 2})
+        metrics_registry.record_counts("radarr", 'say "hi"\\', {"renamed_movies": 3})
+
+        assert sample_lines(metrics_registry, "renamarr_renames_total") == [
+            'renamarr_renames_total{service="radarr",instance="say \\"hi\\"\\\\"} 3',
+            'renamarr_renames_total{service="sonarr",instance="tv"} 6',
+        ]
+        assert sample_lines(metrics_registry, "renamarr_folder_moves_total") == [
+            'renamarr_folder_moves_total{service="radarr",instance="say \\"hi\\"\\\\"} 0',
+            'renamarr_folder_moves_total{service="sonarr",instance="tv"} 1',
+        ]
@@ -0,0 +1,33 @@
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from renamarr.metrics.metrics_registry import MetricsRegistry
+from renamarr.metrics.metrics_server import CONTENT_TYPE, MetricsServer
+
+
+class TestMetricsServer:
+    @pytest.fixture
+    def metrics_server(self):
+        metrics_registry = MetricsRegistry()
+        metrics_registry.record_counts("sonarr", "tv", {"renamed_files": 2})
+        metrics_server = MetricsServer(metrics_registry, 0, host="127.0.0.1")
+        metrics_server.start()
+        yield metrics_server
+        metrics_server.stop()
+
+    def test_serves_rendered_metrics(self, metrics_server) -> None:
+        with urlopen(f"http://127.0.0.1:{metrics_server.port}/metrics") as response:
+            assert response.status == 200
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            body = response.read().decode("utf-8")
+
+        assert 'renamarr_renames_total{service="sonarr",instance="tv"} 2' in body
+
+    def test_returns_not_found_for_other_paths(self, metrics_server) -> None:
+        with pytest.raises(HTTPError) as error:
+            urlopen(f"http://127.0.0.1:{metrics_server.port}/")
+
+        error.value.close()
+        assert error.value.code == 404
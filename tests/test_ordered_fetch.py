@@ -0,0 +1,56 @@
+from contextvars import ContextVar
+from threading import Barrier, current_thread
+
+import pytest
+
+from renamarr.common.ordered_fetch import fetch_in_order
+
+
+class TestFetchInOrder:
+    def test_fetches_serially_on_calling_thread_by_default(self) -> None:
+        calling_thread = current_thread()
+        fetch_threads = []
+
+        def fetch(item: int) -> int:
+            fetch_threads.append(current_thread())
+            return item * 10
+
+        results = list(fetch_in_order(fetch, [3, 1, 2]))
+
+        assert results == [(3, 30), (1, 10), (2, 20)]
+        assert fetch_threads == [calling_thread] * 3
+
+    def test_fetches_concurrently_and_yields_in_input_order(self) -> None:
+        # Every fetch waits for the others, so this only completes when all
+        # three run at the same time
+        barrier = Barrier(3, timeout=5)
+
+        def fetch(item: str) -> str:
+            barrier.wait()
+            return item.upper()
+
+        results = list(fetch_in_order(fetch, ["c", "a", "b"], max_concurrency=3))
+
+        assert results == [("c", "C"), ("a", "A"), ("b", "B")]
+
+    def test_concurrent_fetches_see_the_callers_context(self) -> None:
+        job: ContextVar[str | None] = ContextVar("job", default=None)
+        job.set("renamarr")
+
+        results = list(
+            fetch_in_order(lambda item: (item, job.get()), [1, 2], max_concurrency=2)
+        )
+
+        assert results == [(1, (1, "renamarr")), (2, (2, "renamarr"))]
+
+    def test_concurrent_fetch_error_is_raised_in_order(self) -> None:
+        def fetch(item: int) -> int:
+            if item == 2:
+                raise ValueError("BOOM!")
+            return item
+
+        results = fetch_in_order(fetch, [1, 2, 3], max_concurrency=2)
+
+        assert next(results) == (1, 1)
+        with pytest.raises(ValueError, match="BOOM!"):
+            next(results)
@@ -0,0 +1,49 @@
+import json
+import re
+
+import pytest
+
+from renamarr.common.plan_writer import PlanWriteError, PlanWriter
+
+
+class TestPlanWriter:
+    def test_saves_records_as_ndjson_under_plan_dir(
+        self, tmp_path, monkeypatch, mock_loguru_info
+    ) -> None:
+        monkeypatch.setenv("PLAN_DIR", str(tmp_path))
+        plan_writer = PlanWriter("sonarr", "tv")
+
+        plan_writer.write("movie_rename", movies=[{"id": 1, "title": "Movie"}])
+        plan_writer.write("summary", counts={"planned_movies": 1})
+        plan_writer.save()
+
+        plan_path = tmp_path / "sonarr" / "tv.ndjson"
+        lines = plan_path.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {"type": "movie_rename", "movies": [{"id": 1, "title": "Movie"}]},
+            {"type": "summary", "counts": {"planned_movies": 1}},
+        ]
+        assert list(plan_path.parent.iterdir()) == [plan_path]
+        mock_loguru_info.assert_called_once_with(
+            f"Wrote dry run plan to {str(plan_path)!r}"
+        )
+
+    def test_replaces_previous_plan(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setenv("PLAN_DIR", str(tmp_path))
+        PlanWriter("radarr", "movies").save()
+        (tmp_path / "radarr" / "movies.ndjson").write_text("stale\n", encoding="utf-8")
+
+        PlanWriter("radarr", "movies").save()
+
+        assert (tmp_path / "radarr" / "movies.ndjson").read_text(encoding="utf-8") == ""
+
+    def test_raises_when_plan_dir_is_unusable(self, tmp_path, monkeypatch) -> None:
+        not_a_directory = tmp_path / "plans"
+        not_a_directory.write_text("", encoding="utf-8")
+        monkeypatch.setenv("PLAN_DIR", str(not_a_directory))
+        plan_path = str(not_a_directory / "sonarr" / "tv.ndjson")
+
+        with pytest.raises(PlanWriteError, match=re.escape(repr(plan_path))) as error:
+            PlanWriter("sonarr", "tv").save()
+
+        assert isinstance(error.value.__cause__, OSError)
@@ -40,7 +40,7 @@ class TestAnalyzeFiles:
                 {"status": "completed", "result": "successful"},
             ],
         )
-        sleep = mocker.patch("renamarr.radarr.services.analyze_files.sleep")
+        sleep = mocker.patch("renamarr.common.command_waiter.sleep")
 
         AnalyzeFiles(radarr_cli).process()
 
@@ -51,7 +51,7 @@ class TestAnalyzeFiles:
             }
         )
         get_command.assert_has_calls([call(cid=1), call(cid=1)])
-        assert sleep.call_count == 2
+        assert sleep.call_args_list == [call(1), call(2)]
         mock_loguru_info.assert_has_calls(
             [
                 call("Initiated disk scan of library"),
@@ -74,7 +74,7 @@ class TestAnalyzeFiles:
             "get_command",
             return_value={"status": "completed", "result": "failed"},
         )
-        sleep = mocker.patch("renamarr.radarr.services.analyze_files.sleep")
+        sleep = mocker.patch("renamarr.common.command_waiter.sleep")
 
         AnalyzeFiles(radarr_cli).process()
 
@@ -85,7 +85,7 @@ class TestAnalyzeFiles:
             }
         )
         get_command.assert_called_once_with(cid=1)
-        sleep.assert_called_once_with(10)
+        sleep.assert_called_once_with(1)
         mock_loguru_info.assert_has_calls(
             [
                 call("Initiated disk scan of library"),
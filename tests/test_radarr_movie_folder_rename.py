@@ -1,11 +1,18 @@
-from pathlib import PurePosixPath
+import sqlite3
+from threading import Event
 from unittest.mock import call
 
 import pytest
-from pycliarr.api import RadarrCli, RadarrMovieItem
-
+from pycliarr.api import RadarrCli
+
+from renamarr.common.command_tracker import CommandTracker
+from renamarr.common.command_waiter import DEFAULT_TIMEOUT_SECONDS
+from renamarr.common.list_fetcher import ListFetcher
+from renamarr.common.plan_writer import PlanWriter
+from renamarr.common.root_folder_index import RootFolderIndex
+from renamarr.common.run_progress import RunProgress
+from renamarr.radarr.models.movie_record import MovieRecord
 from renamarr.radarr.services.movie_folder_rename import (
-    MAX_WAIT_SECONDS,
     MovieFolderRename,
     MovieRootFolderNotFoundError,
 )
@@ -16,10 +23,8 @@ class TestMovieFolderRename:
         self, mock_loguru_debug, mocker
     ) -> None:
         radarr_cli = RadarrCli("test.tld", "test-api-key")
-        movie = RadarrMovieItem(id=1, title="Movie", path="/root/Movie")
-        mocker.patch.object(
-            radarr_cli, "get_root_folder", return_value=[{"path": "/root"}]
-        )
+        movie = MovieRecord(id=1, title="Movie", path="/root/Movie")
+        mocker.patch.object(ListFetcher, "fetch", return_value=[{"path": "/root"}])
         mocker.patch.object(radarr_cli, "request_get", return_value={"folder": "Movie"})
         request = mocker.patch.object(radarr_cli._session, "request")
         send_command = mocker.patch.object(radarr_cli, "_sendCommand")
@@ -37,12 +42,12 @@ class TestMovieFolderRename:
         self, mock_loguru_info, mock_loguru_debug, mocker
     ) -> None:
         radarr_cli = RadarrCli("test.tld", "test-api-key")
-        movie_a = RadarrMovieItem(id=1, title="Movie A", path="/rootA/OldA")
-        movie_b = RadarrMovieItem(id=2, title="Movie B", path="/rootB/OldB")
-        movie_c = RadarrMovieItem(id=3, title="Movie C", path="/rootA/OldC")
+        movie_a = MovieRecord(id=1, title="Movie A", path="/rootA/OldA")
+        movie_b = MovieRecord(id=2, title="Movie B", path="/rootB/OldB")
+        movie_c = MovieRecord(id=3, title="Movie C", path="/rootA/OldC")
         mocker.patch.object(
-            radarr_cli,
-            "get_root_folder",
+            ListFetcher,
+            "fetch",
             return_value=[{"path": "/rootA"}, {"path": "/rootB"}],
         )
         mocker.patch.object(radarr_cli, "request_get").side_effect = [
@@ -65,7 +70,7 @@ class TestMovieFolderRename:
                 {"status": "completed", "result": "successful"},
             ],
         )
-        mocker.patch("renamarr.radarr.services.movie_folder_rename.sleep")
+        mocker.patch("renamarr.common.command_waiter.sleep")
 
         MovieFolderRename(radarr_cli).process([movie_a, movie_b, movie_c])
 
@@ -123,11 +128,11 @@ class TestMovieFolderRename:
         self, movie_a_root, movie_b_root, mocker
     ) -> None:
         radarr_cli = RadarrCli("test.tld", "test-api-key")
-        movie_a = RadarrMovieItem(id=1, title="Movie A", path=f"{movie_a_root}/OldA")
-        movie_b = RadarrMovieItem(id=2, title="Movie B", path=f"{movie_b_root}/OldB")
+        movie_a = MovieRecord(id=1, title="Movie A", path=f"{movie_a_root}/OldA")
+        movie_b = MovieRecord(id=2, title="Movie B", path=f"{movie_b_root}/OldB")
         mocker.patch.object(
-            radarr_cli,
-            "get_root_folder",
+            ListFetcher,
+            "fetch",
             return_value=[{"path": "/movies"}, {"path": "/movies-4k"}],
         )
         mocker.patch.object(radarr_cli, "request_get").side_effect = [
@@ -149,7 +154,7 @@ class TestMovieFolderRename:
                 {"status": "completed", "result": "successful"},
             ],
         )
-        mocker.patch("renamarr.radarr.services.movie_folder_rename.sleep")
+        mocker.patch("renamarr.common.command_waiter.sleep")
 
         MovieFolderRename(radarr_cli).process([movie_a, movie_b])
 
@@ -182,35 +187,40 @@ class TestMovieFolderRename:
             ]
         )
 
-    def test_process_sorts_root_folders_before_matching_movies(self, mocker) -> None:
+    def test_process_indexes_root_folders_once_per_run(self, mocker) -> None:
         radarr_cli = RadarrCli("test.tld", "test-api-key")
-        movie = RadarrMovieItem(id=1, title="Movie", path="/rootA/Movie")
+        movies = [
+            MovieRecord(id=1, title="Movie A", path="/rootA/Movie A"),
+            MovieRecord(id=2, title="Movie B", path="/rootB/Movie B"),
+        ]
+        fetch = mocker.patch.object(
+            ListFetcher,
+            "fetch",
+            return_value=[{"path": "/rootB"}, {"path": "/rootA"}],
+        )
         mocker.patch.object(
             radarr_cli,
-            "get_root_folder",
-            return_value=[{"path": "/rootB"}, {"path": "/rootA"}],
+            "request_get",
+            side_effect=[{"folder": "Movie A"}, {"folder": "Movie B"}],
         )
-        mocker.patch.object(radarr_cli, "request_get", return_value={"folder": "Movie"})
-        service = MovieFolderRename(radarr_cli)
-        find_movie_root_folder = mocker.spy(
-            service, "_MovieFolderRename__find_movie_root_folder"
+        root_folder_index = mocker.patch(
+            "renamarr.radarr.services.movie_folder_rename.RootFolderIndex",
+            wraps=RootFolderIndex,
         )
 
-        service.process([movie])
+        MovieFolderRename(radarr_cli).process(movies)
 
-        assert find_movie_root_folder.call_args.args[1] == [
-            {"path": "/rootA"},
-            {"path": "/rootB"},
-        ]
+        fetch.assert_called_once_with("/api/v3/rootfolder", mocker.ANY)
+        root_folder_index.assert_called_once_with(
+            [{"path": "/rootB"}, {"path": "/rootA"}]
+        )
 
     def test_process_logs_when_updated_movie_rescan_fails(
         self, mock_loguru_info, mocker
     ) -> None:
         radarr_cli = RadarrCli("test.tld", "test-api-key")
-        movie = RadarrMovieItem(id=1, title="Movie", path="/root/Old")
-        mocker.patch.object(
-            radarr_cli, "get_root_folder", return_value=[{"path": "/root"}]
-        )
+        movie = MovieRecord(id=1, title="Movie", path="/root/Old")
+        mocker.patch.object(ListFetcher, "fetch", return_value=[{"path": "/root"}])
         mocker.patch.object(radarr_cli, "request_get", return_value={"folder": "New"})
         mocker.patch.object(
             radarr_cli._session, "request", return_value=mocker.Mock(status_code=200)
@@ -221,7 +231,7 @@ class TestMovieFolderRename:
             "get_command",
             return_value={"status": "completed", "result": "failed"},
         )
-        mocker.patch("renamarr.radarr.services.movie_folder_rename.sleep")
+        mocker.patch("renamarr.common.command_waiter.sleep")
 
         MovieFolderRename(radarr_cli).process([movie])
 
@@ -236,10 +246,8 @@ class TestMovieFolderRename:
         self, mock_loguru_error, mock_loguru_info, mocker
     ) -> None:
         radarr_cli = RadarrCli("test.tld", "test-api-key")
-        movie = RadarrMovieItem(id=1, title="Movie", path="/root/Old")
-        mocker.patch.object(
-            radarr_cli, "get_root_folder", return_value=[{"path": "/root"}]
-        )
+        movie = MovieRecord(id=1, title="Movie", path="/root/Old")
+        mocker.patch.object(ListFetcher, "fetch", return_value=[{"path": "/root"}])
         mocker.patch.object(radarr_cli, "request_get", return_value={"folder": "New"})
         mocker.patch.object(
             radarr_cli._session, "request", return_value=mocker.Mock(status_code=200)
@@ -250,16 +258,16 @@ class TestMovieFolderRename:
             "get_command",
             return_value={"status": "started"},
         )
-        sleep = mocker.patch("renamarr.radarr.services.movie_folder_rename.sleep")
+        sleep = mocker.patch("renamarr.common.command_waiter.sleep")
         mocker.patch(
-            "renamarr.radarr.services.movie_folder_rename.time.time",
-            side_effect=[0, 0, MAX_WAIT_SECONDS],
+            "renamarr.common.command_waiter.monotonic",
+            side_effect=[0, 0, DEFAULT_TIMEOUT_SECONDS],
         )
 
         MovieFolderRename(radarr_cli).process([movie])
 
         get_command.assert_called_once_with(cid=10)
-        sleep.assert_called_once_with(10)
+        sleep.assert_called_once_with(1)
         mock_loguru_error.assert_called_once_with(
             "Timed out waiting for Radarr movie rescan command 10 after 300 seconds"
         )
@@ -274,10 +282,8 @@ class TestMovieFolderRename:
         self, mock_loguru_error, mock_loguru_info, mocker
     ) -> None:
         radarr_cli = RadarrCli("test.tld", "test-api-key")
-        movie = RadarrMovieItem(id=1, title="Movie", path="/root/Old")
-        mocker.patch.object(
-            radarr_cli, "get_root_folder", return_value=[{"path": "/root"}]
-        )
+        movie = MovieRecord(id=1, title="Movie", path="/root/Old")
+        mocker.patch.object(ListFetcher, "fetch", return_value=[{"path": "/root"}])
         mocker.patch.object(radarr_cli, "request_get", return_value={"folder": "New"})
         mocker.patch.object(
             radarr_cli._session, "request", return_value=mocker.Mock(status_code=300)
@@ -304,13 +310,11 @@ class TestMovieFolderRename:
         self, mock_loguru_error, mocker
     ) -> None:
         radarr_cli = RadarrCli("test.tld", "test-api-key")
-        unmatched_movie = RadarrMovieItem(
+        unmatched_movie = MovieRecord(
             id=1, title="Unmatched Movie", path="/unmatched/Movie"
         )
-        matched_movie = RadarrMovieItem(id=2, title="Matched Movie", path="/root/Old")
-        mocker.patch.object(
-            radarr_cli, "get_root_folder", return_value=[{"path": "/root"}]
-        )
+        matched_movie = MovieRecord(id=2, title="Matched Movie", path="/root/Old")
+        mocker.patch.object(ListFetcher, "fetch", return_value=[{"path": "/root"}])
         request_get = mocker.patch.object(
             radarr_cli, "request_get", return_value={"folder": "New"}
         )
@@ -325,7 +329,7 @@ class TestMovieFolderRename:
             "get_command",
             return_value={"status": "completed", "result": "successful"},
         )
-        mocker.patch("renamarr.radarr.services.movie_folder_rename.sleep")
+        mocker.patch("renamarr.common.command_waiter.sleep")
 
         MovieFolderRename(radarr_cli).process([unmatched_movie, matched_movie])
 
@@ -354,8 +358,8 @@ class TestMovieFolderRename:
             ),
         ):
             service._MovieFolderRename__find_movie_root_folder(
-                PurePosixPath("/unmatched/Movie"),
-                [{"path": "/root"}],
+                "/unmatched/Movie",
+                RootFolderIndex([{"path": "/root"}]),
             )
 
     @pytest.mark.parametrize(
@@ -382,10 +386,10 @@ class TestMovieFolderRename:
         mocker,
     ) -> None:
         radarr_cli = RadarrCli("test.tld", "test-api-key")
-        movie = RadarrMovieItem(id=1, title="Movie", path=movie_path)
+        movie = MovieRecord(id=1, title="Movie", path=movie_path)
         mocker.patch.object(
-            radarr_cli,
-            "get_root_folder",
+            ListFetcher,
+            "fetch",
             return_value=root_folders,
         )
         mocker.patch.object(radarr_cli, "request_get", return_value={"folder": "New"})
@@ -398,7 +402,7 @@ class TestMovieFolderRename:
             "get_command",
             return_value={"status": "completed", "result": "successful"},
         )
-        mocker.patch("renamarr.radarr.services.movie_folder_rename.sleep")
+        mocker.patch("renamarr.common.command_waiter.sleep")
 
         MovieFolderRename(radarr_cli).process([movie])
 
@@ -411,3 +415,231 @@ class TestMovieFolderRename:
                 "moveFiles": True,
             },
         )
+
+    def test_process_resolves_folders_concurrently_and_groups_in_movie_order(
+        self, mocker
+    ) -> None:
+        radarr_cli = RadarrCli("test.tld", "test-api-key")
+        movies = [
+            MovieRecord(id=1, title="Movie A", path="/root/OldA"),
+            MovieRecord(id=2, title="Movie B", path="/root/Movie B"),
+            MovieRecord(id=3, title="Movie C", path="/root/OldC"),
+        ]
+        mocker.patch.object(ListFetcher, "fetch", return_value=[{"path": "/root"}])
+        folders = {
+            "/api/v3/movie/1/folder": {"folder": "Movie A"},
+            "/api/v3/movie/2/folder": {"folder": "Movie B"},
+            "/api/v3/movie/3/folder": {"folder": "Movie C"},
+        }
+        mocker.patch.object(
+            radarr_cli, "request_get", side_effect=lambda path: folders[path]
+        )
+        request = mocker.patch.object(
+            radarr_cli._session, "request", return_value=mocker.Mock(status_code=202)
+        )
+        mocker.patch.object(radarr_cli, "_sendCommand", return_value={"id": 10})
+        mocker.patch.object(
+            radarr_cli,
+            "get_command",
+            return_value={"status": "completed", "result": "successful"},
+        )
+        mocker.patch("renamarr.common.command_waiter.sleep")
+        rate_limiter = mocker.Mock()
+
+        MovieFolderRename(
+            radarr_cli, max_concurrency=3, rate_limiter=rate_limiter
+        ).process(movies)
+
+        assert rate_limiter.acquire.call_count == 3
+        request.assert_called_once_with(
+            "PUT",
+            "test.tld/api/v3/movie/editor",
+            json={"rootFolderPath": "/root", "movieIds": [1, 3], "moveFiles": True},
+        )
+
+    def test_process_reuses_cached_folder_names_until_movie_metadata_changes(
+        self, mocker
+    ) -> None:
+        radarr_cli = RadarrCli("test.tld", "test-api-key")
+        state_database = sqlite3.connect(":memory:")
+        mocker.patch.object(ListFetcher, "fetch", return_value=[{"path": "/root"}])
+        responses = {
+            "/api/v3/config/naming": {"movieFolderFormat": "{Movie Title}"},
+            "/api/v3/movie/1/folder": {"folder": "Movie"},
+        }
+        request_get = mocker.patch.object(
+            radarr_cli, "request_get", side_effect=lambda path: responses[path]
+        )
+        service = MovieFolderRename(radarr_cli, state_database=state_database)
+
+        service.process([MovieRecord(id=1, title="Movie", path="/root/Movie")])
+        service.process([MovieRecord(id=1, title="Movie", path="/root/Movie")])
+        service.process(
+            [MovieRecord(id=1, title="Movie", year=1999, path="/root/Movie")]
+        )
+
+        assert [call.kwargs["path"] for call in request_get.call_args_list] == [
+            "/api/v3/config/naming",
+            "/api/v3/movie/1/folder",
+            "/api/v3/config/naming",
+            "/api/v3/config/naming",
+            "/api/v3/movie/1/folder",
+        ]
+
+    def test_process_tracks_rescans_without_waiting_when_deferred(self, mocker) -> None:
+        radarr_cli = RadarrCli("test.tld", "test-api-key")
+        mocker.patch.object(
+            ListFetcher,
+            "fetch",
+            return_value=[{"path": "/rootA"}, {"path": "/rootB"}],
+        )
+        mocker.patch.object(radarr_cli, "request_get").side_effect = [
+            {"folder": "NewA"},
+            {"folder": "NewB"},
+        ]
+        mocker.patch.object(
+            radarr_cli._session, "request"
+        ).return_value.status_code = 202
+        mocker.patch.object(
+            radarr_cli, "_sendCommand", side_effect=[{"id": 10}, {"id": 20}]
+        )
+        get_command = mocker.patch.object(radarr_cli, "get_command")
+        command_tracker = mocker.Mock(spec=CommandTracker)
+
+        MovieFolderRename(radarr_cli, command_tracker=command_tracker).process(
+            [
+                MovieRecord(id=1, title="Movie A", path="/rootA/OldA"),
+                MovieRecord(id=2, title="Movie B", path="/rootB/OldB"),
+            ]
+        )
+
+        get_command.assert_not_called()
+        assert command_tracker.track.call_args_list == [
+            call({"id": 10}, "Radarr movie rescan"),
+            call({"id": 20}, "Radarr movie rescan"),
+        ]
+
+    def test_process_writes_plan_instead_of_moving_on_dry_run(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        radarr_cli = RadarrCli("test.tld", "test-api-key")
+        mocker.patch.object(ListFetcher, "fetch", return_value=[{"path": "/rootA"}])
+        mocker.patch.object(radarr_cli, "request_get").side_effect = [
+            {"folder": "NewA"},
+            {"folder": "NewB"},
+        ]
+        request = mocker.patch.object(radarr_cli._session, "request")
+        send_command = mocker.patch.object(radarr_cli, "_sendCommand")
+        plan_writer = mocker.Mock(spec=PlanWriter)
+
+        MovieFolderRename(radarr_cli, plan_writer=plan_writer).process(
+            [
+                MovieRecord(id=1, title="Movie A", path="/rootA/OldA"),
+                MovieRecord(id=2, title="Movie B", path="/rootA/OldB"),
+            ]
+        )
+
+        request.assert_not_called()
+        send_command.assert_not_called()
+        plan_writer.write.assert_called_once_with(
+            "folder_rename",
+            root_folder_path="/rootA",
+            move_files=True,
+            movies=[
+                {
+                    "id": 1,
+                    "title": "Movie A",
+                    "path": "/rootA/OldA",
+                    "expected_path": "/rootA/NewA",
+                },
+                {
+                    "id": 2,
+                    "title": "Movie B",
+                    "path": "/rootA/OldB",
+                    "expected_path": "/rootA/NewB",
+                },
+            ],
+        )
+        mock_loguru_info.assert_called_once_with(
+            "Would rename Movie folders for: Movie A, Movie B"
+        )
+
+    def test_process_journals_movies_and_stops_before_remaining_folders(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        radarr_cli = RadarrCli("test.tld", "test-api-key")
+        mocker.patch.object(
+            ListFetcher,
+            "fetch",
+            return_value=[{"path": "/rootA"}, {"path": "/rootB"}],
+        )
+        mocker.patch.object(radarr_cli, "request_get").side_effect = [
+            {"folder": "MovieA"},
+            {"folder": "NewB"},
+            {"folder": "NewC"},
+        ]
+        stop_requested = Event()
+
+        def request(*args, **kwargs):
+            stop_requested.set()
+            return mocker.Mock(status_code=202)
+
+        request = mocker.patch.object(
+            radarr_cli._session, "request", side_effect=request
+        )
+        mocker.patch.object(radarr_cli, "_sendCommand", return_value={"id": 10})
+        connection = sqlite3.connect(":memory:")
+
+        MovieFolderRename(
+            radarr_cli,
+            command_tracker=mocker.Mock(spec=CommandTracker),
+            run_progress=RunProgress(stop_requested, connection),
+        ).process(
+            [
+                MovieRecord(id=1, title="Movie A", path="/rootA/MovieA"),
+                MovieRecord(id=2, title="Movie B", path="/rootA/OldB"),
+                MovieRecord(id=3, title="Movie C", path="/rootB/OldC"),
+            ]
+        )
+
+        request.assert_called_once()
+        mock_loguru_info.assert_called_with(
+            "Shutdown requested, stopping before the remaining folders"
+        )
+        assert connection.execute("SELECT item_id FROM run_journal").fetchall() == [
+            (1,),
+            (2,),
+        ]
+
+    def test_process_stops_planning_and_skips_journaled_movies(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        radarr_cli = RadarrCli("test.tld", "test-api-key")
+        mocker.patch.object(ListFetcher, "fetch", return_value=[{"path": "/root"}])
+        stop_requested = Event()
+
+        def request_get(path):
+            stop_requested.set()
+            return {"folder": "New"}
+
+        request_get = mocker.patch.object(
+            radarr_cli, "request_get", side_effect=request_get
+        )
+        request = mocker.patch.object(radarr_cli._session, "request")
+        connection = sqlite3.connect(":memory:")
+        RunProgress(connection=connection).record("folder_rename", [1])
+
+        MovieFolderRename(
+            radarr_cli, run_progress=RunProgress(stop_requested, connection)
+        ).process(
+            [
+                MovieRecord(id=1, title="Movie A", path="/root/OldA"),
+                MovieRecord(id=2, title="Movie B", path="/root/OldB"),
+            ]
+        )
+
+        request_get.assert_called_once_with(path="/api/v3/movie/2/folder")
+        request.assert_not_called()
+        mock_loguru_info.assert_called_with(
+            "Shutdown requested, stopping folder planning"
+        )
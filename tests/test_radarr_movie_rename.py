@@ -1,17 +1,30 @@
-from unittest.mock import call
+import sqlite3
+from threading import Event
+from unittest.mock import MagicMock, call
 
-from pycliarr.api import RadarrCli, RadarrMovieItem
+import pytest
+from pycliarr.api import RadarrCli
 
+from renamarr.common.command_waiter import CommandResult, CommandWaiter
+from renamarr.common.plan_writer import PlanWriter
+from renamarr.common.run_progress import RunProgress
+from renamarr.radarr.models.movie_record import MovieRecord
 from renamarr.radarr.services.movie_rename import MovieRename
 
 
 class TestMovieRename:
+    @pytest.fixture(autouse=True)
+    def get_system_status(self, mocker) -> MagicMock:
+        return mocker.patch.object(
+            RadarrCli, "get_system_status", return_value={"version": "5.3.6.8612"}
+        )
+
     def test_process_skips_command_when_no_movies_need_rename(
-        self, mock_loguru_debug, mocker
+        self, get_system_status, mock_loguru_debug, mocker
     ) -> None:
         radarr_cli = RadarrCli("test.tld", "test-api-key")
-        movie_a = RadarrMovieItem(id=1, title="Movie A")
-        movie_b = RadarrMovieItem(id=2, title="Movie B")
+        movie_a = MovieRecord(id=1, title="Movie A")
+        movie_b = MovieRecord(id=2, title="Movie B")
         request_get = mocker.patch.object(radarr_cli, "request_get", return_value=[])
         send_command = mocker.patch.object(radarr_cli, "_sendCommand")
 
@@ -28,13 +41,14 @@ class TestMovieRename:
             call("Nothing to rename"),
         ]
         send_command.assert_not_called()
+        get_system_status.assert_not_called()
 
     def test_process_sends_one_rename_movie_command_with_movie_ids(
         self, mock_loguru_info, mocker
     ) -> None:
         radarr_cli = RadarrCli("test.tld", "test-api-key")
-        movie_a = RadarrMovieItem(id=1, title="Movie A")
-        movie_b = RadarrMovieItem(id=2, title="Movie B")
+        movie_a = MovieRecord(id=1, title="Movie A")
+        movie_b = MovieRecord(id=2, title="Movie B")
         mocker.patch.object(radarr_cli, "request_get").side_effect = [
             [{"movieId": 1, "movieFileId": 10}, {"movieId": 1, "movieFileId": 11}],
             [{"movieId": 2, "movieFileId": 20}],
@@ -55,3 +69,181 @@ class TestMovieRename:
                 call("Movie rename successful for movies: Movie A, Movie B"),
             ]
         )
+
+    def test_process_fetches_previews_concurrently_in_movie_order(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        radarr_cli = RadarrCli("test.tld", "test-api-key")
+        movies = [
+            MovieRecord(id=1, title="Movie A"),
+            MovieRecord(id=2, title="Movie B"),
+            MovieRecord(id=3, title="Movie C"),
+        ]
+        previews = {1: [{"movieId": 1}], 2: [], 3: [{"movieId": 3}]}
+        mocker.patch.object(
+            radarr_cli,
+            "request_get",
+            side_effect=lambda path, url_params: previews[url_params["movieId"]],
+        )
+        send_command = mocker.patch.object(radarr_cli, "_sendCommand")
+        rate_limiter = mocker.Mock()
+
+        MovieRename(radarr_cli, max_concurrency=3, rate_limiter=rate_limiter).process(
+            movies
+        )
+
+        assert rate_limiter.acquire.call_count == 3
+        send_command.assert_called_once_with(
+            {"name": "RenameMovie", "movieIds": [1, 3]}
+        )
+        mock_loguru_info.assert_any_call("Renaming Movies: Movie A, Movie C")
+
+    def test_process_fetches_previews_in_bulk_when_supported(
+        self, get_system_status, mocker
+    ) -> None:
+        get_system_status.return_value = {"version": "5.4.0.8648"}
+        radarr_cli = RadarrCli("test.tld", "test-api-key")
+        movies = [
+            MovieRecord(id=1, title="Movie A"),
+            MovieRecord(id=2, title="Movie B"),
+            MovieRecord(id=3, title="Movie C"),
+        ]
+        request_get = mocker.patch.object(
+            radarr_cli,
+            "request_get",
+            return_value=[
+                {"movieId": 3, "movieFileId": 30},
+                {"movieId": 1, "movieFileId": 10},
+            ],
+        )
+        send_command = mocker.patch.object(radarr_cli, "_sendCommand")
+
+        MovieRename(radarr_cli, bulk_rename_preview=True).process(movies)
+
+        request_get.assert_called_once_with(
+            path="/api/v3/rename", url_params={"movieId": [1, 2, 3]}
+        )
+        send_command.assert_called_once_with(
+            {"name": "RenameMovie", "movieIds": [1, 3]}
+        )
+
+    def test_process_sends_rename_movie_commands_in_batches(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        radarr_cli = RadarrCli("test.tld", "test-api-key")
+        movies = [MovieRecord(id=i, title=f"Movie {i}") for i in range(1, 6)]
+        mocker.patch.object(
+            radarr_cli,
+            "request_get",
+            side_effect=lambda path, url_params: (
+                [] if url_params["movieId"] == 3 else [{"movieFileId": 1}]
+            ),
+        )
+        send_command = mocker.patch.object(
+            radarr_cli, "_sendCommand", side_effect=[{"id": 10}, {"id": 20}]
+        )
+        command_waiter = mocker.Mock(spec=CommandWaiter)
+        command_waiter.wait.return_value = CommandResult(
+            successful=True, elapsed_seconds=1
+        )
+
+        MovieRename(
+            radarr_cli, command_waiter=command_waiter, rename_batch_size=2
+        ).process(movies)
+
+        assert send_command.call_args_list == [
+            call({"name": "RenameMovie", "movieIds": [1, 2]}),
+            call({"name": "RenameMovie", "movieIds": [4, 5]}),
+        ]
+        assert command_waiter.wait.call_args_list == [
+            call({"id": 10}, "Radarr rename batch 1 (2 movies)"),
+            call({"id": 20}, "Radarr rename batch 2 (2 movies)"),
+        ]
+        mock_loguru_info.assert_has_calls(
+            [
+                call("Renaming Movies: Movie 1, Movie 2"),
+                call("Renaming Movies: Movie 4, Movie 5"),
+            ]
+        )
+
+    def test_process_writes_plan_instead_of_renaming_on_dry_run(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        radarr_cli = RadarrCli("test.tld", "test-api-key")
+        mocker.patch.object(radarr_cli, "request_get").side_effect = [
+            [{"movieId": 1, "movieFileId": 10}],
+            [{"movieId": 2, "movieFileId": 20}],
+        ]
+        send_command = mocker.patch.object(radarr_cli, "_sendCommand")
+        plan_writer = mocker.Mock(spec=PlanWriter)
+
+        MovieRename(radarr_cli, plan_writer=plan_writer).process(
+            [
+                MovieRecord(id=1, title="Movie A"),
+                MovieRecord(id=2, title="Movie B"),
+            ]
+        )
+
+        send_command.assert_not_called()
+        plan_writer.write.assert_called_once_with(
+            "movie_rename",
+            movies=[{"id": 1, "title": "Movie A"}, {"id": 2, "title": "Movie B"}],
+        )
+        mock_loguru_info.assert_called_once_with(
+            "Would rename Movies: Movie A, Movie B"
+        )
+
+    def test_process_renames_planned_movies_and_stops_when_shutdown_is_requested(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        radarr_cli = RadarrCli("test.tld", "test-api-key")
+        stop_requested = Event()
+        previews = iter(
+            [
+                [],
+                [{"movieId": 2, "movieFileId": 20}],
+                [{"movieId": 3, "movieFileId": 30}],
+            ]
+        )
+
+        def request_get(**kwargs):
+            if kwargs["url_params"]["movieId"] == 3:
+                stop_requested.set()
+            return next(previews)
+
+        mocker.patch.object(radarr_cli, "request_get", side_effect=request_get)
+        send_command = mocker.patch.object(radarr_cli, "_sendCommand")
+        connection = sqlite3.connect(":memory:")
+
+        MovieRename(
+            radarr_cli, run_progress=RunProgress(stop_requested, connection)
+        ).process([MovieRecord(id=movie_id) for movie_id in (1, 2, 3)])
+
+        send_command.assert_called_once_with({"name": "RenameMovie", "movieIds": [2]})
+        mock_loguru_info.assert_any_call(
+            "Shutdown requested, stopping before the remaining movies"
+        )
+        assert connection.execute("SELECT item_id FROM run_journal").fetchall() == [
+            (1,),
+            (2,),
+        ]
+
+    def test_process_journals_renamed_movies_and_skips_them_on_resume(
+        self, mocker
+    ) -> None:
+        radarr_cli = RadarrCli("test.tld", "test-api-key")
+        request_get = mocker.patch.object(radarr_cli, "request_get")
+        request_get.return_value = [{"movieId": 1, "movieFileId": 10}]
+        send_command = mocker.patch.object(radarr_cli, "_sendCommand")
+        connection = sqlite3.connect(":memory:")
+        movies = [MovieRecord(id=1, title="Movie")]
+
+        MovieRename(
+            radarr_cli, run_progress=RunProgress(connection=connection)
+        ).process(movies)
+        MovieRename(
+            radarr_cli, run_progress=RunProgress(connection=connection)
+        ).process(movies)
+
+        request_get.assert_called_once()
+        send_command.assert_called_once_with({"name": "RenameMovie", "movieIds": [1]})
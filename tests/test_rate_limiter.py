@@ -0,0 +1,30 @@
+import pytest
+
+from renamarr.common.rate_limiter import RateLimiter
+
+
+class TestRateLimiter:
+    def test_zero_ceiling_never_waits(self, mocker) -> None:
+        clock = mocker.Mock(return_value=0.0)
+        sleep = mocker.Mock()
+        rate_limiter = RateLimiter(0, clock=clock, sleep=sleep)
+
+        for _ in range(5):
+            rate_limiter.acquire()
+
+        clock.assert_not_called()
+        sleep.assert_not_called()
+
+    def test_spaces_requests_by_the_configured_interval(self, mocker) -> None:
+        clock = mocker.Mock(side_effect=[10.0, 10.0, 10.1, 11.0])
+        sleep = mocker.Mock()
+        rate_limiter = RateLimiter(4, clock=clock, sleep=sleep)
+
+        for _ in range(4):
+            rate_limiter.acquire()
+
+        # Slots are reserved at 10.0, 10.25, 10.5, then 11.0 once the clock has
+        # moved past the last reserved slot
+        assert [call.args[0] for call in sleep.call_args_list] == pytest.approx(
+            [0.25, 0.4]
+        )
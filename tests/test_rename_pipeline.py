@@ -0,0 +1,49 @@
+from unittest.mock import call
+
+from renamarr.common.command_waiter import CommandResult, CommandWaiter
+from renamarr.common.rename_pipeline import RenamePipeline
+
+
+class TestRenamePipeline:
+    def test_submit_waits_for_previous_batch_before_sending_next(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        mocker.patch(
+            "renamarr.common.rename_pipeline.monotonic", side_effect=[0, 1, 5, 12.5]
+        )
+        events = []
+        command_waiter = mocker.Mock(spec=CommandWaiter)
+        command_waiter.wait.side_effect = lambda command, description: (
+            events.append(f"wait {command['id']}")
+            or CommandResult(successful=True, elapsed_seconds=0)
+        )
+
+        def send(command_id: int):
+            events.append(f"send {command_id}")
+            return {"id": command_id}
+
+        rename_pipeline = RenamePipeline(command_waiter)
+        rename_pipeline.submit(lambda: send(1), "batch 1")
+        rename_pipeline.submit(lambda: send(2), "batch 2")
+        rename_pipeline.wait()
+        rename_pipeline.wait()
+
+        assert events == ["send 1", "wait 1", "send 2", "wait 2"]
+        assert mock_loguru_info.call_args_list == [
+            call("batch 1 finished in 1.0 seconds"),
+            call("batch 2 finished in 7.5 seconds"),
+        ]
+
+    def test_wait_logs_failed_batch(self, mock_loguru_error, mocker) -> None:
+        mocker.patch("renamarr.common.rename_pipeline.monotonic", side_effect=[0, 3])
+        command_waiter = mocker.Mock(spec=CommandWaiter)
+        command_waiter.wait.return_value = CommandResult(
+            successful=False, elapsed_seconds=3
+        )
+
+        rename_pipeline = RenamePipeline(command_waiter)
+        rename_pipeline.submit(lambda: {"id": 1}, "batch 1")
+        rename_pipeline.wait()
+
+        command_waiter.wait.assert_called_once_with({"id": 1}, "batch 1")
+        mock_loguru_error.assert_called_once_with("batch 1 failed after 3.0 seconds")
@@ -0,0 +1,55 @@
+import pytest
+
+from renamarr.common.root_folder_index import RootFolderIndex, path_parts
+
+
+def test_path_parts_ignores_empty_and_current_directory_components() -> None:
+    assert path_parts("/data//media/./tv/") == ["data", "media", "tv"]
+    assert path_parts("/") == []
+
+
+class TestRootFolderIndex:
+    @pytest.mark.parametrize(
+        ("path", "expected_root_folder"),
+        [
+            ("/data/media/tv/Show", "/data/media/tv"),
+            ("/data/media/movies/Movie", "/data/media"),
+            ("/data/media/tv", "/data/media/tv"),
+            ("/data/media/tv-anime/Show", "/data/media/tv-anime"),
+            ("/data/media-old/Show", None),
+            ("/unmatched/Show", None),
+        ],
+        ids=[
+            "nested-roots",
+            "outer-root",
+            "root-equals-path",
+            "overlapping-sibling-names",
+            "overlapping-parent-name",
+            "no-match",
+        ],
+    )
+    def test_finds_deepest_matching_root_folder(
+        self, path: str, expected_root_folder: str | None
+    ) -> None:
+        index = RootFolderIndex(
+            [
+                {"path": "/data/media/tv-anime"},
+                {"path": "/data/media"},
+                {"path": "/data/media/tv"},
+            ]
+        )
+
+        root_folder = index.find(path)
+
+        assert (root_folder and root_folder["path"]) == expected_root_folder
+
+    def test_filesystem_root_matches_every_path(self) -> None:
+        index = RootFolderIndex([{"path": "/"}, {"path": "/tv"}])
+
+        assert index.find("/movies/Movie") == {"path": "/"}
+        assert index.find("/tv/Show") == {"path": "/tv"}
+
+    def test_trailing_slash_roots_resolve_to_the_first_in_path_order(self) -> None:
+        index = RootFolderIndex([{"path": "/tv/", "id": 2}, {"path": "/tv", "id": 1}])
+
+        assert index.find("/tv/Show") == {"path": "/tv", "id": 1}
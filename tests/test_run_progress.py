@@ -0,0 +1,89 @@
+import sqlite3
+from threading import Event
+from types import SimpleNamespace
+
+from renamarr.common.run_progress import COMMIT_INTERVAL_SECONDS, RunProgress
+
+
+def journal(connection: sqlite3.Connection) -> list[tuple]:
+    return connection.execute(
+        "SELECT phase, item_id FROM run_journal ORDER BY phase, item_id"
+    ).fetchall()
+
+
+class TestRunProgress:
+    def test_without_state_database_tracks_nothing(self) -> None:
+        run_progress = RunProgress()
+        items = [SimpleNamespace(id=1)]
+
+        run_progress.record("rename", [1])
+        run_progress.finish()
+
+        assert run_progress.pending("rename", items) is items
+        assert not run_progress.resuming
+        assert not run_progress.stop_requested
+
+    def test_stop_requested_follows_the_event(self) -> None:
+        stop_requested = Event()
+        run_progress = RunProgress(stop_requested)
+
+        stop_requested.set()
+
+        assert run_progress.stop_requested
+
+    def test_next_run_skips_items_journaled_by_an_interrupted_run(
+        self, mock_loguru_info
+    ) -> None:
+        connection = sqlite3.connect(":memory:")
+        RunProgress(connection=connection).record("rename", [1, 2])
+        items = [SimpleNamespace(id=item_id) for item_id in (1, 2, 3)]
+
+        run_progress = RunProgress(connection=connection)
+
+        assert run_progress.resuming
+        assert run_progress.pending("rename", items) == [items[2]]
+        assert run_progress.pending("folder_rename", items) is items
+        mock_loguru_info.assert_called_once_with(
+            "Resuming interrupted run, skipping 2 finished items"
+        )
+
+    def test_finish_clears_the_journal(self) -> None:
+        connection = sqlite3.connect(":memory:")
+        run_progress = RunProgress(connection=connection)
+        run_progress.record("rename", [1])
+        assert journal(connection) == [("rename", 1)]
+
+        run_progress.finish()
+
+        assert journal(connection) == []
+        assert not RunProgress(connection=connection).resuming
+
+    def test_discards_journal_older_than_max_age(self, mock_loguru_info) -> None:
+        connection = sqlite3.connect(":memory:")
+        RunProgress(connection=connection, clock=lambda: 100.0).record("rename", [1])
+
+        run_progress = RunProgress(
+            connection=connection, max_age_seconds=60, clock=lambda: 200.0
+        )
+
+        assert not run_progress.resuming
+        assert journal(connection) == []
+        mock_loguru_info.assert_called_once_with(
+            "Discarding journal of an interrupted run, it is too old"
+        )
+
+    def test_commits_journal_at_most_every_commit_interval(self, tmp_path) -> None:
+        database_path = tmp_path / "state.sqlite3"
+        connection = sqlite3.connect(database_path)
+        clock_time = [0.0]
+        run_progress = RunProgress(connection=connection, clock=lambda: clock_time[0])
+
+        run_progress.record("rename", [1])
+        assert journal(sqlite3.connect(database_path)) == []
+
+        clock_time[0] = COMMIT_INTERVAL_SECONDS
+        run_progress.record("rename", [2])
+        assert journal(sqlite3.connect(database_path)) == [
+            ("rename", 1),
+            ("rename", 2),
+        ]
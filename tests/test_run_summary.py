@@ -0,0 +1,163 @@
+from threading import Event, Thread
+from unittest.mock import call
+
+from pycliarr.api import SonarrCli
+
+from renamarr.common.ordered_fetch import fetch_in_order
+from renamarr.common.run_summary import RunSummary
+
+
+class TestRunSummary:
+    def test_phase_accumulates_time_across_entries(self, mocker) -> None:
+        mocker.patch(
+            "renamarr.common.run_summary.monotonic", side_effect=[0, 1, 3, 10, 10.5, 12]
+        )
+        run_summary = RunSummary()
+
+        with run_summary.phase("rename_preview"):
+            pass
+        with run_summary.phase("rename_preview"):
+            pass
+
+        assert run_summary.as_dict() == {
+            "elapsed_seconds": 12,
+            "phases": {"rename_preview": 2.5},
+            "requests": 0,
+            "bytes_received": 0,
+            "counts": {},
+        }
+
+    def test_track_requests_counts_responses_until_the_block_exits(
+        self, mocker
+    ) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        response = mocker.Mock(content=b"x" * 2048)
+        run_summary = RunSummary()
+
+        with run_summary.track_requests(sonarr_cli):
+            for hook in sonarr_cli._session.hooks["response"]:
+                hook(response)
+                hook(response)
+        sonarr_cli._session.hooks["response"][0](response)
+
+        assert run_summary.as_dict()["requests"] == 2
+        assert run_summary.as_dict()["bytes_received"] == 4096
+
+    def test_track_requests_installs_one_hook_per_client(self) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+
+        with RunSummary().track_requests(sonarr_cli):
+            pass
+        with RunSummary().track_requests(sonarr_cli):
+            pass
+
+        assert len(sonarr_cli._session.hooks["response"]) == 1
+
+    def test_jobs_sharing_a_client_count_only_their_own_requests(self, mocker) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        response = mocker.Mock(content=b"x" * 100)
+        job_summary = RunSummary()
+        other_summary = RunSummary()
+        other_job_tracking = Event()
+        job_done = Event()
+
+        def other_job() -> None:
+            with other_summary.track_requests(sonarr_cli):
+                other_job_tracking.set()
+                job_done.wait(5)
+                sonarr_cli._session.hooks["response"][0](response)
+
+        thread = Thread(target=other_job)
+        thread.start()
+        other_job_tracking.wait(5)
+        with job_summary.track_requests(sonarr_cli):
+            sonarr_cli._session.hooks["response"][0](response)
+            sonarr_cli._session.hooks["response"][0](response)
+        job_done.set()
+        thread.join(5)
+
+        assert job_summary.as_dict()["requests"] == 2
+        assert other_summary.as_dict()["requests"] == 1
+        assert len(sonarr_cli._session.hooks["response"]) == 1
+
+    def test_counts_requests_sent_from_concurrent_fetch_workers(self, mocker) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        response = mocker.Mock(content=b"x" * 10)
+        run_summary = RunSummary()
+
+        def fetch(item: int) -> int:
+            sonarr_cli._session.hooks["response"][0](response)
+            return item
+
+        with run_summary.track_requests(sonarr_cli):
+            list(fetch_in_order(fetch, range(10), max_concurrency=4))
+
+        assert run_summary.as_dict()["requests"] == 10
+        assert run_summary.as_dict()["bytes_received"] == 100
+
+    def test_nested_tracking_restores_the_outer_summary(self, mocker) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        response = mocker.Mock(content=b"")
+        outer = RunSummary()
+        inner = RunSummary()
+
+        with outer.track_requests(sonarr_cli):
+            with inner.track_requests(sonarr_cli):
+                sonarr_cli._session.hooks["response"][0](response)
+            sonarr_cli._session.hooks["response"][0](response)
+
+        assert inner.as_dict()["requests"] == 1
+        assert outer.as_dict()["requests"] == 1
+
+    def test_streamed_responses_count_only_bytes_read(self, mocker) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        response = mocker.Mock()
+        type(response).content = mocker.PropertyMock()
+        run_summary = RunSummary()
+
+        with run_summary.track_requests(sonarr_cli):
+            sonarr_cli._session.hooks["response"][0](response, stream=True)
+            run_summary.count_bytes_received(1024)
+
+        type(response).content.assert_not_called()
+        assert run_summary.as_dict()["requests"] == 1
+        assert run_summary.as_dict()["bytes_received"] == 1024
+
+    def test_log_emits_one_record_with_the_summary_bound(self, mocker) -> None:
+        mocker.patch(
+            "renamarr.common.run_summary.monotonic", side_effect=[0, 1, 2.5, 9.25]
+        )
+        bind = mocker.patch("renamarr.common.run_summary.logger.bind")
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        run_summary = RunSummary()
+
+        with run_summary.track_requests(sonarr_cli):
+            sonarr_cli._session.hooks["response"][0](mocker.Mock(content=b"x" * 512))
+        with run_summary.phase("series_list"):
+            pass
+        run_summary.count("series", 3)
+        run_summary.count("series")
+        run_summary.log()
+
+        summary = {
+            "elapsed_seconds": 9.25,
+            "phases": {"series_list": 1.5},
+            "requests": 1,
+            "bytes_received": 512,
+            "counts": {"series": 4},
+        }
+        bind.assert_called_once_with(run_summary=summary)
+        bind.return_value.info.assert_called_once_with(
+            "Run summary: 9.2s total | series_list 1.5s | 1 requests, "
+            "0.5 KiB received | series 4"
+        )
+
+    def test_log_omits_empty_sections(self, mocker) -> None:
+        mocker.patch("renamarr.common.run_summary.monotonic", side_effect=[0, 2])
+        bind = mocker.patch("renamarr.common.run_summary.logger.bind")
+
+        RunSummary().log()
+
+        assert bind.return_value.info.call_args_list == [
+            call("Run summary: 2.0s total | 0 requests, 0.0 KiB received")
+        ]
@@ -0,0 +1,47 @@
+import pytest
+from pycliarr.api import CliArrError, SonarrCli
+
+from renamarr.common.server_version import server_version
+
+
+class TestServerVersion:
+    @pytest.mark.parametrize(
+        ("get_system_status", "expected"),
+        [
+            ({"return_value": {"version": "4.0.5.1710"}}, (4, 0, 5, 1710)),
+            ({"return_value": {"version": "4.develop"}}, (4,)),
+            ({"return_value": {}}, ()),
+            ({"side_effect": CliArrError("unreachable")}, ()),
+        ],
+        ids=["release", "non-numeric-part", "missing", "unreachable"],
+    )
+    def test_parses_the_numeric_version(
+        self, get_system_status, expected, mocker
+    ) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        mocker.patch.object(sonarr_cli, "get_system_status", **get_system_status)
+
+        assert server_version(sonarr_cli) == expected
+
+    def test_logs_the_probed_version(self, mock_loguru_debug, mocker) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        mocker.patch.object(
+            sonarr_cli, "get_system_status", side_effect=CliArrError("unreachable")
+        )
+
+        server_version(sonarr_cli)
+
+        mock_loguru_debug.assert_called_once_with("Server version unknown")
+
+    def test_probes_once_per_client(self, mocker) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        other_cli = SonarrCli("other.tld", "test-api-key")
+        get_system_status = mocker.patch.object(
+            SonarrCli, "get_system_status", return_value={"version": "4.0.5.1710"}
+        )
+
+        server_version(sonarr_cli)
+        server_version(sonarr_cli)
+        server_version(other_cli)
+
+        assert get_system_status.call_count == 2
@@ -1,13 +1,35 @@
-from unittest.mock import call
+from threading import Event
+from unittest.mock import MagicMock, call
 
-from pycliarr.api import SonarrCli, SonarrSerieItem
+import pytest
+from pycliarr.api import SonarrCli
+from pycliarr.api.exceptions import CliServerError
 
+from renamarr.common.list_fetcher import ListFetcher
+from renamarr.sonarr.models.series_record import SeriesRecord
+from renamarr.sonarr.services import renamarr as renamarr_module
 from renamarr.sonarr.services.renamarr import SonarrRenamarr
 
 
 class TestSonarrRenamarr:
+    @pytest.fixture(autouse=True)
+    def run_progress(self, mocker) -> MagicMock:
+        run_progress = mocker.patch(
+            "renamarr.sonarr.services.renamarr.RunProgress"
+        ).return_value
+        run_progress.stop_requested = False
+        run_progress.resuming = False
+        return run_progress
+
+    @pytest.fixture(autouse=True)
+    def unavailable_state_database(self, mocker) -> None:
+        # Full runs always try the state database; keep tests off the disk
+        mocker.patch(
+            "renamarr.sonarr.services.renamarr.open_state_database"
+        ).return_value.__enter__.return_value = None
+
     def test_no_series_returned(
-        self, get_serie_empty, mock_loguru_info, mock_loguru_error, mocker
+        self, series_list_empty, mock_loguru_info, mock_loguru_error, mocker
     ) -> None:
         analyze_files = mocker.patch("renamarr.sonarr.services.renamarr.AnalyzeFiles")
         series_rename = mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
@@ -28,12 +50,10 @@ class TestSonarrRenamarr:
     def test_scan_sorts_series_and_runs_series_rename(
         self, mock_loguru_debug, mocker
     ) -> None:
-        series_b = SonarrSerieItem(id=2, title="B Show")
-        series_a = SonarrSerieItem(id=1, title="A Show")
-        mocker.patch.object(SonarrCli, "get_serie").return_value = [
-            series_b,
-            series_a,
-        ]
+        series_b = {"id": 2, "title": "B Show"}
+        series_a = {"id": 1, "title": "A Show"}
+        fetch = mocker.patch.object(ListFetcher, "fetch")
+        fetch.return_value = [series_b, series_a]
         analyze_files = mocker.patch("renamarr.sonarr.services.renamarr.AnalyzeFiles")
         series_rename = mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
         series_folder_rename = mocker.patch(
@@ -48,12 +68,26 @@ class TestSonarrRenamarr:
             rename_folders=False,
         ).scan()
 
+        fetch.assert_called_once_with("/api/v3/series", mocker.ANY)
         mock_loguru_debug.assert_any_call("Retrieved series list")
         analyze_files.assert_not_called()
-        series_rename.return_value.process.assert_called_once_with([series_a, series_b])
+        series_rename.assert_called_once_with(
+            mocker.ANY,
+            max_concurrency=1,
+            rate_limiter=mocker.ANY,
+            command_waiter=mocker.ANY,
+            rename_batch_size=0,
+            run_summary=mocker.ANY,
+            plan_writer=None,
+            run_progress=mocker.ANY,
+            bulk_rename_preview=False,
+        )
+        series_rename.return_value.process.assert_called_once_with(
+            [SeriesRecord(1, "A Show"), SeriesRecord(2, "B Show")]
+        )
         series_folder_rename.assert_not_called()
 
-    def test_scan_runs_folder_rename_when_enabled(self, get_serie, mocker) -> None:
+    def test_scan_runs_folder_rename_when_enabled(self, series_list, mocker) -> None:
         analyze_files = mocker.patch("renamarr.sonarr.services.renamarr.AnalyzeFiles")
         series_rename = mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
         series_folder_rename = mocker.patch(
@@ -72,7 +106,9 @@ class TestSonarrRenamarr:
         series_rename.return_value.process.assert_called_once()
         series_folder_rename.return_value.process.assert_called_once()
 
-    def test_scan_runs_analyze_files_before_processing(self, get_serie, mocker) -> None:
+    def test_scan_runs_analyze_files_before_processing(
+        self, series_list, mocker
+    ) -> None:
         analyze_files = mocker.patch("renamarr.sonarr.services.renamarr.AnalyzeFiles")
         series_rename = mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
         series_folder_rename = mocker.patch(
@@ -106,7 +142,7 @@ class TestSonarrRenamarr:
         series_rename.return_value.process.assert_called_once()
         series_folder_rename.return_value.process.assert_called_once()
 
-    def test_scan_skips_folder_rename_when_disabled(self, get_serie, mocker) -> None:
+    def test_scan_skips_folder_rename_when_disabled(self, series_list, mocker) -> None:
         analyze_files = mocker.patch("renamarr.sonarr.services.renamarr.AnalyzeFiles")
         series_rename = mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
         series_folder_rename = mocker.patch(
@@ -126,7 +162,7 @@ class TestSonarrRenamarr:
         series_folder_rename.assert_not_called()
 
     def test_scan_with_analyze_files_returns_after_empty_series_list(
-        self, get_serie_empty, mocker
+        self, series_list_empty, mocker
     ) -> None:
         analyze_files = mocker.patch("renamarr.sonarr.services.renamarr.AnalyzeFiles")
         series_rename = mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
@@ -145,3 +181,467 @@ class TestSonarrRenamarr:
         analyze_files.return_value.process.assert_called_once()
         series_rename.assert_not_called()
         series_folder_rename.assert_not_called()
+
+    def test_scan_shares_concurrency_and_rate_limit_across_services(
+        self, series_list, mocker
+    ) -> None:
+        series_rename = mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
+        series_folder_rename = mocker.patch(
+            "renamarr.sonarr.services.renamarr.SeriesFolderRename"
+        )
+        rate_limiter = mocker.patch("renamarr.sonarr.services.renamarr.RateLimiter")
+        run_summary = mocker.patch("renamarr.sonarr.services.renamarr.RunSummary")
+
+        renamarr = SonarrRenamarr(
+            "test",
+            "test.tld",
+            "test-api-key",
+            rename_folders=True,
+            max_concurrency=4,
+            bulk_rename_preview=True,
+            max_requests_per_second=2.5,
+            rename_batch_size=50,
+        )
+        assert renamarr.scan() is run_summary.return_value
+
+        rate_limiter.assert_called_once_with(2.5)
+        series_rename.assert_called_once_with(
+            renamarr.sonarr_cli,
+            max_concurrency=4,
+            rate_limiter=rate_limiter.return_value,
+            command_waiter=renamarr.command_waiter,
+            rename_batch_size=50,
+            run_summary=run_summary.return_value,
+            plan_writer=None,
+            run_progress=mocker.ANY,
+            bulk_rename_preview=True,
+        )
+        series_folder_rename.assert_called_once_with(
+            renamarr.sonarr_cli,
+            max_concurrency=4,
+            rate_limiter=rate_limiter.return_value,
+            state_database=None,
+            command_waiter=renamarr.command_waiter,
+            command_tracker=None,
+            run_summary=run_summary.return_value,
+            plan_writer=None,
+            run_progress=mocker.ANY,
+        )
+
+    def test_scan_opens_state_database_when_caching_folder_names(
+        self, series_list, mocker
+    ) -> None:
+        mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
+        series_folder_rename = mocker.patch(
+            "renamarr.sonarr.services.renamarr.SeriesFolderRename"
+        )
+        open_state_database = mocker.patch(
+            "renamarr.sonarr.services.renamarr.open_state_database"
+        )
+        state_database = open_state_database.return_value.__enter__.return_value
+
+        renamarr = SonarrRenamarr(
+            "test",
+            "test.tld",
+            "test-api-key",
+            rename_folders=True,
+            cache_folder_names=True,
+        )
+        renamarr.scan()
+
+        open_state_database.assert_called_once_with("sonarr", "test")
+        series_folder_rename.assert_called_once_with(
+            renamarr.sonarr_cli,
+            max_concurrency=1,
+            rate_limiter=mocker.ANY,
+            state_database=state_database,
+            command_waiter=renamarr.command_waiter,
+            command_tracker=None,
+            run_summary=mocker.ANY,
+            plan_writer=None,
+            run_progress=mocker.ANY,
+        )
+
+    def test_incremental_scan_processes_only_changed_series(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        changed = {"id": 2, "title": "Changed"}
+        mocker.patch.object(ListFetcher, "fetch").return_value = [
+            {"id": 1, "title": "Unchanged"},
+            changed,
+        ]
+        series_rename = mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
+        series_folder_rename = mocker.patch(
+            "renamarr.sonarr.services.renamarr.SeriesFolderRename"
+        )
+        open_state_database = mocker.patch(
+            "renamarr.sonarr.services.renamarr.open_state_database"
+        )
+        state_database = open_state_database.return_value.__enter__.return_value
+        history_checkpoint = mocker.patch(
+            "renamarr.sonarr.services.renamarr.HistoryCheckpoint"
+        )
+        history_checkpoint.return_value.changed_item_ids.return_value = {2}
+
+        renamarr = SonarrRenamarr(
+            "test",
+            "test.tld",
+            "test-api-key",
+            rename_folders=True,
+            incremental=True,
+            full_sweep_runs=6,
+        )
+        renamarr.scan()
+
+        open_state_database.assert_called_once_with("sonarr", "test")
+        history_checkpoint.assert_called_once_with(
+            state_database,
+            renamarr.sonarr_cli,
+            "seriesId",
+            ("downloadFolderImported", "seriesFolderImported"),
+            6,
+        )
+        series_rename.return_value.process.assert_called_once_with(
+            [SeriesRecord(2, "Changed")]
+        )
+        series_folder_rename.assert_called_once_with(
+            renamarr.sonarr_cli,
+            max_concurrency=1,
+            rate_limiter=mocker.ANY,
+            state_database=None,
+            command_waiter=renamarr.command_waiter,
+            command_tracker=None,
+            run_summary=mocker.ANY,
+            plan_writer=None,
+            run_progress=mocker.ANY,
+        )
+        series_folder_rename.return_value.process.assert_called_once_with(
+            [SeriesRecord(2, "Changed")]
+        )
+        history_checkpoint.return_value.save.assert_called_once_with()
+        mock_loguru_info.assert_any_call("Incremental run, processing 1 changed series")
+
+    def test_incremental_scan_skips_series_list_when_nothing_changed(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        fetch = mocker.patch.object(ListFetcher, "fetch")
+        series_rename = mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
+        mocker.patch("renamarr.sonarr.services.renamarr.open_state_database")
+        history_checkpoint = mocker.patch(
+            "renamarr.sonarr.services.renamarr.HistoryCheckpoint"
+        )
+        history_checkpoint.return_value.changed_item_ids.return_value = set()
+
+        SonarrRenamarr("test", "test.tld", "test-api-key", incremental=True).scan()
+
+        fetch.assert_not_called()
+        series_rename.assert_not_called()
+        history_checkpoint.return_value.save.assert_called_once_with()
+        mock_loguru_info.assert_has_calls(
+            [call("No series changed since last run"), call("Finished Renamarr")]
+        )
+
+    def test_incremental_scan_runs_full_sweep_when_checkpoint_requests_it(
+        self, series_list, mocker
+    ) -> None:
+        series_rename = mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
+        mocker.patch("renamarr.sonarr.services.renamarr.open_state_database")
+        history_checkpoint = mocker.patch(
+            "renamarr.sonarr.services.renamarr.HistoryCheckpoint"
+        )
+        history_checkpoint.return_value.changed_item_ids.return_value = None
+
+        SonarrRenamarr("test", "test.tld", "test-api-key", incremental=True).scan()
+
+        series_rename.return_value.process.assert_called_once_with(
+            [SeriesRecord(1, "test title")]
+        )
+        history_checkpoint.return_value.save.assert_called_once_with()
+
+    def test_incremental_scan_runs_full_sweep_without_state_database(
+        self, series_list, mocker
+    ) -> None:
+        series_rename = mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
+        open_state_database = mocker.patch(
+            "renamarr.sonarr.services.renamarr.open_state_database"
+        )
+        open_state_database.return_value.__enter__.return_value = None
+        history_checkpoint = mocker.patch(
+            "renamarr.sonarr.services.renamarr.HistoryCheckpoint"
+        )
+
+        SonarrRenamarr("test", "test.tld", "test-api-key", incremental=True).scan()
+
+        history_checkpoint.assert_not_called()
+        series_rename.return_value.process.assert_called_once_with(
+            [SeriesRecord(1, "test title")]
+        )
+
+    def test_scan_waits_for_commands_with_configured_timeout(
+        self, series_list, mocker
+    ) -> None:
+        analyze_files = mocker.patch("renamarr.sonarr.services.renamarr.AnalyzeFiles")
+        mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
+
+        stop_requested = Event()
+        renamarr = SonarrRenamarr(
+            "test",
+            "test.tld",
+            "test-api-key",
+            analyze_files=True,
+            command_timeout_minutes=30,
+            analyze_timeout_minutes=240,
+            stop_requested=stop_requested,
+        )
+        renamarr.scan()
+
+        assert renamarr.command_waiter.cli is renamarr.sonarr_cli
+        assert renamarr.command_waiter.timeout_seconds == 1800
+        assert renamarr.command_waiter.stop_requested is stop_requested
+        assert renamarr.analyze_command_waiter.cli is renamarr.sonarr_cli
+        assert renamarr.analyze_command_waiter.timeout_seconds == 14400
+        assert renamarr.analyze_command_waiter.stop_requested is stop_requested
+        analyze_files.assert_called_once_with(
+            renamarr.sonarr_cli, renamarr.analyze_command_waiter
+        )
+
+    def test_scan_waits_for_deferred_rescans_after_folder_renames(
+        self, series_list, mocker
+    ) -> None:
+        mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
+        folder_rename = mocker.patch(
+            "renamarr.sonarr.services.renamarr.SeriesFolderRename"
+        )
+        command_tracker = mocker.patch(
+            "renamarr.sonarr.services.renamarr.CommandTracker"
+        )
+        manager = mocker.Mock()
+        manager.attach_mock(folder_rename.return_value.process, "process")
+        manager.attach_mock(command_tracker.return_value.wait_all, "wait_all")
+
+        renamarr = SonarrRenamarr(
+            "test",
+            "test.tld",
+            "test-api-key",
+            rename_folders=True,
+            defer_rescans=True,
+        )
+        renamarr.scan()
+
+        command_tracker.assert_called_once_with(renamarr.command_waiter)
+        folder_rename.assert_called_once_with(
+            renamarr.sonarr_cli,
+            max_concurrency=1,
+            rate_limiter=mocker.ANY,
+            state_database=None,
+            command_waiter=renamarr.command_waiter,
+            command_tracker=command_tracker.return_value,
+            run_summary=mocker.ANY,
+            plan_writer=None,
+            run_progress=mocker.ANY,
+        )
+        assert [name for name, _, _ in manager.mock_calls] == ["process", "wait_all"]
+
+    def test_dry_run_writes_plan_without_analyzing(self, series_list, mocker) -> None:
+        analyze_files = mocker.patch("renamarr.sonarr.services.renamarr.AnalyzeFiles")
+        rename = mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
+        folder_rename = mocker.patch(
+            "renamarr.sonarr.services.renamarr.SeriesFolderRename"
+        )
+        plan_writer = mocker.patch("renamarr.sonarr.services.renamarr.PlanWriter")
+        run_summary = mocker.patch("renamarr.sonarr.services.renamarr.RunSummary")
+        run_summary.return_value.as_dict.return_value = {"counts": {}}
+
+        SonarrRenamarr(
+            "test",
+            "test.tld",
+            "test-api-key",
+            analyze_files=True,
+            rename_folders=True,
+            dry_run=True,
+        ).scan()
+
+        plan_writer.assert_called_once_with("sonarr", "test")
+        analyze_files.assert_not_called()
+        assert rename.call_args.kwargs["plan_writer"] is plan_writer.return_value
+        assert folder_rename.call_args.kwargs["plan_writer"] is plan_writer.return_value
+        plan_writer.return_value.write.assert_called_once_with("summary", counts={})
+        plan_writer.return_value.save.assert_called_once_with()
+
+    @pytest.mark.parametrize("changed_item_ids", [{2}, set()])
+    def test_dry_run_leaves_history_checkpoint_unsaved(
+        self, changed_item_ids, mocker
+    ) -> None:
+        mocker.patch.object(ListFetcher, "fetch").return_value = [
+            {"id": 2, "title": "Changed"}
+        ]
+        mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
+        mocker.patch("renamarr.sonarr.services.renamarr.PlanWriter")
+        mocker.patch("renamarr.sonarr.services.renamarr.open_state_database")
+        history_checkpoint = mocker.patch(
+            "renamarr.sonarr.services.renamarr.HistoryCheckpoint"
+        )
+        history_checkpoint.return_value.changed_item_ids.return_value = changed_item_ids
+
+        SonarrRenamarr(
+            "test", "test.tld", "test-api-key", incremental=True, dry_run=True
+        ).scan()
+
+        history_checkpoint.return_value.save.assert_not_called()
+
+    def test_scan_items_fetches_and_processes_only_the_given_series(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        get_item = mocker.patch.object(SonarrCli, "get_item")
+        item_a = {"id": 5, "title": "A"}
+        item_b = {"id": 2, "title": "B"}
+        get_item.side_effect = {2: item_b, 5: item_a}.get
+        analyze_files = mocker.patch("renamarr.sonarr.services.renamarr.AnalyzeFiles")
+        rename = mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
+        open_state_database = mocker.patch(
+            "renamarr.sonarr.services.renamarr.open_state_database"
+        )
+        history_checkpoint = mocker.patch(
+            "renamarr.sonarr.services.renamarr.HistoryCheckpoint"
+        )
+
+        SonarrRenamarr(
+            "test", "test.tld", "test-api-key", analyze_files=True, incremental=True
+        ).scan_items({5, 2})
+
+        assert get_item.call_args_list == [call(2), call(5)]
+        rename.return_value.process.assert_called_once_with(
+            [SeriesRecord(5, "A"), SeriesRecord(2, "B")]
+        )
+        mock_loguru_info.assert_any_call("Targeted run, processing 2 series")
+        analyze_files.assert_not_called()
+        open_state_database.assert_not_called()
+        history_checkpoint.assert_not_called()
+
+    def test_scan_items_skips_items_that_no_longer_exist(
+        self, mock_loguru_warning, mocker
+    ) -> None:
+        missing = CliServerError("not found", status_code=404, response="")
+        mocker.patch.object(SonarrCli, "get_item").side_effect = [
+            missing,
+            {"id": 5, "title": "A"},
+        ]
+        rename = mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
+
+        SonarrRenamarr("test", "test.tld", "test-api-key").scan_items({2, 5})
+
+        rename.return_value.process.assert_called_once_with([SeriesRecord(5, "A")])
+        mock_loguru_warning.assert_called_once_with(
+            "Series 2 no longer exists, skipping"
+        )
+
+    def test_scan_items_raises_other_server_errors(self, mocker) -> None:
+        server_error = CliServerError("unavailable", status_code=503, response="")
+        mocker.patch.object(SonarrCli, "get_item").side_effect = server_error
+        rename = mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
+
+        with pytest.raises(CliServerError):
+            SonarrRenamarr("test", "test.tld", "test-api-key").scan_items({2})
+
+        rename.assert_not_called()
+
+    def test_scan_journals_progress_in_the_state_database(
+        self, series_list, run_progress, mocker
+    ) -> None:
+        rename = mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
+        open_state_database = mocker.patch(
+            "renamarr.sonarr.services.renamarr.open_state_database"
+        )
+        state_database = open_state_database.return_value.__enter__.return_value
+        stop_requested = Event()
+
+        SonarrRenamarr(
+            "test",
+            "test.tld",
+            "test-api-key",
+            cache_folder_names=True,
+            stop_requested=stop_requested,
+        ).scan()
+
+        renamarr_module.RunProgress.assert_called_once_with(
+            stop_requested, state_database
+        )
+        assert rename.call_args.kwargs["run_progress"] is run_progress
+        run_progress.finish.assert_called_once_with()
+
+    def test_scan_journals_progress_without_other_state_features(
+        self, series_list, mocker
+    ) -> None:
+        mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
+        open_state_database = mocker.patch(
+            "renamarr.sonarr.services.renamarr.open_state_database"
+        )
+        state_database = open_state_database.return_value.__enter__.return_value
+
+        SonarrRenamarr("test", "test.tld", "test-api-key").scan()
+
+        open_state_database.assert_called_once_with("sonarr", "test")
+        renamarr_module.RunProgress.assert_called_once_with(None, state_database)
+
+    def test_dry_run_does_not_journal_progress(self, series_list, mocker) -> None:
+        mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
+        mocker.patch("renamarr.sonarr.services.renamarr.PlanWriter")
+        mocker.patch("renamarr.sonarr.services.renamarr.open_state_database")
+
+        SonarrRenamarr(
+            "test", "test.tld", "test-api-key", cache_folder_names=True, dry_run=True
+        ).scan()
+
+        renamarr_module.RunProgress.assert_called_once_with(None, None)
+
+    def test_scan_skips_run_when_shutdown_was_requested(
+        self, run_progress, mock_loguru_info, mocker
+    ) -> None:
+        fetch = mocker.patch.object(ListFetcher, "fetch")
+        run_progress.stop_requested = True
+
+        SonarrRenamarr("test", "test.tld", "test-api-key").scan()
+
+        fetch.assert_not_called()
+        mock_loguru_info.assert_any_call("Shutdown requested, skipping run")
+
+    def test_interrupted_scan_keeps_journal_and_history_checkpoint(
+        self, series_list, run_progress, mock_loguru_info, mocker
+    ) -> None:
+        rename = mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
+        rename.return_value.process.side_effect = lambda _: setattr(
+            run_progress, "stop_requested", True
+        )
+        mocker.patch("renamarr.sonarr.services.renamarr.open_state_database")
+        history_checkpoint = mocker.patch(
+            "renamarr.sonarr.services.renamarr.HistoryCheckpoint"
+        )
+        history_checkpoint.return_value.changed_item_ids.return_value = None
+
+        SonarrRenamarr("test", "test.tld", "test-api-key", incremental=True).scan()
+
+        history_checkpoint.return_value.save.assert_not_called()
+        run_progress.finish.assert_not_called()
+        mock_loguru_info.assert_any_call("Stopped before finishing the run")
+
+    def test_scan_skips_analyze_files_when_shutdown_was_requested(
+        self, series_list, run_progress, mocker
+    ) -> None:
+        analyze_files = mocker.patch("renamarr.sonarr.services.renamarr.AnalyzeFiles")
+        run_progress.stop_requested = True
+
+        SonarrRenamarr("test", "test.tld", "test-api-key", analyze_files=True).scan()
+
+        analyze_files.assert_not_called()
+
+    def test_resumed_scan_skips_analyze_files(
+        self, series_list, run_progress, mocker
+    ) -> None:
+        analyze_files = mocker.patch("renamarr.sonarr.services.renamarr.AnalyzeFiles")
+        rename = mocker.patch("renamarr.sonarr.services.renamarr.SeriesRename")
+        run_progress.resuming = True
+
+        SonarrRenamarr("test", "test.tld", "test-api-key", analyze_files=True).scan()
+
+        analyze_files.assert_not_called()
+        rename.return_value.process.assert_called_once()
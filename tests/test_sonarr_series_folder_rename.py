@@ -1,12 +1,21 @@
-from pathlib import PurePosixPath
+import sqlite3
+from threading import Event
 from unittest.mock import call
 
 import pytest
-from pycliarr.api import SonarrCli, SonarrSerieItem
+from pycliarr.api import SonarrCli
 from pycliarr.api.exceptions import CliServerError
 
+from renamarr.common.command_tracker import CommandTracker
+from renamarr.common.command_waiter import DEFAULT_TIMEOUT_SECONDS
+from renamarr.common.folder_name_cache import FolderNameCache, item_fingerprint
+from renamarr.common.list_fetcher import ListFetcher
+from renamarr.common.plan_writer import PlanWriter
+from renamarr.common.root_folder_index import RootFolderIndex
+from renamarr.common.run_progress import RunProgress
+from renamarr.sonarr.models.series_record import SeriesRecord
 from renamarr.sonarr.services.series_folder_rename import (
-    MAX_WAIT_SECONDS,
+    FOLDER_FINGERPRINT_FIELDS,
     SeriesFolderRename,
     SeriesRootFolderNotFoundError,
 )
@@ -17,10 +26,8 @@ class TestSeriesFolderRename:
         self, mock_loguru_debug, mocker
     ) -> None:
         sonarr_cli = SonarrCli("test.tld", "test-api-key")
-        series = SonarrSerieItem(id=1, title="Show", path="/root/Show")
-        mocker.patch.object(
-            sonarr_cli, "get_root_folder", return_value=[{"path": "/root"}]
-        )
+        series = SeriesRecord(id=1, title="Show", path="/root/Show")
+        mocker.patch.object(ListFetcher, "fetch", return_value=[{"path": "/root"}])
         mocker.patch.object(sonarr_cli, "request_get", return_value={"folder": "Show"})
         request_put = mocker.patch.object(sonarr_cli, "request_put")
         send_command = mocker.patch.object(sonarr_cli, "_sendCommand")
@@ -38,12 +45,12 @@ class TestSeriesFolderRename:
         self, mock_loguru_info, mock_loguru_debug, mocker
     ) -> None:
         sonarr_cli = SonarrCli("test.tld", "test-api-key")
-        series_a = SonarrSerieItem(id=1, title="Show A", path="/rootA/OldA")
-        series_b = SonarrSerieItem(id=2, title="Show B", path="/rootB/OldB")
-        series_c = SonarrSerieItem(id=3, title="Show C", path="/rootA/OldC")
+        series_a = SeriesRecord(id=1, title="Show A", path="/rootA/OldA")
+        series_b = SeriesRecord(id=2, title="Show B", path="/rootB/OldB")
+        series_c = SeriesRecord(id=3, title="Show C", path="/rootA/OldC")
         mocker.patch.object(
-            sonarr_cli,
-            "get_root_folder",
+            ListFetcher,
+            "fetch",
             return_value=[{"path": "/rootA"}, {"path": "/rootB"}],
         )
         mocker.patch.object(sonarr_cli, "request_get").side_effect = [
@@ -69,7 +76,7 @@ class TestSeriesFolderRename:
                 {"status": "completed", "result": "successful"},
             ],
         )
-        mocker.patch("renamarr.sonarr.services.series_folder_rename.sleep")
+        mocker.patch("renamarr.common.command_waiter.sleep")
 
         SeriesFolderRename(sonarr_cli).process([series_a, series_b, series_c])
 
@@ -114,35 +121,40 @@ class TestSeriesFolderRename:
             ]
         )
 
-    def test_process_sorts_root_folders_before_matching_series(self, mocker) -> None:
+    def test_process_indexes_root_folders_once_per_run(self, mocker) -> None:
         sonarr_cli = SonarrCli("test.tld", "test-api-key")
-        series = SonarrSerieItem(id=1, title="Show", path="/rootA/Show")
+        series = [
+            SeriesRecord(id=1, title="Show A", path="/rootA/Show A"),
+            SeriesRecord(id=2, title="Show B", path="/rootB/Show B"),
+        ]
+        fetch = mocker.patch.object(
+            ListFetcher,
+            "fetch",
+            return_value=[{"path": "/rootB"}, {"path": "/rootA"}],
+        )
         mocker.patch.object(
             sonarr_cli,
-            "get_root_folder",
-            return_value=[{"path": "/rootB"}, {"path": "/rootA"}],
+            "request_get",
+            side_effect=[{"folder": "Show A"}, {"folder": "Show B"}],
         )
-        mocker.patch.object(sonarr_cli, "request_get", return_value={"folder": "Show"})
-        service = SeriesFolderRename(sonarr_cli)
-        find_series_root_folder = mocker.spy(
-            service, "_SeriesFolderRename__find_series_root_folder"
+        root_folder_index = mocker.patch(
+            "renamarr.sonarr.services.series_folder_rename.RootFolderIndex",
+            wraps=RootFolderIndex,
         )
 
-        service.process([series])
+        SeriesFolderRename(sonarr_cli).process(series)
 
-        assert find_series_root_folder.call_args.args[1] == [
-            {"path": "/rootA"},
-            {"path": "/rootB"},
-        ]
+        fetch.assert_called_once_with("/api/v3/rootfolder", mocker.ANY)
+        root_folder_index.assert_called_once_with(
+            [{"path": "/rootB"}, {"path": "/rootA"}]
+        )
 
     def test_process_logs_when_series_rescan_fails(
         self, mock_loguru_info, mocker
     ) -> None:
         sonarr_cli = SonarrCli("test.tld", "test-api-key")
-        series = SonarrSerieItem(id=1, title="Show", path="/root/Old")
-        mocker.patch.object(
-            sonarr_cli, "get_root_folder", return_value=[{"path": "/root"}]
-        )
+        series = SeriesRecord(id=1, title="Show", path="/root/Old")
+        mocker.patch.object(ListFetcher, "fetch", return_value=[{"path": "/root"}])
         mocker.patch.object(sonarr_cli, "request_get", return_value={"folder": "New"})
         mocker.patch.object(sonarr_cli, "request_put", return_value=[{"id": 1}])
         mocker.patch.object(sonarr_cli, "_sendCommand", return_value={"id": 10})
@@ -151,7 +163,7 @@ class TestSeriesFolderRename:
             "get_command",
             return_value={"status": "completed", "result": "failed"},
         )
-        mocker.patch("renamarr.sonarr.services.series_folder_rename.sleep")
+        mocker.patch("renamarr.common.command_waiter.sleep")
 
         SeriesFolderRename(sonarr_cli).process([series])
 
@@ -166,10 +178,8 @@ class TestSeriesFolderRename:
         self, mock_loguru_error, mock_loguru_info, mocker
     ) -> None:
         sonarr_cli = SonarrCli("test.tld", "test-api-key")
-        series = SonarrSerieItem(id=1, title="Show", path="/root/Old")
-        mocker.patch.object(
-            sonarr_cli, "get_root_folder", return_value=[{"path": "/root"}]
-        )
+        series = SeriesRecord(id=1, title="Show", path="/root/Old")
+        mocker.patch.object(ListFetcher, "fetch", return_value=[{"path": "/root"}])
         mocker.patch.object(sonarr_cli, "request_get", return_value={"folder": "New"})
         mocker.patch.object(sonarr_cli, "request_put", return_value=[{"id": 1}])
         mocker.patch.object(sonarr_cli, "_sendCommand", return_value={"id": 10})
@@ -178,16 +188,16 @@ class TestSeriesFolderRename:
             "get_command",
             return_value={"status": "started"},
         )
-        sleep = mocker.patch("renamarr.sonarr.services.series_folder_rename.sleep")
+        sleep = mocker.patch("renamarr.common.command_waiter.sleep")
         mocker.patch(
-            "renamarr.sonarr.services.series_folder_rename.time.time",
-            side_effect=[0, 0, MAX_WAIT_SECONDS],
+            "renamarr.common.command_waiter.monotonic",
+            side_effect=[0, 0, DEFAULT_TIMEOUT_SECONDS],
         )
 
         SeriesFolderRename(sonarr_cli).process([series])
 
         get_command.assert_called_once_with(cid=10)
-        sleep.assert_called_once_with(10)
+        sleep.assert_called_once_with(1)
         mock_loguru_error.assert_called_once_with(
             "Timed out waiting for Sonarr series rescan command 10 after 300 seconds"
         )
@@ -202,10 +212,8 @@ class TestSeriesFolderRename:
         self, mock_loguru_info, mocker
     ) -> None:
         sonarr_cli = SonarrCli("test.tld", "test-api-key")
-        series = SonarrSerieItem(id=1, title="Show", path="/root/Old")
-        mocker.patch.object(
-            sonarr_cli, "get_root_folder", return_value=[{"path": "/root"}]
-        )
+        series = SeriesRecord(id=1, title="Show", path="/root/Old")
+        mocker.patch.object(ListFetcher, "fetch", return_value=[{"path": "/root"}])
         mocker.patch.object(sonarr_cli, "request_get", return_value={"folder": "New"})
         server_error = CliServerError(
             "Sonarr series folder rename failed",
@@ -238,13 +246,11 @@ class TestSeriesFolderRename:
         self, mock_loguru_error, mocker
     ) -> None:
         sonarr_cli = SonarrCli("test.tld", "test-api-key")
-        unmatched_series = SonarrSerieItem(
+        unmatched_series = SeriesRecord(
             id=1, title="Unmatched Show", path="/unmatched/Show"
         )
-        matched_series = SonarrSerieItem(id=2, title="Matched Show", path="/root/Old")
-        mocker.patch.object(
-            sonarr_cli, "get_root_folder", return_value=[{"path": "/root"}]
-        )
+        matched_series = SeriesRecord(id=2, title="Matched Show", path="/root/Old")
+        mocker.patch.object(ListFetcher, "fetch", return_value=[{"path": "/root"}])
         request_get = mocker.patch.object(
             sonarr_cli, "request_get", return_value={"folder": "New"}
         )
@@ -259,7 +265,7 @@ class TestSeriesFolderRename:
             "get_command",
             return_value={"status": "completed", "result": "successful"},
         )
-        mocker.patch("renamarr.sonarr.services.series_folder_rename.sleep")
+        mocker.patch("renamarr.common.command_waiter.sleep")
 
         SeriesFolderRename(sonarr_cli).process([unmatched_series, matched_series])
 
@@ -287,22 +293,22 @@ class TestSeriesFolderRename:
             ),
         ):
             service._SeriesFolderRename__find_series_root_folder(
-                PurePosixPath("/unmatched/Show"),
-                [{"path": "/root"}],
+                "/unmatched/Show",
+                RootFolderIndex([{"path": "/root"}]),
             )
 
     def test_process_uses_path_matching_for_overlapping_root_names(
         self, mock_loguru_debug, mocker
     ) -> None:
         sonarr_cli = SonarrCli("test.tld", "test-api-key")
-        series = SonarrSerieItem(
+        series = SeriesRecord(
             id=1,
             title="Anime Show",
             path="/data/media/tv-anime/OldName",
         )
         mocker.patch.object(
-            sonarr_cli,
-            "get_root_folder",
+            ListFetcher,
+            "fetch",
             return_value=[
                 {"path": "/data/media/tv"},
                 {"path": "/data/media/tv-anime"},
@@ -318,7 +324,7 @@ class TestSeriesFolderRename:
             "get_command",
             return_value={"status": "completed", "result": "successful"},
         )
-        mocker.patch("renamarr.sonarr.services.series_folder_rename.sleep")
+        mocker.patch("renamarr.common.command_waiter.sleep")
 
         SeriesFolderRename(sonarr_cli).process([series])
 
@@ -356,10 +362,10 @@ class TestSeriesFolderRename:
         mocker,
     ) -> None:
         sonarr_cli = SonarrCli("test.tld", "test-api-key")
-        series = SonarrSerieItem(id=1, title="Show", path=series_path)
+        series = SeriesRecord(id=1, title="Show", path=series_path)
         mocker.patch.object(
-            sonarr_cli,
-            "get_root_folder",
+            ListFetcher,
+            "fetch",
             return_value=root_folders,
         )
         mocker.patch.object(sonarr_cli, "request_get", return_value={"folder": "New"})
@@ -372,7 +378,7 @@ class TestSeriesFolderRename:
             "get_command",
             return_value={"status": "completed", "result": "successful"},
         )
-        mocker.patch("renamarr.sonarr.services.series_folder_rename.sleep")
+        mocker.patch("renamarr.common.command_waiter.sleep")
 
         SeriesFolderRename(sonarr_cli).process([series])
 
@@ -384,3 +390,245 @@ class TestSeriesFolderRename:
                 "moveFiles": True,
             },
         )
+
+    def test_process_resolves_folders_concurrently_and_groups_in_series_order(
+        self, mocker
+    ) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        series = [
+            SeriesRecord(id=1, title="Show A", path="/root/OldA"),
+            SeriesRecord(id=2, title="Show B", path="/root/Show B"),
+            SeriesRecord(id=3, title="Show C", path="/root/OldC"),
+        ]
+        mocker.patch.object(ListFetcher, "fetch", return_value=[{"path": "/root"}])
+        folders = {
+            "/api/v3/series/1/folder": {"folder": "Show A"},
+            "/api/v3/series/2/folder": {"folder": "Show B"},
+            "/api/v3/series/3/folder": {"folder": "Show C"},
+        }
+        mocker.patch.object(
+            sonarr_cli, "request_get", side_effect=lambda path: folders[path]
+        )
+        request_put = mocker.patch.object(sonarr_cli, "request_put")
+        mocker.patch.object(sonarr_cli, "_sendCommand", return_value={"id": 10})
+        mocker.patch.object(
+            sonarr_cli,
+            "get_command",
+            return_value={"status": "completed", "result": "successful"},
+        )
+        mocker.patch("renamarr.common.command_waiter.sleep")
+        rate_limiter = mocker.Mock()
+
+        SeriesFolderRename(
+            sonarr_cli, max_concurrency=3, rate_limiter=rate_limiter
+        ).process(series)
+
+        assert rate_limiter.acquire.call_count == 3
+        request_put.assert_called_once_with(
+            path="/api/v3/series/editor",
+            json_data={
+                "rootFolderPath": "/root",
+                "seriesIds": [1, 3],
+                "moveFiles": True,
+            },
+        )
+
+    def test_process_reuses_cached_folder_names_until_series_metadata_changes(
+        self, mocker
+    ) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        state_database = sqlite3.connect(":memory:")
+        mocker.patch.object(ListFetcher, "fetch", return_value=[{"path": "/root"}])
+        responses = {
+            "/api/v3/config/naming": {"seriesFolderFormat": "{Series Title}"},
+            "/api/v3/series/1/folder": {"folder": "Show"},
+        }
+        request_get = mocker.patch.object(
+            sonarr_cli, "request_get", side_effect=lambda path: responses[path]
+        )
+        service = SeriesFolderRename(sonarr_cli, state_database=state_database)
+
+        service.process([SeriesRecord(id=1, title="Show", path="/root/Show")])
+        service.process([SeriesRecord(id=1, title="Show", path="/root/Show")])
+        service.process([SeriesRecord(id=1, title="New", path="/root/Show")])
+
+        assert [call.kwargs["path"] for call in request_get.call_args_list] == [
+            "/api/v3/config/naming",
+            "/api/v3/series/1/folder",
+            "/api/v3/config/naming",
+            "/api/v3/config/naming",
+            "/api/v3/series/1/folder",
+        ]
+
+    def test_process_plans_rename_from_cached_folder_name(self, mocker) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        state_database = sqlite3.connect(":memory:")
+        series = SeriesRecord(id=1, title="Show", path="/root/Old")
+        naming_config = {"seriesFolderFormat": "{Series Title}"}
+        FolderNameCache(state_database, naming_config).set_folder_name(
+            1, item_fingerprint(series, FOLDER_FINGERPRINT_FIELDS), "Show"
+        )
+        mocker.patch.object(ListFetcher, "fetch", return_value=[{"path": "/root"}])
+        request_get = mocker.patch.object(
+            sonarr_cli, "request_get", return_value=naming_config
+        )
+        request_put = mocker.patch.object(sonarr_cli, "request_put")
+        mocker.patch.object(sonarr_cli, "_sendCommand", return_value={"id": 10})
+        mocker.patch.object(
+            sonarr_cli,
+            "get_command",
+            return_value={"status": "completed", "result": "successful"},
+        )
+        mocker.patch("renamarr.common.command_waiter.sleep")
+
+        SeriesFolderRename(sonarr_cli, state_database=state_database).process([series])
+
+        request_get.assert_called_once_with(path="/api/v3/config/naming")
+        request_put.assert_called_once_with(
+            path="/api/v3/series/editor",
+            json_data={"rootFolderPath": "/root", "seriesIds": [1], "moveFiles": True},
+        )
+
+    def test_process_tracks_rescans_without_waiting_when_deferred(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        mocker.patch.object(
+            ListFetcher,
+            "fetch",
+            return_value=[{"path": "/rootA"}, {"path": "/rootB"}],
+        )
+        mocker.patch.object(sonarr_cli, "request_get").side_effect = [
+            {"folder": "NewA"},
+            {"folder": "NewB"},
+        ]
+        mocker.patch.object(sonarr_cli, "request_put")
+        mocker.patch.object(
+            sonarr_cli, "_sendCommand", side_effect=[{"id": 10}, {"id": 20}]
+        )
+        get_command = mocker.patch.object(sonarr_cli, "get_command")
+        command_tracker = mocker.Mock(spec=CommandTracker)
+
+        SeriesFolderRename(sonarr_cli, command_tracker=command_tracker).process(
+            [
+                SeriesRecord(id=1, title="Show A", path="/rootA/OldA"),
+                SeriesRecord(id=2, title="Show B", path="/rootB/OldB"),
+            ]
+        )
+
+        get_command.assert_not_called()
+        assert command_tracker.track.call_args_list == [
+            call({"id": 10}, "Sonarr series rescan"),
+            call({"id": 20}, "Sonarr series rescan"),
+        ]
+        assert call("disk scan finished successfully") not in (
+            mock_loguru_info.call_args_list
+        )
+
+    def test_process_writes_plan_instead_of_moving_on_dry_run(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        mocker.patch.object(ListFetcher, "fetch", return_value=[{"path": "/rootA"}])
+        mocker.patch.object(sonarr_cli, "request_get", return_value={"folder": "NewA"})
+        request_put = mocker.patch.object(sonarr_cli, "request_put")
+        send_command = mocker.patch.object(sonarr_cli, "_sendCommand")
+        plan_writer = mocker.Mock(spec=PlanWriter)
+
+        SeriesFolderRename(sonarr_cli, plan_writer=plan_writer).process(
+            [SeriesRecord(id=1, title="Show A", path="/rootA/OldA")]
+        )
+
+        request_put.assert_not_called()
+        send_command.assert_not_called()
+        plan_writer.write.assert_called_once_with(
+            "folder_rename",
+            root_folder_path="/rootA",
+            move_files=True,
+            series=[
+                {
+                    "id": 1,
+                    "title": "Show A",
+                    "path": "/rootA/OldA",
+                    "expected_path": "/rootA/NewA",
+                }
+            ],
+        )
+        mock_loguru_info.assert_called_once_with(
+            "Would rename Series folder for: Show A"
+        )
+
+    def test_process_journals_series_and_stops_before_remaining_folders(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        mocker.patch.object(
+            ListFetcher,
+            "fetch",
+            return_value=[{"path": "/rootA"}, {"path": "/rootB"}],
+        )
+        mocker.patch.object(sonarr_cli, "request_get").side_effect = [
+            {"folder": "ShowA"},
+            {"folder": "NewB"},
+            {"folder": "NewC"},
+        ]
+        stop_requested = Event()
+        request_put = mocker.patch.object(
+            sonarr_cli, "request_put", side_effect=lambda **kwargs: stop_requested.set()
+        )
+        mocker.patch.object(sonarr_cli, "_sendCommand", return_value={"id": 10})
+        connection = sqlite3.connect(":memory:")
+
+        SeriesFolderRename(
+            sonarr_cli,
+            command_tracker=mocker.Mock(spec=CommandTracker),
+            run_progress=RunProgress(stop_requested, connection),
+        ).process(
+            [
+                SeriesRecord(id=1, title="Show A", path="/rootA/ShowA"),
+                SeriesRecord(id=2, title="Show B", path="/rootA/OldB"),
+                SeriesRecord(id=3, title="Show C", path="/rootB/OldC"),
+            ]
+        )
+
+        request_put.assert_called_once()
+        mock_loguru_info.assert_called_with(
+            "Shutdown requested, stopping before the remaining folders"
+        )
+        assert connection.execute("SELECT item_id FROM run_journal").fetchall() == [
+            (1,),
+            (2,),
+        ]
+
+    def test_process_stops_planning_and_skips_journaled_series(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        mocker.patch.object(ListFetcher, "fetch", return_value=[{"path": "/root"}])
+        stop_requested = Event()
+
+        def request_get(path):
+            stop_requested.set()
+            return {"folder": "New"}
+
+        request_get = mocker.patch.object(
+            sonarr_cli, "request_get", side_effect=request_get
+        )
+        request_put = mocker.patch.object(sonarr_cli, "request_put")
+        connection = sqlite3.connect(":memory:")
+        RunProgress(connection=connection).record("folder_rename", [1])
+
+        SeriesFolderRename(
+            sonarr_cli, run_progress=RunProgress(stop_requested, connection)
+        ).process(
+            [
+                SeriesRecord(id=1, title="Show A", path="/root/OldA"),
+                SeriesRecord(id=2, title="Show B", path="/root/OldB"),
+            ]
+        )
+
+        request_get.assert_called_once_with(path="/api/v3/series/2/folder")
+        request_put.assert_not_called()
+        mock_loguru_info.assert_called_with(
+            "Shutdown requested, stopping folder planning"
+        )
@@ -1,17 +1,30 @@
-from unittest.mock import call
+import sqlite3
+from threading import Event
+from unittest.mock import MagicMock, call
 
-from pycliarr.api import SonarrCli, SonarrSerieItem
+import pytest
+from pycliarr.api import SonarrCli
 
+from renamarr.common.command_waiter import CommandResult, CommandWaiter
+from renamarr.common.plan_writer import PlanWriter
+from renamarr.common.run_progress import RunProgress
+from renamarr.sonarr.models.series_record import SeriesRecord
 from renamarr.sonarr.services.series_rename import SeriesRename
 
 
 class TestSeriesRename:
+    @pytest.fixture(autouse=True)
+    def get_system_status(self, mocker) -> MagicMock:
+        return mocker.patch.object(
+            SonarrCli, "get_system_status", return_value={"version": "4.0.4.1491"}
+        )
+
     def test_process_skips_rename_when_no_episodes_need_rename(
-        self, mock_loguru_debug, mocker
+        self, get_system_status, mock_loguru_debug, mocker
     ) -> None:
         sonarr_cli = SonarrCli("test.tld", "test-api-key")
-        series_a = SonarrSerieItem(id=1, title="Show A")
-        series_b = SonarrSerieItem(id=2, title="Show B")
+        series_a = SeriesRecord(id=1, title="Show A")
+        series_b = SeriesRecord(id=2, title="Show B")
         request_get = mocker.patch.object(sonarr_cli, "request_get", return_value=[])
         rename_files = mocker.patch.object(sonarr_cli, "rename_files")
 
@@ -28,12 +41,13 @@ class TestSeriesRename:
             call("No episodes to rename"),
         ]
         rename_files.assert_not_called()
+        get_system_status.assert_not_called()
 
     def test_process_renames_episodes_per_series(
         self, mock_loguru_info, mock_loguru_debug, mocker
     ) -> None:
         sonarr_cli = SonarrCli("test.tld", "test-api-key")
-        series = SonarrSerieItem(id=1, title="Show")
+        series = SeriesRecord(id=1, title="Show")
         mocker.patch.object(
             sonarr_cli,
             "request_get",
@@ -59,8 +73,8 @@ class TestSeriesRename:
         self, mock_loguru_info, mocker
     ) -> None:
         sonarr_cli = SonarrCli("test.tld", "test-api-key")
-        series_a = SonarrSerieItem(id=1, title="Show A")
-        series_b = SonarrSerieItem(id=2, title="Show B")
+        series_a = SeriesRecord(id=1, title="Show A")
+        series_b = SeriesRecord(id=2, title="Show B")
         mocker.patch.object(sonarr_cli, "request_get").side_effect = [
             [{"seasonNumber": 1, "episodeNumbers": [1], "episodeFileId": 10}],
             [{"seasonNumber": 2, "episodeNumbers": [1, 2], "episodeFileId": 20}],
@@ -81,3 +95,197 @@ class TestSeriesRename:
                 call([20], 2),
             ]
         )
+
+    def test_process_fetches_previews_concurrently_and_renames_in_series_order(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        series = [
+            SeriesRecord(id=1, title="Show A"),
+            SeriesRecord(id=2, title="Show B"),
+            SeriesRecord(id=3, title="Show C"),
+        ]
+        previews = {
+            1: [{"seasonNumber": 1, "episodeNumbers": [1], "episodeFileId": 10}],
+            2: [],
+            3: [{"seasonNumber": 3, "episodeNumbers": [3], "episodeFileId": 30}],
+        }
+        request_get = mocker.patch.object(
+            sonarr_cli,
+            "request_get",
+            side_effect=lambda path, url_params: previews[url_params["seriesId"]],
+        )
+        rename_files = mocker.patch.object(sonarr_cli, "rename_files")
+
+        SeriesRename(sonarr_cli, max_concurrency=3).process(series)
+
+        assert request_get.call_count == 3
+        assert rename_files.call_args_list == [call([10], 1), call([30], 3)]
+        assert mock_loguru_info.call_args_list == [
+            call("Renaming S01E01"),
+            call("Renaming S03E03"),
+        ]
+
+    def test_process_acquires_rate_limit_for_each_preview(self, mocker) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        series = [SeriesRecord(id=1, title="A"), SeriesRecord(id=2, title="B")]
+        mocker.patch.object(sonarr_cli, "request_get", return_value=[])
+        rate_limiter = mocker.Mock()
+
+        SeriesRename(sonarr_cli, rate_limiter=rate_limiter).process(series)
+
+        assert rate_limiter.acquire.call_count == 2
+
+    def test_process_fetches_previews_in_bulk_when_supported(
+        self, get_system_status, mock_loguru_info, mocker
+    ) -> None:
+        get_system_status.return_value = {"version": "4.0.5.1710"}
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        series = [
+            SeriesRecord(id=1, title="Show A"),
+            SeriesRecord(id=2, title="Show B"),
+            SeriesRecord(id=3, title="Show C"),
+        ]
+        request_get = mocker.patch.object(
+            sonarr_cli,
+            "request_get",
+            return_value=[
+                {
+                    "seriesId": 3,
+                    "seasonNumber": 3,
+                    "episodeNumbers": [3],
+                    "episodeFileId": 30,
+                },
+                {
+                    "seriesId": 1,
+                    "seasonNumber": 1,
+                    "episodeNumbers": [1],
+                    "episodeFileId": 10,
+                },
+            ],
+        )
+        rename_files = mocker.patch.object(sonarr_cli, "rename_files")
+
+        SeriesRename(sonarr_cli, bulk_rename_preview=True).process(series)
+
+        request_get.assert_called_once_with(
+            path="/api/v3/rename/bulk", url_params={"seriesIds": [1, 2, 3]}
+        )
+        assert rename_files.call_args_list == [call([10], 1), call([30], 3)]
+        assert mock_loguru_info.call_args_list == [
+            call("Renaming S01E01"),
+            call("Renaming S03E03"),
+        ]
+
+    def test_process_sends_rename_files_commands_in_batches(self, mocker) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        series = [
+            SeriesRecord(id=1, title="Show A"),
+            SeriesRecord(id=2, title="Show B"),
+        ]
+        previews = {
+            1: [
+                {"seasonNumber": 1, "episodeNumbers": [e], "episodeFileId": e}
+                for e in (1, 2, 3)
+            ],
+            2: [{"seasonNumber": 1, "episodeNumbers": [1], "episodeFileId": 4}],
+        }
+        mocker.patch.object(
+            sonarr_cli,
+            "request_get",
+            side_effect=lambda path, url_params: previews[url_params["seriesId"]],
+        )
+        rename_files = mocker.patch.object(
+            sonarr_cli, "rename_files", side_effect=[{"id": 10}, {"id": 20}, {"id": 30}]
+        )
+        command_waiter = mocker.Mock(spec=CommandWaiter)
+        command_waiter.wait.return_value = CommandResult(
+            successful=True, elapsed_seconds=1
+        )
+
+        SeriesRename(
+            sonarr_cli, command_waiter=command_waiter, rename_batch_size=2
+        ).process(series)
+
+        assert rename_files.call_args_list == [
+            call([1, 2], 1),
+            call([3], 1),
+            call([4], 2),
+        ]
+        assert command_waiter.wait.call_args_list == [
+            call({"id": 10}, "Sonarr rename batch 1 (2 files)"),
+            call({"id": 20}, "Sonarr rename batch 2 (1 files)"),
+            call({"id": 30}, "Sonarr rename batch 3 (1 files)"),
+        ]
+
+    def test_process_writes_plan_instead_of_renaming_on_dry_run(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        mocker.patch.object(
+            sonarr_cli,
+            "request_get",
+            return_value=[
+                {"seasonNumber": 1, "episodeNumbers": [1, 2], "episodeFileId": 10}
+            ],
+        )
+        rename_files = mocker.patch.object(sonarr_cli, "rename_files")
+        plan_writer = mocker.Mock(spec=PlanWriter)
+
+        SeriesRename(sonarr_cli, plan_writer=plan_writer).process(
+            [SeriesRecord(id=1, title="Show")]
+        )
+
+        rename_files.assert_not_called()
+        plan_writer.write.assert_called_once_with(
+            "episode_rename",
+            series_id=1,
+            series_title="Show",
+            episode_files=[
+                {"file_id": 10, "season_number": 1, "episode_numbers": [1, 2]}
+            ],
+        )
+        mock_loguru_info.assert_called_once_with("Would rename S01E01-02")
+
+    def test_process_journals_series_and_stops_when_shutdown_is_requested(
+        self, mock_loguru_info, mocker
+    ) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        request_get = mocker.patch.object(sonarr_cli, "request_get")
+        request_get.side_effect = [
+            [],
+            [{"seasonNumber": 1, "episodeNumbers": [1], "episodeFileId": 20}],
+            [{"seasonNumber": 1, "episodeNumbers": [1], "episodeFileId": 30}],
+        ]
+        stop_requested = Event()
+        rename_files = mocker.patch.object(
+            sonarr_cli, "rename_files", side_effect=lambda *args: stop_requested.set()
+        )
+        connection = sqlite3.connect(":memory:")
+
+        SeriesRename(
+            sonarr_cli, run_progress=RunProgress(stop_requested, connection)
+        ).process([SeriesRecord(id=series_id) for series_id in (1, 2, 3)])
+
+        rename_files.assert_called_once_with([20], 2)
+        mock_loguru_info.assert_called_with(
+            "Shutdown requested, stopping before the remaining series"
+        )
+        assert connection.execute("SELECT item_id FROM run_journal").fetchall() == [
+            (1,),
+            (2,),
+        ]
+
+    def test_process_skips_series_finished_by_an_interrupted_run(self, mocker) -> None:
+        sonarr_cli = SonarrCli("test.tld", "test-api-key")
+        request_get = mocker.patch.object(sonarr_cli, "request_get", return_value=[])
+        connection = sqlite3.connect(":memory:")
+        RunProgress(connection=connection).record("rename", [1])
+
+        SeriesRename(
+            sonarr_cli, run_progress=RunProgress(connection=connection)
+        ).process([SeriesRecord(id=1), SeriesRecord(id=2)])
+
+        request_get.assert_called_once_with(
+            path="/api/v3/rename", url_params={"seriesId": 2}
+        )
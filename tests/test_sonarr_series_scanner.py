@@ -1,10 +1,12 @@
 import logging
 from datetime import UTC, datetime, timedelta
+from unittest.mock import call
 
 import pytest
-from pycliarr.api import SonarrCli, SonarrSerieItem
+from pycliarr.api import CliArrError, SonarrCli
 from pycliarr.api.base_api import json_data
 
+from renamarr.common.list_fetcher import ListFetcher
 from renamarr.sonarr.services.series_scanner import SonarrSeriesScanner
 from tests.conftest import episode_data
 
@@ -48,13 +50,15 @@ class TestSeriesScanner:
         assert "Exiting Series Scan" in caplog.text
 
     def test_no_series_returned(self, caplog, mocker) -> None:
-        mocker.patch.object(SonarrCli, "get_serie").return_value = []
+        mocker.patch.object(ListFetcher, "fetch").return_value = []
         with caplog.at_level(logging.DEBUG):
             SonarrSeriesScanner("test", "test.tld", "test-api-key", 4).scan()
         assert "Sonarr returned empty series list" in caplog.text
         assert "Finished Series Scan" in caplog.text
 
-    def test_when_series_returned_no_episodes(self, get_serie, caplog, mocker) -> None:
+    def test_when_series_returned_no_episodes(
+        self, continuing_series_list, caplog, mocker
+    ) -> None:
         mocker.patch.object(SonarrCli, "get_episode").return_value = []
         with caplog.at_level(logging.DEBUG):
             SonarrSeriesScanner("test", "test.tld", "test-api-key", 4).scan()
@@ -62,10 +66,9 @@ class TestSeriesScanner:
         assert "Error fetching episode list" in caplog.text
 
     def test_when_show_status_not_continuuing(self, caplog, mocker) -> None:
-        series: list[SonarrSerieItem] = [
-            SonarrSerieItem(id=1, title="test title", status="ended")
+        mocker.patch.object(ListFetcher, "fetch").return_value = [
+            {"id": 1, "title": "test title", "status": "ended"}
         ]
-        mocker.patch.object(SonarrCli, "get_serie").return_value = series
         get_episode = mocker.patch.object(SonarrCli, "get_episode")
         get_episode.return_value = []
 
@@ -76,11 +79,10 @@ class TestSeriesScanner:
         assert not get_episode.called
 
     def test_when_multiple_shows_continuing_and_ended(self, caplog, mocker) -> None:
-        series: list[SonarrSerieItem] = [
-            SonarrSerieItem(id=1, title="title 1", status="continuing"),
-            SonarrSerieItem(id=2, title="title 2", status="ended"),
+        mocker.patch.object(ListFetcher, "fetch").return_value = [
+            {"id": 1, "title": "title 1", "status": "continuing"},
+            {"id": 2, "title": "title 2", "status": "ended"},
         ]
-        mocker.patch.object(SonarrCli, "get_serie").return_value = series
 
         get_episode = mocker.patch.object(SonarrCli, "get_episode")
         get_episode.return_value = []
@@ -90,7 +92,9 @@ class TestSeriesScanner:
 
         get_episode.assert_called_once_with(1)
 
-    def test_when_episodes_filtered_out(self, get_serie, caplog, mocker) -> None:
+    def test_when_episodes_filtered_out(
+        self, continuing_series_list, caplog, mocker
+    ) -> None:
         episodes: list[json_data] = [
             episode_data(
                 id=1,
@@ -125,7 +129,9 @@ class TestSeriesScanner:
         assert "Retrieved episode list" in caplog.text
         assert not refresh_serie.called
 
-    def test_when_tba_episode_is_airing_soon(self, get_serie, caplog, mocker) -> None:
+    def test_when_tba_episode_is_airing_soon(
+        self, continuing_series_list, caplog, mocker
+    ) -> None:
         episodes: list[json_data] = [
             episode_data(
                 id=1,
@@ -146,7 +152,7 @@ class TestSeriesScanner:
         assert "Series rescan triggered" in caplog.text
 
     def test_when_tba_episode_has_already_aired(
-        self, get_serie, caplog, mocker
+        self, continuing_series_list, caplog, mocker
     ) -> None:
         episodes: list[json_data] = [
             episode_data(
@@ -168,7 +174,7 @@ class TestSeriesScanner:
         assert "Series rescan triggered" in caplog.text
 
     def test_when_hours_before_air_above_max_is_capped(
-        self, get_serie, fixed_now, mocker
+        self, continuing_series_list, fixed_now, mocker
     ) -> None:
         mocker.patch.object(
             SonarrCli,
@@ -182,7 +188,7 @@ class TestSeriesScanner:
         refresh_serie.assert_not_called()
 
     def test_when_tba_episode_is_exactly_at_future_limit_refreshes(
-        self, get_serie, fixed_now, mocker
+        self, continuing_series_list, fixed_now, mocker
     ) -> None:
         mocker.patch.object(
             SonarrCli,
@@ -196,7 +202,7 @@ class TestSeriesScanner:
         refresh_serie.assert_called_once_with(1)
 
     def test_when_tba_episode_is_just_beyond_future_limit_does_not_refresh(
-        self, get_serie, fixed_now, mocker
+        self, continuing_series_list, fixed_now, mocker
     ) -> None:
         mocker.patch.object(
             SonarrCli,
@@ -210,7 +216,7 @@ class TestSeriesScanner:
         refresh_serie.assert_not_called()
 
     def test_when_tba_episode_is_exactly_now_does_not_refresh(
-        self, get_serie, fixed_now, mocker
+        self, continuing_series_list, fixed_now, mocker
     ) -> None:
         mocker.patch.object(
             SonarrCli,
@@ -222,3 +228,120 @@ class TestSeriesScanner:
         SonarrSeriesScanner("test", "test.tld", "test-api-key", 4).scan()
 
         refresh_serie.assert_not_called()
+
+    def test_calendar_mode_refreshes_series_from_single_calendar_request(
+        self, fixed_now, mocker
+    ) -> None:
+        def calendar_episode(
+            series_id: int,
+            series_title: str,
+            status: str,
+            air_date_utc: datetime,
+            **extra,
+        ) -> json_data:
+            return (
+                tba_episode_at(air_date_utc)
+                | {
+                    "seriesId": series_id,
+                    "series": {"title": series_title, "status": status},
+                }
+                | extra
+            )
+
+        request_get = mocker.patch.object(SonarrCli, "request_get")
+        request_get.side_effect = [
+            {"episodeTitleRequired": True},
+            [
+                calendar_episode(
+                    1, "B Show", "continuing", fixed_now - timedelta(days=1)
+                ),
+                calendar_episode(
+                    1, "B Show", "continuing", fixed_now + timedelta(hours=1)
+                ),
+                calendar_episode(
+                    2, "A Show", "continuing", fixed_now + timedelta(hours=2)
+                ),
+                calendar_episode(3, "Ended", "ended", fixed_now - timedelta(days=1)),
+                calendar_episode(
+                    4,
+                    "Titled",
+                    "continuing",
+                    fixed_now - timedelta(days=1),
+                    title="Pilot",
+                ),
+                calendar_episode(
+                    5, "Later", "continuing", fixed_now + timedelta(hours=5)
+                ),
+            ],
+        ]
+        fetch = mocker.patch.object(ListFetcher, "fetch")
+        get_episode = mocker.patch.object(SonarrCli, "get_episode")
+        refresh_serie = mocker.patch.object(SonarrCli, "refresh_serie")
+
+        SonarrSeriesScanner(
+            "test",
+            "test.tld",
+            "test-api-key",
+            4,
+            use_calendar=True,
+            calendar_lookback_days=3,
+        ).scan()
+
+        request_get.assert_called_with(
+            path="/api/v3/calendar",
+            url_params={
+                "start": (fixed_now - timedelta(days=3)).isoformat(),
+                "end": (fixed_now + timedelta(hours=4)).isoformat(),
+                "unmonitored": "true",
+                "includeSeries": "true",
+            },
+        )
+        assert refresh_serie.call_args_list == [mocker.call(2), mocker.call(1)]
+        fetch.assert_not_called()
+        get_episode.assert_not_called()
+
+    def test_calendar_mode_falls_back_to_series_scan_when_calendar_fails(
+        self, continuing_series_list, mock_loguru_warning, mocker
+    ) -> None:
+        calendar_error = CliArrError("calendar unavailable")
+        mocker.patch.object(SonarrCli, "request_get").side_effect = [
+            {"episodeTitleRequired": True},
+            calendar_error,
+        ]
+        get_episode = mocker.patch.object(SonarrCli, "get_episode", return_value=[])
+
+        SonarrSeriesScanner(
+            "test", "test.tld", "test-api-key", 4, use_calendar=True
+        ).scan()
+
+        mock_loguru_warning.assert_has_calls(
+            [
+                mocker.call(
+                    "Unable to query Sonarr calendar, falling back to per-series scan"
+                ),
+                mocker.call(calendar_error),
+            ]
+        )
+        get_episode.assert_called_once_with(1)
+
+    def test_scan_logs_run_summary_with_refreshed_series(
+        self, continuing_series_list, fixed_now, mocker
+    ) -> None:
+        run_summary = mocker.patch(
+            "renamarr.sonarr.services.series_scanner.RunSummary"
+        ).return_value
+        mocker.patch.object(
+            SonarrCli,
+            "get_episode",
+            return_value=[tba_episode_at(fixed_now - timedelta(days=1))],
+        )
+        mocker.patch.object(SonarrCli, "refresh_serie")
+
+        SonarrSeriesScanner("test", "test.tld", "test-api-key", 4).scan()
+
+        run_summary.track_requests.assert_called_once_with(mocker.ANY)
+        assert run_summary.count.call_args_list == [
+            call("series"),
+            call("refreshed_series"),
+        ]
+        run_summary.log.assert_called_once_with()
@@ -0,0 +1,49 @@
+import sqlite3
+
+from renamarr.common.state_database import open_state_database
+
+
+class TestOpenStateDatabase:
+    def test_opens_instance_database_under_cache_dir_and_commits(
+        self, tmp_path, monkeypatch
+    ) -> None:
+        monkeypatch.setenv("CACHE_DIR", str(tmp_path))
+
+        with open_state_database("sonarr", "tv") as connection:
+            connection.execute("CREATE TABLE state (value TEXT)")
+            connection.execute("INSERT INTO state VALUES ('persisted')")
+
+        with sqlite3.connect(tmp_path / "sonarr" / "tv.sqlite3") as reopened:
+            assert reopened.execute("SELECT value FROM state").fetchall() == [
+                ("persisted",)
+            ]
+
+    def test_closes_connection_on_exit(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setenv("CACHE_DIR", str(tmp_path))
+
+        with open_state_database("radarr", "movies") as connection:
+            pass
+
+        assert (tmp_path / "radarr" / "movies.sqlite3").exists()
+        try:
+            connection.execute("SELECT 1")
+        except sqlite3.ProgrammingError as error:
+            assert "closed" in str(error)
+        else:  # pragma: no cover
+            raise AssertionError("connection was left open")
+
+    def test_yields_none_and_warns_when_cache_dir_is_unusable(
+        self, tmp_path, monkeypatch, mock_loguru_warning
+    ) -> None:
+        not_a_directory = tmp_path / "cache"
+        not_a_directory.write_text("", encoding="utf-8")
+        monkeypatch.setenv("CACHE_DIR", str(not_a_directory))
+
+        with open_state_database("sonarr", "tv") as connection:
+            assert connection is None
+
+        mock_loguru_warning.assert_any_call(
+            f"Unable to open state database {str(not_a_directory / 'sonarr' / 'tv.sqlite3')!r}; "
+            "continuing without cached state."
+        )
+        assert isinstance(mock_loguru_warning.call_args_list[-1].args[0], OSError)
@@ -0,0 +1,55 @@
+from threading import Event
+from unittest.mock import MagicMock
+
+from renamarr.webhook.webhook_debouncer import WebhookDebouncer
+
+
+class TestWebhookDebouncer:
+    def test_flushes_batched_ids_once_events_stop(self) -> None:
+        flushed = Event()
+        flush = MagicMock(side_effect=lambda *args: flushed.set())
+        debouncer = WebhookDebouncer(flush, delay_seconds=0.05)
+
+        debouncer.add("sonarr", "tv", {1})
+        debouncer.add("sonarr", "tv", {2, 3})
+
+        assert flushed.wait(5)
+        flush.assert_called_once_with("sonarr", "tv", {1, 2, 3})
+
+    def test_flushes_instances_separately(self) -> None:
+        flush = MagicMock()
+        debouncer = WebhookDebouncer(flush, delay_seconds=60)
+
+        debouncer.add("sonarr", "tv", {1})
+        debouncer.add("radarr", "movies", {2})
+        debouncer._WebhookDebouncer__flush(("sonarr", "tv"))
+
+        flush.assert_called_once_with("sonarr", "tv", {1})
+        debouncer.cancel()
+
+    def test_max_delay_caps_the_wait_from_the_first_event(self, mocker) -> None:
+        timer = mocker.patch("renamarr.webhook.webhook_debouncer.Timer")
+        monotonic = mocker.patch(
+            "renamarr.webhook.webhook_debouncer.monotonic", side_effect=[0, 25, 50]
+        )
+        debouncer = WebhookDebouncer(
+            MagicMock(), delay_seconds=30, max_delay_seconds=40
+        )
+
+        debouncer.add("sonarr", "tv", {1})
+        debouncer.add("sonarr", "tv", {2})
+        debouncer.add("sonarr", "tv", {3})
+
+        assert [c.args[0] for c in timer.call_args_list] == [30, 15, 0]
+        assert timer.return_value.cancel.call_count == 2
+        assert monotonic.call_count == 3
+
+    def test_cancel_drops_pending_ids(self) -> None:
+        flush = MagicMock()
+        debouncer = WebhookDebouncer(flush, delay_seconds=60)
+        debouncer.add("sonarr", "tv", {1})
+
+        debouncer.cancel()
+        debouncer._WebhookDebouncer__flush(("sonarr", "tv"))
+
+        flush.assert_not_called()
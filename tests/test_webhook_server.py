@@ -0,0 +1,180 @@
+import json
+from base64 import b64encode
+from unittest.mock import MagicMock
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from renamarr.webhook.webhook_server import (
+    MAX_BODY_BYTES,
+    WebhookServer,
+    webhook_item_id,
+)
+
+
+class TestWebhookServer:
+    @pytest.fixture
+    def on_event(self) -> MagicMock:
+        return MagicMock()
+
+    @pytest.fixture
+    def webhook_server(self, on_event):
+        webhook_server = WebhookServer(
+            {("sonarr", "tv shows"): "sonarr-key", ("radarr", "movies"): "radarr-key"},
+            on_event,
+            0,
+            host="127.0.0.1",
+        )
+        webhook_server.start()
+        yield webhook_server
+        webhook_server.stop()
+
+    def post(self, webhook_server, path, payload=None, body=None, headers=None):
+        request = Request(
+            f"http://127.0.0.1:{webhook_server.port}{path}",
+            data=body if body is not None else json.dumps(payload).encode(),
+            headers=headers or {},
+            method="POST",
+        )
+        try:
+            with urlopen(request) as response:
+                return response.status
+        except HTTPError as error:
+            error.close()
+            return error.code
+
+    def test_accepts_sonarr_import_with_apikey_query(
+        self, webhook_server, on_event
+    ) -> None:
+        status = self.post(
+            webhook_server,
+            "/webhook/sonarr/tv%20shows?apikey=sonarr-key",
+            {"eventType": "Download", "series": {"id": 7}},
+        )
+
+        assert status == 202
+        on_event.assert_called_once_with("sonarr", "tv shows", 7)
+
+    def test_accepts_radarr_movie_added_with_basic_auth(
+        self, webhook_server, on_event
+    ) -> None:
+        credentials = b64encode(b"renamarr:radarr-key").decode()
+
+        status = self.post(
+            webhook_server,
+            "/webhook/radarr/movies",
+            {"eventType": "MovieAdded", "movie": {"id": 3}},
+            headers={"Authorization": f"Basic {credentials}"},
+        )
+
+        assert status == 202
+        on_event.assert_called_once_with("radarr", "movies", 3)
+
+    def test_acknowledges_and_ignores_test_events(
+        self, webhook_server, on_event
+    ) -> None:
+        status = self.post(
+            webhook_server,
+            "/webhook/radarr/movies?apikey=radarr-key",
+            {"eventType": "Test"},
+        )
+
+        assert status == 200
+        on_event.assert_not_called()
+
+    def test_acknowledges_and_ignores_non_object_payloads(
+        self, webhook_server, on_event
+    ) -> None:
+        status = self.post(
+            webhook_server, "/webhook/radarr/movies?apikey=radarr-key", [1]
+        )
+
+        assert status == 200
+        on_event.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "path",
+        ["/", "/webhook/sonarr", "/webhook/sonarr/movies", "/metrics/sonarr/tv"],
+    )
+    def test_returns_not_found_for_unknown_paths(
+        self, webhook_server, on_event, path
+    ) -> None:
+        assert self.post(webhook_server, path, {}) == 404
+        on_event.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "headers",
+        [
+            {},
+            {"Authorization": "Bearer radarr-key"},
+            {"Authorization": "Basic not-base64!"},
+            {"Authorization": f"Basic {b64encode(b'renamarr:sonarr-key').decode()}"},
+        ],
+    )
+    def test_rejects_requests_without_the_instance_api_key(
+        self, webhook_server, on_event, headers
+    ) -> None:
+        status = self.post(
+            webhook_server,
+            "/webhook/radarr/movies?apikey=sonarr-key",
+            {"eventType": "Download", "movie": {"id": 3}},
+            headers=headers,
+        )
+
+        assert status == 401
+        on_event.assert_not_called()
+
+    def test_rejects_invalid_json(self, webhook_server, on_event) -> None:
+        status = self.post(
+            webhook_server, "/webhook/radarr/movies?apikey=radarr-key", body=b"{"
+        )
+
+        assert status == 400
+        on_event.assert_not_called()
+
+    def test_rejects_oversized_bodies(self, webhook_server, on_event) -> None:
+        status = self.post(
+            webhook_server,
+            "/webhook/radarr/movies?apikey=radarr-key",
+            body=b"",
+            headers={"Content-Length": str(MAX_BODY_BYTES + 1)},
+        )
+
+        assert status == 413
+        on_event.assert_not_called()
+
+    @pytest.mark.parametrize("content_length", ["-1", "abc"])
+    def test_rejects_invalid_content_length(
+        self, webhook_server, on_event, content_length
+    ) -> None:
+        status = self.post(
+            webhook_server,
+            "/webhook/radarr/movies?apikey=radarr-key",
+            body=b"",
+            headers={"Content-Length": content_length},
+        )
+
+        assert status == 400
+        on_event.assert_not_called()
+
+
+class TestWebhookItemId:
+    @pytest.mark.parametrize(
+        ("service", "payload", "expected"),
+        [
+            ("sonarr", {"eventType": "Download", "series": {"id": 1}}, 1),
+            ("sonarr", {"eventType": "SeriesAdd", "series": {"id": 2}}, 2),
+            ("radarr", {"eventType": "Download", "movie": {"id": 3}}, 3),
+            ("radarr", {"eventType": "MovieAdded", "movie": {"id": 4}}, 4),
+            ("sonarr", {"eventType": "Grab", "series": {"id": 1}}, None),
+            ("sonarr", {"eventType": "Download", "movie": {"id": 1}}, None),
+            ("radarr", {"eventType": "Download", "movie": {"id": "3"}}, None),
+            ("radarr", {"eventType": "Download", "movie": None}, None),
+            ("radarr", "Download", None),
+        ],
+    )
+    def test_returns_id_for_events_that_can_need_a_rename(
+        self, service, payload, expected
+    ) -> None:
+        assert webhook_item_id(service, payload) == expected